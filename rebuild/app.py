@@ -8,6 +8,7 @@ import os
 from datetime import datetime, date, time
 from flask import Flask
 from flask.json.provider import DefaultJSONProvider
+from core.instrumentation import configure_logging
 from database.models import db, init_database
 
 
@@ -19,6 +20,7 @@ class CustomJSONProvider(DefaultJSONProvider):
 
 
 def create_app():
+    configure_logging()
     app = Flask(__name__, template_folder='templates', static_folder='static')
     app.secret_key = os.environ.get('SECRET_KEY', 'dev-key-change-in-production')
     app.json = CustomJSONProvider(app)
@@ -51,6 +53,9 @@ def create_app():
     app.register_blueprint(publer_bp)
     app.register_blueprint(manual_cal_bp)
 
+    from helpers.jobs import start_embedded_workers
+    start_embedded_workers(app)
+
     @app.after_request
     def add_no_cache_headers(response):
         if 'text/html' in response.content_type:
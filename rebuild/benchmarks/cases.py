@@ -0,0 +1,108 @@
+"""
+Benchmark cases: the sample birth charts and one setup function per engine.
+
+A setup function takes (chart, start_date, days), does any untimed
+preparation and returns a zero-argument callable that runs the engine and
+returns its output. Collective engines do not depend on the birth chart
+and run once per range.
+"""
+
+from datetime import date, datetime, time, timedelta
+
+START_DATE = date(2026, 1, 1)
+RANGES = (30, 60, 365)
+
+# Fixed sample birth charts; location is both the birth and transit place
+SAMPLE_CHARTS = {
+    'daytona_1973': {
+        'birth': datetime(1973, 3, 9, 16, 56), 'latitude': 29.2108, 'longitude': -81.0228, 'timezone': -5.0,
+    },
+    'new_york_1980': {
+        'birth': datetime(1980, 5, 17, 6, 30), 'latitude': 40.7128, 'longitude': -74.0060, 'timezone': -4.0,
+    },
+    'london_1965': {
+        'birth': datetime(1965, 1, 20, 12, 0), 'latitude': 51.5074, 'longitude': -0.1278, 'timezone': 0.0,
+    },
+}
+
+
+def _pti(chart, start_date, days):
+    from core.magi_collective import PTITunedCalendar
+    return lambda: PTITunedCalendar().generate_calendar(start_date, days)
+
+
+def _vedic(chart, start_date, days):
+    from core.vedic_collective import classify_day_rules
+    return lambda: [classify_day_rules(start_date + timedelta(days=i)) for i in range(days)]
+
+
+def _personal_days(chart, start_date, days):
+    from personal_calendar.personal_transit_yp import EnhancedPersonalTransitCalculator
+    birth = chart['birth']
+    calculator = EnhancedPersonalTransitCalculator()
+    birth_chart = calculator.calculate_birth_chart(
+        birth.date(), birth.time(), chart['latitude'], chart['longitude'], chart['timezone'])
+    return calculator.generate_personal_calendar(
+        birth_chart, start_date, start_date + timedelta(days=days - 1),
+        chart['latitude'], chart['longitude'], chart['timezone'], 'composite')
+
+
+def _personal(chart, start_date, days):
+    return lambda: _personal_days(chart, start_date, days)
+
+
+def _bird_batch(chart, start_date, days):
+    from filters.bird_batch_filter import BirdBatchFilter
+    birth = chart['birth']
+    return lambda: BirdBatchFilter().process_batch(
+        start_date.isoformat(), days, 6,
+        birth_date=birth.strftime('%Y-%m-%d'), birth_time=birth.strftime('%H:%M'),
+        birth_latitude=chart['latitude'], birth_longitude=chart['longitude'])
+
+
+def _combined(chart, start_date, days):
+    """Times the analyzer alone; its personal, PTI and Vedic inputs are computed here."""
+    from core.combined_calendar import CombinedCalendarAnalyzer
+    from helpers.utils import make_json_serializable
+
+    personal = _personal_days(chart, start_date, days)
+    daily_results, daily_scores = [], {}
+    for date_str, day in sorted(personal.items()):
+        score = day.get('personal_score') or {}
+        daily_results.append({'date': date_str, 'day_score': score, 'moon_house': score.get('moon_house')})
+        daily_scores[date_str] = {
+            'quality': score.get('quality', 'neutral'),
+            'score': float(score.get('score', 0.0)),
+            'moon_house': score.get('moon_house'),
+        }
+    calendar_data = make_json_serializable({
+        'personal': {'data': {'daily_periods': daily_results, 'daily_scores': daily_scores}},
+        'pti_collective': {'data': {'results': _pti(chart, start_date, days)()}},
+        'vedic_pti': {'data': {'results': _vedic(chart, start_date, days)()}},
+    })
+    return lambda: CombinedCalendarAnalyzer().analyze_calendar_data(calendar_data)
+
+
+def _microtransit(name):
+    def setup(chart, start_date, days):
+        from microtransits.engine import get_engine
+        engine = get_engine(name)(chart['birth'], location=(chart['latitude'], chart['longitude']))
+        start = datetime.combine(start_date, time.min)
+        return lambda: engine.scan(start, start + timedelta(days=days))
+    return setup
+
+
+# Engine name -> (setup, collective)
+CASES = {
+    'pti': (_pti, True),
+    'vedic': (_vedic, True),
+    'personal': (_personal, False),
+    'bird_batch': (_bird_batch, False),
+    'combined': (_combined, False),
+    'vb1': (_microtransit('vb1'), False),
+    'vb2': (_microtransit('vb2'), False),
+    'wb1': (_microtransit('wb1'), False),
+    'wb2': (_microtransit('wb2'), False),
+    'wb3': (_microtransit('wb3'), False),
+    'yp': (_microtransit('yp'), False),
+}
@@ -0,0 +1,238 @@
+"""
+Engine benchmark suite.
+
+Runs each compute engine over 30, 60 and 365 days from a fixed start date
+for the sample birth charts in benchmarks.cases, reporting seconds,
+Swiss Ephemeris calls and peak traced memory, and checks the outputs
+against the golden files in benchmarks/golden. Caches are cleared before
+every run, so timings are cold.
+
+Usage (from the rebuild directory):
+    python -m benchmarks.run
+    python -m benchmarks.run --engines wb1 yp --days 30 60 --no-memory
+    python -m benchmarks.run --update-golden
+
+Outputs are compared by digest: floats rounded to FLOAT_DIGITS places and
+volatile keys (generation timestamps) dropped, with one digest per record
+so a mismatch names the dates that changed. Goldens are recorded with the
+Swiss Ephemeris files available on this host; with a different ephemeris
+(Moshier fallback versus .se1 files) they will not match.
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+import swisseph as swe
+
+from benchmarks.cases import CASES, RANGES, SAMPLE_CHARTS, START_DATE
+from helpers.utils import make_json_serializable
+from microtransits.yp_regression import EphemerisCallCounter
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'golden')
+EPHEMERIS_FUNCTIONS = ('calc_ut', 'houses', 'fixstar_ut', 'get_ayanamsa_ut', 'get_ayanamsa', 'sidtime')
+FLOAT_DIGITS = 6
+VOLATILE_KEYS = {'generated_at'}
+RECORD_LISTS = ('daily_results', 'results')  # list values split into one record per item
+MAX_REPORTED_DIFFS = 5
+
+
+def reset_caches():
+    """Clear the process-wide caches so every run starts cold."""
+    from core import natal_points, solar_events
+    from microtransits.ephemeris_grid import clear_grid_cache
+    natal_points.clear_cache()
+    solar_events.clear_cache()
+    clear_grid_cache()
+
+
+def normalize(value):
+    """JSON form of an engine output with floats rounded and volatile keys dropped."""
+    if isinstance(value, dict):
+        return {str(k): normalize(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, float):
+        return round(value, FLOAT_DIGITS)
+    return value
+
+
+def _digest(value):
+    return hashlib.sha256(json.dumps(value, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _label(index, item):
+    if isinstance(item, dict):
+        for key in ('date', 'start'):
+            if item.get(key):
+                return f"{index}:{item[key]}"
+    return str(index)
+
+
+def _records(value, prefix=''):
+    return [f"{prefix}{_label(i, item)} {_digest(item)}" for i, item in enumerate(value)]
+
+
+def fingerprint(output):
+    """
+    Digest of an output plus a 'label digest' line per record: list items,
+    top-level keys, and the items of RECORD_LISTS values.
+    """
+    value = normalize(make_json_serializable(output))
+    items = []
+    if isinstance(value, dict):
+        for key in sorted(value):
+            if key in RECORD_LISTS and isinstance(value[key], list):
+                items.extend(_records(value[key], f'{key}/'))
+            else:
+                items.append(f"{key} {_digest(value[key])}")
+    elif isinstance(value, list):
+        items = _records(value)
+    return {'count': len(items), 'digest': _digest(value), 'items': items}
+
+
+def measure(run, memory=True):
+    """Run an engine cold; returns (output, seconds, ephemeris calls, peak bytes or None)."""
+    reset_caches()
+    with EphemerisCallCounter(EPHEMERIS_FUNCTIONS) as counter, contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        output = run()
+        elapsed = time.perf_counter() - started
+
+    peak = None
+    if memory:
+        reset_caches()
+        tracemalloc.start()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                run()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return output, elapsed, counter.calls, peak
+
+
+def compare(expected, actual):
+    """Differences between a golden fingerprint and a new one, as readable lines."""
+    if expected['digest'] == actual['digest']:
+        return []
+    diffs = []
+    if expected['count'] != actual['count']:
+        diffs.append(f"{expected['count']} records expected, {actual['count']} found")
+    for item, new_item in zip(expected['items'], actual['items']):
+        if item != new_item:
+            label, new_label = item.rsplit(' ', 1)[0], new_item.rsplit(' ', 1)[0]
+            diffs.append(f"record {label} differs" if label == new_label else f"record {label} is now {new_label}")
+    return diffs or ['output differs']
+
+
+def golden_path(engine):
+    return os.path.join(GOLDEN_DIR, f'{engine}.json')
+
+
+def load_golden(engine):
+    try:
+        with open(golden_path(engine)) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def save_golden(engine, cases):
+    """Write an engine's fingerprints, merged into its existing golden file."""
+    golden = load_golden(engine) or {}
+    golden.update({'start_date': START_DATE.isoformat(), 'swisseph': swe.version})
+    golden.setdefault('cases', {}).update(cases)
+    golden['cases'] = dict(sorted(golden['cases'].items()))
+    os.makedirs(GOLDEN_DIR, exist_ok=True)
+    with open(golden_path(engine), 'w') as f:
+        json.dump(golden, f, indent=1)
+        f.write('\n')
+
+
+def case_keys(engine, charts, ranges):
+    """(case key, chart, days) for an engine; collective engines run once per range."""
+    _, collective = CASES[engine]
+    for days in ranges:
+        if collective:
+            yield f'{days}d', SAMPLE_CHARTS[charts[0]], days
+        else:
+            for chart in charts:
+                yield f'{chart}/{days}d', SAMPLE_CHARTS[chart], days
+
+
+def run_suite(engines, charts, ranges, memory=True, update_golden=False):
+    """Benchmark the engines, print a report and return the rows plus the number of golden mismatches."""
+    rows, failures = [], 0
+    print(f"{'engine':<11} {'case':<22} {'seconds':>8} {'ephem calls':>12} {'peak KB':>8} {'records':>8}  golden")
+    for engine in engines:
+        setup, _ = CASES[engine]
+        golden = load_golden(engine)
+        new_cases = {}
+        for key, chart, days in case_keys(engine, charts, ranges):
+            with contextlib.redirect_stdout(io.StringIO()):
+                run = setup(chart, START_DATE, days)
+            output, seconds, calls, peak = measure(run, memory)
+            result = fingerprint(output)
+            new_cases[key] = result
+
+            expected = (golden or {}).get('cases', {}).get(key)
+            if update_golden:
+                status = 'updated'
+            elif expected is None:
+                status = 'missing'
+            else:
+                diffs = compare(expected, result)
+                status = 'ok' if not diffs else 'MISMATCH'
+                if diffs:
+                    failures += 1
+            peak_kb = f"{peak // 1024:8d}" if peak is not None else f"{'-':>8}"
+            print(f"{engine:<11} {key:<22} {seconds:8.2f} {calls:12d} {peak_kb} {result['count']:8d}  {status}")
+            if status == 'MISMATCH':
+                for line in diffs[:MAX_REPORTED_DIFFS]:
+                    print(f"    {line}")
+                if len(diffs) > MAX_REPORTED_DIFFS:
+                    print(f"    ... {len(diffs) - MAX_REPORTED_DIFFS} more")
+            rows.append({
+                'engine': engine, 'case': key, 'seconds': round(seconds, 4), 'ephemeris_calls': calls,
+                'peak_bytes': peak, 'records': result['count'], 'golden': status,
+            })
+        if update_golden:
+            save_golden(engine, new_cases)
+        elif golden and golden.get('swisseph') != swe.version:
+            print(f"    golden recorded with Swiss Ephemeris {golden.get('swisseph')}, running {swe.version}")
+    return rows, failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--engines', nargs='+', choices=sorted(CASES), default=list(CASES))
+    parser.add_argument('--charts', nargs='+', choices=sorted(SAMPLE_CHARTS), default=list(SAMPLE_CHARTS))
+    parser.add_argument('--days', nargs='+', type=int, default=list(RANGES), help='range lengths in days')
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced run that measures peak memory')
+    parser.add_argument('--update-golden', action='store_true', help='record the outputs as the new goldens')
+    parser.add_argument('--output', help='write the measurements to this JSON file')
+    args = parser.parse_args(argv)
+
+    swe.set_ephe_path()
+    try:
+        rows, failures = run_suite(args.engines, args.charts, args.days,
+                                   memory=not args.no_memory, update_golden=args.update_golden)
+    finally:
+        swe.close()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'start_date': START_DATE.isoformat(), 'swisseph': swe.version, 'results': rows}, f, indent=1)
+    if failures:
+        print(f"{failures} case(s) differ from the golden outputs")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -15,10 +15,15 @@ Background days (posting recommended) = OMNI + DOUBLE GO + GOOD
 PTI Worst days are NEVER background days.
 """
 
+import logging
 import re
 from datetime import date, datetime, timedelta
 from typing import Dict, List, Any, Optional
 
+from core.instrumentation import log_event
+
+logger = logging.getLogger(__name__)
+
 
 class CombinedCalendarAnalyzer:
 
@@ -186,12 +191,14 @@ class CombinedCalendarAnalyzer:
         pti_results = pti_data.get('results', []) or pti_data.get('timing_data', [])
         vedic_results = vedic_data.get('results', [])
 
-        print("COMBINED CALENDAR DEBUG:")
-        print("   personal_scores type: {}".format(type(personal_scores)))
-        print("   personal_scores length: {}".format(len(personal_scores) if personal_scores else 0))
-        if personal_scores:
-            first_key = list(personal_scores.keys())[0]
-            print("   First item: {} -> {}".format(first_key, personal_scores[first_key]))
+        if logger.isEnabledFor(logging.DEBUG):
+            first_key = next(iter(personal_scores), None) if personal_scores else None
+            log_event(logger, logging.DEBUG, 'combined.inputs',
+                      personal_scores=len(personal_scores) if personal_scores else 0,
+                      pti_results=len(pti_results), vedic_results=len(vedic_results),
+                      first_personal=personal_scores[first_key] if first_key else None,
+                      first_pti=pti_results[0] if pti_results else None,
+                      first_vedic=vedic_results[0] if vedic_results else None)
 
         personal_by_date = {}
         if personal_scores:
@@ -205,10 +212,6 @@ class CombinedCalendarAnalyzer:
                     personal_by_date[date_key] = period['personal_score'].get('quality', 'neutral')
 
         pti_by_date = {}
-        print("   PTI results count: {}".format(len(pti_results)))
-        if pti_results:
-            print("   First PTI result sample: {}".format(pti_results[0]))
-            print("   PTI result keys: {}".format(list(pti_results[0].keys()) if isinstance(pti_results[0], dict) else []))
         for result in pti_results:
             date_key = result.get('date')
             if date_key:
@@ -216,9 +219,6 @@ class CombinedCalendarAnalyzer:
 
         vedic_by_date = {}
         eclipse_by_date = {}
-        print("   Vedic results count: {}".format(len(vedic_results)))
-        if vedic_results:
-            print("   First vedic result sample: {}".format(vedic_results[0]))
         for result in vedic_results:
             date_key = result.get('date')
             if date_key:
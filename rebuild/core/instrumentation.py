@@ -0,0 +1,116 @@
+"""
+Instrumentation
+Level-gated structured logging and per-engine counters for the calculation
+hot loops.
+
+log_event writes 'event key=value ...' records and does nothing, not even
+formatting, unless the logger is enabled for the level; callers pass raw
+values so a disabled event costs one level check. LOG_LEVEL sets the level
+of the application loggers (default WARNING, so the engines' debug and
+info events are skipped in production).
+
+Counters (scans, transits found, scan steps, ephemeris calls, seconds) are
+kept per engine for the life of the process and read by the admin endpoint
+/api/admin/engine-counters. Work done inside engine_scope is attributed to
+that engine; anything else is counted under 'shared'.
+
+The counters are per process. The dashboard worker pool sends each step's
+counters back to the parent (drain_counters / merge_counters), but
+separate job worker processes (python -m helpers.jobs) and other web server
+workers keep their own, so the endpoint reports only the process that
+answers it.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+LOG_LEVEL = os.environ.get('LOG_LEVEL', 'WARNING').upper()
+LOG_FORMAT = '%(asctime)s %(levelname)s %(name)s %(message)s'
+SHARED = 'shared'
+
+_counters = defaultdict(lambda: defaultdict(int))
+_counters_lock = threading.Lock()
+_current_engine = ContextVar('instrumented_engine', default=None)
+
+
+def configure_logging(level=None):
+    """Set the root log level (LOG_LEVEL by default) and add a stream handler if none exists."""
+    level = (level or LOG_LEVEL).upper()
+    root = logging.getLogger()
+    if not root.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        root.addHandler(handler)
+    root.setLevel(getattr(logging, level, logging.WARNING))
+
+
+def _format_value(value):
+    if isinstance(value, float):
+        return f"{value:.6f}".rstrip('0').rstrip('.')
+    text = str(value)
+    return f'"{text}"' if ' ' in text else text
+
+
+def log_event(log, level, event, **fields):
+    """Log 'event key=value ...' at level, formatting only if the logger is enabled for it."""
+    if not log.isEnabledFor(level):
+        return
+    log.log(level, '%s %s', event, ' '.join(f"{key}={_format_value(value)}" for key, value in fields.items()))
+
+
+def increment(counter, amount=1, engine=None):
+    """Add amount to a counter of the given engine (the current engine scope by default)."""
+    engine = engine or _current_engine.get() or SHARED
+    with _counters_lock:
+        _counters[engine][counter] += amount
+
+
+@contextmanager
+def engine_scope(engine):
+    """Attribute the counters of the enclosed work to engine and count it as one scan."""
+    token = _current_engine.set(engine)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _current_engine.reset(token)
+        with _counters_lock:
+            _counters[engine]['scans'] += 1
+            _counters[engine]['seconds'] += time.perf_counter() - started
+
+
+def counters():
+    """Snapshot of every engine's counters."""
+    with _counters_lock:
+        return {
+            engine: {name: round(value, 3) if isinstance(value, float) else value
+                     for name, value in sorted(values.items())}
+            for engine, values in sorted(_counters.items())
+        }
+
+
+def drain_counters():
+    """Return this process's raw counters and zero them (for worker processes reporting back)."""
+    with _counters_lock:
+        drained = {engine: dict(values) for engine, values in _counters.items()}
+        _counters.clear()
+    return drained
+
+
+def merge_counters(other):
+    """Add counters drained in another process."""
+    with _counters_lock:
+        for engine, values in (other or {}).items():
+            for name, value in values.items():
+                _counters[engine][name] += value
+
+
+def reset_counters():
+    """Zero every counter."""
+    with _counters_lock:
+        _counters.clear()
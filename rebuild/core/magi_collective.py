@@ -50,6 +50,20 @@ PLANETS = {
     'Pluto': 9 if not FULL_MODE else swe.PLUTO
 }
 
+_chiron_available = None
+
+
+def chiron_available() -> bool:
+    """Whether Swiss Ephemeris can calculate Chiron (needs the asteroid file); probed once."""
+    global _chiron_available
+    if _chiron_available is None:
+        try:
+            swe.calc_ut(swe.julday(2025, 1, 1, 12.0), swe.CHIRON)
+            _chiron_available = True
+        except Exception:
+            _chiron_available = False
+    return _chiron_available
+
 @dataclass
 class AspectInfo:
     planet1: str
@@ -61,6 +75,58 @@ class AspectInfo:
     coordinate_type: str
     days_to_peak: Optional[float] = None
 
+
+class AspectIndex:
+    """
+    One day's aspects as a graph: for each aspect type, the set of planet
+    pairs and each planet's partners (in aspect order). Built once per day
+    so geometry patterns are set lookups instead of scans of the aspect list.
+    """
+
+    def __init__(self, aspects: List[AspectInfo], coordinate_type: str = 'longitude'):
+        self.pairs: Dict[str, set] = {}
+        self.partners: Dict[str, Dict[str, List[str]]] = {}
+        for a in aspects:
+            if a.coordinate_type != coordinate_type:
+                continue
+            self.pairs.setdefault(a.aspect_type, set()).add(frozenset((a.planet1, a.planet2)))
+            by_planet = self.partners.setdefault(a.aspect_type, {})
+            by_planet.setdefault(a.planet1, []).append(a.planet2)
+            by_planet.setdefault(a.planet2, []).append(a.planet1)
+
+    def has(self, aspect_type: str, planet1: str, planet2: str) -> bool:
+        return frozenset((planet1, planet2)) in self.pairs.get(aspect_type, ())
+
+    def count(self, aspect_type: str) -> int:
+        return len(self.pairs.get(aspect_type, ()))
+
+    def triangles(self, aspect_type: str) -> List[Tuple[str, str, str]]:
+        """Planet triples joined pairwise by aspect_type (e.g. a grand trine)."""
+        found = []
+        by_planet = self.partners.get(aspect_type, {})
+        for p1 in sorted(by_planet):
+            for p2 in by_planet[p1]:
+                if p2 <= p1:
+                    continue
+                for p3 in by_planet[p2]:
+                    if p3 > p2 and self.has(aspect_type, p1, p3):
+                        found.append((p1, p2, p3))
+        return found
+
+    def apex_patterns(self, apex_type: str, base_type: str) -> List[Tuple[str, str, str]]:
+        """
+        (apex, base1, base2) where the apex makes apex_type to both bases and
+        the bases make base_type to each other (yod, T-square). As calibrated,
+        only the apex's first two partners form its base.
+        """
+        found = []
+        for apex, partners in self.partners.get(apex_type, {}).items():
+            if len(partners) >= 2 and partners[0] != partners[1] and \
+                    self.has(base_type, partners[0], partners[1]):
+                found.append((apex, partners[0], partners[1]))
+        return found
+
+
 FAST_PLANETS = ['Moon', 'Mercury', 'Venus', 'Sun', 'Mars']
 SLOW_PLANETS = ['Jupiter', 'Saturn', 'Uranus', 'Neptune', 'Pluto', 'Chiron']
 PERSONAL_PLANETS = ['Sun', 'Mercury', 'Venus', 'Mars']
@@ -173,19 +239,13 @@ class PTITunedCalendar:
 
         swe.set_topo(longitude, latitude, 0)
 
-        chiron_available = False
-        try:
-            test_jd = swe.julday(2025, 1, 1, 12.0)
-            swe.calc_ut(test_jd, swe.CHIRON)
-            chiron_available = True
-        except:
-            pass
-
         planets_to_calc = PLANETS.copy()
-        if chiron_available:
+        if chiron_available():
             planets_to_calc['Chiron'] = swe.CHIRON
 
         try:
+            obliquity = swe.calc_ut(jd, swe.ECL_NUT)[0][0]
+
             for planet_name, planet_id in planets_to_calc.items():
                 result = swe.calc_ut(jd, planet_id, swe.FLG_SWIEPH | swe.FLG_TOPOCTR | swe.FLG_SPEED)
 
@@ -193,9 +253,6 @@ class PTITunedCalendar:
                 latitude_deg = result[0][1]
                 speed = result[0][3]
 
-                obliquity_result = swe.calc_ut(jd, swe.ECL_NUT)
-                obliquity = obliquity_result[0][0]
-
                 long_rad = math.radians(longitude_deg)
                 lat_rad = math.radians(latitude_deg)
                 obl_rad = math.radians(obliquity)
@@ -219,6 +276,13 @@ class PTITunedCalendar:
 
         return positions
 
+    def calculate_position_window(self, start_date, num_days, latitude=0.0, longitude=0.0):
+        """Positions for num_days consecutive days from start_date, each computed once."""
+        if isinstance(start_date, datetime):
+            start_date = start_date.date()
+        return [self.calculate_positions(start_date + timedelta(days=i), latitude, longitude)
+                for i in range(num_days)]
+
     def _calculate_positions_simple(self, target_date):
         jd = self.date_to_julian_day(target_date)
         planets = {
@@ -474,58 +538,19 @@ class PTITunedCalendar:
 
         return cinderella_found
 
-    def detect_planetary_geometry(self, all_aspects: List[AspectInfo]) -> Dict[str, Any]:
+    def detect_planetary_geometry(self, all_aspects: List[AspectInfo],
+                                  index: Optional[AspectIndex] = None) -> Dict[str, Any]:
+        index = index or AspectIndex(all_aspects)
         patterns = {'grand_trine': False, 'yod': False, 't_square': False}
-        longitude_aspects = [a for a in all_aspects if a.coordinate_type == 'longitude']
-
-        trine_aspects = [a for a in longitude_aspects if a.aspect_type == 'trine']
-        if len(trine_aspects) >= 3:
-            planets_in_trines = set()
-            for aspect in trine_aspects:
-                planets_in_trines.add(aspect.planet1)
-                planets_in_trines.add(aspect.planet2)
-            for p1 in planets_in_trines:
-                for p2 in planets_in_trines:
-                    for p3 in planets_in_trines:
-                        if len({p1, p2, p3}) == 3:
-                            has_all = (
-                                any(a for a in trine_aspects if {a.planet1, a.planet2} == {p1, p2}) and
-                                any(a for a in trine_aspects if {a.planet1, a.planet2} == {p2, p3}) and
-                                any(a for a in trine_aspects if {a.planet1, a.planet2} == {p1, p3})
-                            )
-                            if has_all:
-                                patterns['grand_trine'] = True
-                                break
-
-        quincunx_aspects = [a for a in longitude_aspects if a.aspect_type == 'quincunx']
-        sextile_aspects = [a for a in longitude_aspects if a.aspect_type == 'sextile']
-        if len(quincunx_aspects) >= 2 and len(sextile_aspects) >= 1:
-            for apex in set([a.planet1 for a in quincunx_aspects] + [a.planet2 for a in quincunx_aspects]):
-                quins_to_apex = [a for a in quincunx_aspects if apex in {a.planet1, a.planet2}]
-                if len(quins_to_apex) >= 2:
-                    base_planets = set()
-                    for q in quins_to_apex[:2]:
-                        base_planets.add(q.planet1 if q.planet2 == apex else q.planet2)
-                    if len(base_planets) == 2:
-                        has_sextile = any(a for a in sextile_aspects if set([a.planet1, a.planet2]) == base_planets)
-                        if has_sextile:
-                            patterns['yod'] = True
-                            break
-
-        square_aspects = [a for a in longitude_aspects if a.aspect_type == 'square']
-        opposition_aspects = [a for a in longitude_aspects if a.aspect_type == 'opposition']
-        if len(square_aspects) >= 2 and len(opposition_aspects) >= 1:
-            for apex in set([a.planet1 for a in square_aspects] + [a.planet2 for a in square_aspects]):
-                squares_to_apex = [a for a in square_aspects if apex in {a.planet1, a.planet2}]
-                if len(squares_to_apex) >= 2:
-                    base_planets = set()
-                    for s in squares_to_apex[:2]:
-                        base_planets.add(s.planet1 if s.planet2 == apex else s.planet2)
-                    if len(base_planets) == 2:
-                        has_opposition = any(a for a in opposition_aspects if set([a.planet1, a.planet2]) == base_planets)
-                        if has_opposition:
-                            patterns['t_square'] = True
-                            break
+
+        if index.count('trine') >= 3:
+            patterns['grand_trine'] = bool(index.triangles('trine'))
+
+        if index.count('quincunx') >= 2 and index.count('sextile') >= 1:
+            patterns['yod'] = bool(index.apex_patterns('quincunx', 'sextile'))
+
+        if index.count('square') >= 2 and index.count('opposition') >= 1:
+            patterns['t_square'] = bool(index.apex_patterns('square', 'opposition'))
 
         return patterns
 
@@ -576,24 +601,10 @@ class PTITunedCalendar:
 
         return enhancement_count, transcendent_count
 
-    def has_grand_trine(self, all_aspects: List[AspectInfo]) -> bool:
-        trine_aspects = [a for a in all_aspects if a.aspect_type == 'trine' and a.coordinate_type == 'longitude']
-        if len(trine_aspects) < 3:
-            return False
-        planets_in_trines = set()
-        for aspect in trine_aspects:
-            planets_in_trines.add(aspect.planet1)
-            planets_in_trines.add(aspect.planet2)
-        for p1 in planets_in_trines:
-            for p2 in planets_in_trines:
-                for p3 in planets_in_trines:
-                    if p1 != p2 and p2 != p3 and p1 != p3:
-                        has_t1 = any(a for a in trine_aspects if {a.planet1, a.planet2} == {p1, p2})
-                        has_t2 = any(a for a in trine_aspects if {a.planet1, a.planet2} == {p2, p3})
-                        has_t3 = any(a for a in trine_aspects if {a.planet1, a.planet2} == {p1, p3})
-                        if has_t1 and has_t2 and has_t3:
-                            return True
-        return False
+    def has_grand_trine(self, all_aspects: List[AspectInfo],
+                        index: Optional[AspectIndex] = None) -> bool:
+        index = index or AspectIndex(all_aspects)
+        return index.count('trine') >= 3 and bool(index.triangles('trine'))
 
     def get_super_parallels(self, all_aspects: List[AspectInfo]) -> List[str]:
         super_parallels = []
@@ -682,7 +693,7 @@ class PTITunedCalendar:
 
         return round(score, 2)
 
-    def classify_day(self, target_date) -> Dict[str, Any]:
+    def classify_day(self, target_date, positions_today=None, positions_tomorrow=None) -> Dict[str, Any]:
         """
         TUNED classification logic.
         
@@ -693,17 +704,22 @@ class PTITunedCalendar:
         
         Thresholds calibrated for:
           Best ~7%, Go ~32%, Normal ~37%, Slow ~14%, Worst ~10%
+
+        positions_today/positions_tomorrow may be passed in from a position
+        window (see generate_calendar); otherwise they are calculated here.
         """
         if isinstance(target_date, datetime):
             target_date = target_date.date()
         elif isinstance(target_date, str):
             target_date = datetime.strptime(target_date, "%Y-%m-%d").date()
 
-        positions_today = self.calculate_positions(target_date)
+        if positions_today is None:
+            positions_today = self.calculate_positions(target_date)
         if not positions_today:
             return {"date": str(target_date), "classification": "Error", "reason": "Position calculation failed"}
 
-        positions_tomorrow = self.calculate_positions(target_date + timedelta(days=1))
+        if positions_tomorrow is None:
+            positions_tomorrow = self.calculate_positions(target_date + timedelta(days=1))
 
         longitude_aspects = self.find_longitude_aspects(positions_today, positions_tomorrow)
         declination_aspects = self.find_declination_aspects(positions_today, positions_tomorrow)
@@ -722,11 +738,12 @@ class PTITunedCalendar:
                 "aspects": all_aspects
             }
 
-        geometry = self.detect_planetary_geometry(all_aspects)
+        aspect_index = AspectIndex(all_aspects)
+        geometry = self.detect_planetary_geometry(all_aspects, aspect_index)
         super_aspects_found = self.find_super_aspects(all_aspects)
         cinderella_aspects_found = self.find_cinderella_aspects(all_aspects)
         enhancement_count, transcendent_count = self.count_enhancements(all_aspects)
-        has_gt = self.has_grand_trine(all_aspects)
+        has_gt = self.has_grand_trine(all_aspects, aspect_index)
         super_parallels = self.get_super_parallels(all_aspects)
         day_score = self.calculate_day_score(all_aspects)
 
@@ -865,12 +882,14 @@ class PTITunedCalendar:
         elif isinstance(start_date, datetime):
             start_date = start_date.date()
 
-        current_date = start_date
-        for _ in range(num_days):
-            result = self.classify_day(current_date)
+        # Rolling window: day i uses positions[i] and positions[i + 1]
+        positions = self.calculate_position_window(start_date, num_days + 1)
+
+        for i in range(num_days):
+            current_date = start_date + timedelta(days=i)
+            result = self.classify_day(current_date, positions[i] or {}, positions[i + 1])
             result["classification_reason"] = result.get("reason", "")
             results.append(result)
-            current_date += timedelta(days=1)
 
         return results
 
@@ -0,0 +1,101 @@
+"""
+Natal Points Service
+
+Process-wide natal positions shared by the personal calendar and the
+microtransit engines. A NatalChart holds one birth moment (Julian day UT)
+and computes each position the first time it is asked for; charts are kept
+in an LRU keyed by (Julian day, ayanamsa mode), so the engines' natal setup
+runs once per person and process instead of on every scan.
+
+The engines convert birth times to Julian days in their own ways (fixed
+offset, New York wall clock, UT), so the chart is keyed by the resulting
+Julian day rather than by the raw birth data.
+"""
+
+import threading
+from collections import OrderedDict
+
+import swisseph as swe
+
+from core.instrumentation import increment
+
+# Cache Settings
+MAX_CACHED_CHARTS = 2048
+AYANAMSA_MODE = swe.SIDM_LAHIRI
+
+_charts = OrderedDict()
+_charts_lock = threading.Lock()
+
+
+class NatalChart:
+    """Natal positions for one birth moment, each computed once."""
+
+    def __init__(self, jd, ayanamsa_mode=AYANAMSA_MODE):
+        self.jd = jd
+        self.ayanamsa_mode = ayanamsa_mode
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _get(self, key, compute):
+        with self._lock:
+            if key not in self._values:
+                increment('ephemeris_calls')
+                self._values[key] = compute()
+            return self._values[key]
+
+    def longitude(self, body):
+        """Tropical longitude of a body (swe planet id)."""
+        return self._get(('tropical', body), lambda: float(swe.calc_ut(self.jd, body)[0][0]))
+
+    def sidereal_longitude(self, body, flags=0):
+        """
+        Sidereal longitude of a body from Swiss Ephemeris' sidereal mode.
+        Extra flags are part of the key: with the Moshier fallback, FLG_SPEED
+        changes the last digits of the longitude.
+        """
+        def compute():
+            swe.set_sid_mode(self.ayanamsa_mode, 0, 0)
+            return float(swe.calc_ut(self.jd, body, swe.FLG_SIDEREAL | flags)[0][0])
+        return self._get(('sidereal', body, flags), compute)
+
+    def ayanamsa_ut(self):
+        def compute():
+            swe.set_sid_mode(self.ayanamsa_mode, 0, 0)
+            return swe.get_ayanamsa_ut(self.jd)
+        return self._get('ayanamsa_ut', compute)
+
+    def ayanamsa(self):
+        """Ayanamsa for the Julian day read as ephemeris time (as swe.get_ayanamsa)."""
+        def compute():
+            swe.set_sid_mode(self.ayanamsa_mode, 0, 0)
+            return swe.get_ayanamsa(self.jd)
+        return self._get('ayanamsa', compute)
+
+    def fixed_star(self, name):
+        """Tropical longitude of a fixed star."""
+        return self._get(('star', name), lambda: float(swe.fixstar_ut(name, self.jd)[0][0]))
+
+    def ascendant(self, latitude, longitude):
+        """Tropical Placidus ascendant at the birth location."""
+        key = ('ascendant', float(latitude), float(longitude))
+        return self._get(key, lambda: float(swe.houses(self.jd, latitude, longitude, b'P')[1][0]))
+
+
+def natal_chart(jd, ayanamsa_mode=AYANAMSA_MODE):
+    """The cached NatalChart for a birth Julian day (UT)."""
+    key = (float(jd), ayanamsa_mode)
+    with _charts_lock:
+        chart = _charts.get(key)
+        if chart is None:
+            chart = _charts[key] = NatalChart(float(jd), ayanamsa_mode)
+            while len(_charts) > MAX_CACHED_CHARTS:
+                _charts.popitem(last=False)
+        else:
+            _charts.move_to_end(key)
+        return chart
+
+
+def clear_cache():
+    """Drop every cached natal chart."""
+    with _charts_lock:
+        _charts.clear()
@@ -11,15 +11,16 @@ covering all combinations of bird, weekday, paksha, and day/night periods.
 
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Any, Optional
+import csv
 import logging
 import os
-import pandas as pd
 from .data import (
     BIRD_SEQUENCES, ACTIVITY_ORDERS, RULING_DAYS_TABLE, DEATH_DAYS_TABLE,
     DAY_RATING, NIGHT_RATING, FRIENDS, ENEMIES, RATING_MAP, BIRD_EMOJIS,
     ACTIVITY_EMOJIS, DEFAULT_LOCATION
 )
 from .ephemeris import EphemerisCalculator
+from ..instrumentation import log_event
 
 logger = logging.getLogger(__name__)
 
@@ -31,46 +32,85 @@ WEEKDAY_INDEX_MAP = {'Sunday': 0, 'Monday': 1, 'Tuesday': 2, 'Wednesday': 3, 'Th
 PAKSHA_INDEX_MAP = {'Shukla': 0, 'Krishna': 1}
 
 DB_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pancha_pakshi_db.csv')
-_cached_db = None
 
-def get_database():
-    """Load and cache the Panch Pakshi database"""
-    global _cached_db
-    if _cached_db is None:
-        try:
-            _cached_db = pd.read_csv(DB_FILE_PATH, index_col=None, encoding='utf-8')
-            logger.info(f"Loaded Panch Pakshi database with {len(_cached_db)} rows")
-        except Exception as e:
-            logger.error(f"Failed to load database: {e}")
-            _cached_db = pd.DataFrame()
-    return _cached_db
+# Dense lookup table: one tuple of 25 rows per (weekday, paksha, daynight, bird)
+WEEKDAY_COUNT, PAKSHA_COUNT, DAYNIGHT_COUNT, BIRD_COUNT = 7, 2, 2, 5
+
+
+def _table_slot(weekday_index: int, paksha_index: int, daynight_index: int, bird_index: int) -> int:
+    return ((weekday_index * PAKSHA_COUNT + paksha_index) * DAYNIGHT_COUNT + daynight_index) * BIRD_COUNT + bird_index
+
+
+def _load_lookup_table() -> tuple:
+    """Compile the Panch Pakshi CSV into the dense lookup table (rows keep CSV order)."""
+    slots = [[] for _ in range(WEEKDAY_COUNT * PAKSHA_COUNT * DAYNIGHT_COUNT * BIRD_COUNT)]
+    try:
+        with open(DB_FILE_PATH, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader)
+            row_count = 0
+            for record in reader:
+                # Floats throughout, as the rows were returned before
+                row = tuple(float(v) for v in record)
+                slots[_table_slot(int(row[0]), int(row[1]), int(row[2]), int(row[3]))].append(row)
+                row_count += 1
+        logger.info(f"Loaded Panch Pakshi database with {row_count} rows")
+    except Exception as e:
+        logger.error(f"Failed to load database: {e}")
+        slots = [[] for _ in slots]
+    return tuple(tuple(rows) for rows in slots)
+
+
+_lookup_table = _load_lookup_table()
 
-def query_database(bird_index: int, weekday_index: int, paksha_index: int, daynight_index: int) -> list:
-    """Query the database for bird periods based on parameters"""
-    db = get_database()
-    if db.empty:
-        return []
-    
-    results = db[
-        (db.iloc[:, 3] == bird_index) &
-        (db.iloc[:, 0] == weekday_index) &
-        (db.iloc[:, 1] == paksha_index) &
-        (db.iloc[:, 2] == daynight_index)
-    ]
-    return results.values.tolist()
+
+def query_database(bird_index: int, weekday_index: int, paksha_index: int, daynight_index: int) -> tuple:
+    """Rows for bird periods based on parameters (shared tuples; do not modify)"""
+    if not (0 <= weekday_index < WEEKDAY_COUNT and 0 <= paksha_index < PAKSHA_COUNT and
+            0 <= daynight_index < DAYNIGHT_COUNT and 0 <= bird_index < BIRD_COUNT):
+        return ()
+    return _lookup_table[_table_slot(weekday_index, paksha_index, daynight_index, bird_index)]
 
 class PanchPakshiCalculator:
     """
     Main calculator for Panch Pakshi calculations.
     """
     
+    # Result keys batch callers read; other keys (tithi, planetary positions,
+    # current period, formatted sun times) are skipped when fields=PERIOD_FIELDS
+    PERIOD_FIELDS = ('date', 'weekday', 'paksha', 'birth_star', 'birth_bird',
+                     'day_periods', 'night_periods')
+
     def __init__(self):
         """Initialize the calculator with ephemeris calculator."""
         self.ephemeris = EphemerisCalculator()
-        
+        self._birth_birds = {}
+
+    def calculate_birth_bird(self, birth_datetime: datetime, latitude: float,
+                             longitude: float, timezone: str) -> Tuple[str, str]:
+        """
+        Birth star and birth bird for a birth moment, calculated once per calculator.
+
+        Args:
+            birth_datetime: Local birth date and time
+            latitude: Birth latitude in degrees
+            longitude: Birth longitude in degrees
+            timezone: Timezone string of the birth place
+
+        Returns:
+            Tuple of (nakshatra_name, birth_bird)
+        """
+        key = (birth_datetime, latitude, longitude, timezone)
+        if key not in self._birth_birds:
+            self._birth_birds[key] = self.ephemeris.calculate_birth_star(
+                birth_datetime, birth_datetime, latitude, longitude, timezone
+            )
+        return self._birth_birds[key]
+
     def calculate_bird_periods(self, date: datetime, time: datetime, 
                              latitude: float, longitude: float, 
-                             timezone: str) -> Dict[str, Any]:
+                             timezone: str, fields: Optional[Tuple[str, ...]] = None,
+                             birth: Optional[Tuple[str, str]] = None) -> Dict[str, Any]:
         """
         Calculate complete Panch Pakshi data for a given date, time, and location.
         
@@ -80,6 +120,9 @@ class PanchPakshiCalculator:
             latitude: Latitude in degrees
             longitude: Longitude in degrees
             timezone: Timezone string
+            fields: Result keys to calculate (default: all), e.g. PERIOD_FIELDS
+            birth: (birth_star, birth_bird) from calculate_birth_bird; calculated
+                from date and time when omitted
             
         Returns:
             Dictionary containing all calculated data
@@ -107,9 +150,12 @@ class PanchPakshiCalculator:
             dying_bird_night = DEATH_DAYS_TABLE[paksha]['Night'][weekday]
             
             # Calculate birth star (nakshatra) and birth bird FIRST for database lookup
-            birth_star, birth_bird = self.ephemeris.calculate_birth_star(
-                date, time, latitude, longitude, timezone
-            )
+            if birth:
+                birth_star, birth_bird = birth
+            else:
+                birth_star, birth_bird = self.ephemeris.calculate_birth_star(
+                    date, time, latitude, longitude, timezone
+                )
             
             # Calculate day periods using database lookup
             day_periods = self._calculate_periods(
@@ -125,57 +171,58 @@ class PanchPakshiCalculator:
                 weekday=weekday, birth_bird=birth_bird
             )
             
-            # Determine current period
-            current_period = self._find_current_period(
-                time, day_periods, night_periods
-            )
-            
-            # Get planetary positions
-            planets = self.ephemeris.get_planetary_positions(date)
-            
-            # Calculate tithi
-            tithi_number, tithi_name = self.ephemeris.calculate_lunar_tithi(date)
+            def tithi():
+                tithi_number, tithi_name = self.ephemeris.calculate_lunar_tithi(date)
+                return {
+                    'number': tithi_number,
+                    'name': tithi_name
+                }
             
-            result = {
-                'date': date.strftime('%Y-%m-%d'),
-                'time': time.strftime('%H:%M:%S'),
-                'location': {
+            # Each remaining key is only calculated when requested
+            builders = {
+                'date': lambda: date.strftime('%Y-%m-%d'),
+                'time': lambda: time.strftime('%H:%M:%S'),
+                'location': lambda: {
                     'latitude': latitude,
                     'longitude': longitude,
                     'timezone': timezone
                 },
-                'paksha': paksha,
-                'tithi': {
-                    'number': tithi_number,
-                    'name': tithi_name
-                },
-                'weekday': weekday,
-                'birth_star': birth_star,
-                'birth_bird': birth_bird,
-                'sun_times': {
+                'paksha': lambda: paksha,
+                'tithi': tithi,
+                'weekday': lambda: weekday,
+                'birth_star': lambda: birth_star,
+                'birth_bird': lambda: birth_bird,
+                'sun_times': lambda: {
                     'sunrise': sun_times['sunrise'].strftime('%H:%M:%S'),
                     'sunset': sun_times['sunset'].strftime('%H:%M:%S'),
                     'next_sunrise': sun_times['next_sunrise'].strftime('%H:%M:%S'),
                     'day_duration': str(sun_times['day_duration']),
                     'night_duration': str(sun_times['night_duration'])
                 },
-                'ruling_birds': {
+                'ruling_birds': lambda: {
                     'day': ruling_bird_day,
                     'night': ruling_bird_night
                 },
-                'dying_birds': {
+                'dying_birds': lambda: {
                     'day': dying_bird_day,
                     'night': dying_bird_night
                 },
-                'day_periods': day_periods,
-                'night_periods': night_periods,
-                'current_period': current_period,
-                'planetary_positions': planets
+                'day_periods': lambda: day_periods,
+                'night_periods': lambda: night_periods,
+                # Determine current period
+                'current_period': lambda: self._find_current_period(
+                    time, day_periods, night_periods
+                ),
+                # Get planetary positions
+                'planetary_positions': lambda: self.ephemeris.get_planetary_positions(date),
             }
+            result = {key: build() for key, build in builders.items()
+                      if fields is None or key in fields}
             
-            logger.info(f"Calculated Panch Pakshi data for {date.date()} "
-                       f"at {time.strftime('%H:%M')} - Paksha: {paksha}, "
-                       f"Current: {current_period['bird'] if current_period else 'None'}")
+            if logger.isEnabledFor(logging.DEBUG):
+                current_period = result.get('current_period')
+                log_event(logger, logging.DEBUG, 'panch_pakshi.day', date=date.date(), time=time.strftime('%H:%M'),
+                          paksha=paksha, current=current_period['bird'] if current_period else None)
             
             return result
             
@@ -716,7 +763,8 @@ class PanchPakshiCalculator:
                 # Calculate full day data
                 day_result = self.calculate_bird_periods(
                     current_date, datetime.combine(current_date.date(), datetime.min.time()),
-                    latitude, longitude, timezone
+                    latitude, longitude, timezone, fields=self.PERIOD_FIELDS,
+                    birth=(birth_star, birth_bird)
                 )
                 
                 # Extract birth bird periods from both day and night
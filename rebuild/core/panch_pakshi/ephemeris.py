@@ -6,12 +6,11 @@ Provides precise sunrise/sunset times and lunar paksha calculations.
 """
 
 import swisseph as swe
-from astral import LocationInfo
-from astral.sun import sun
 from datetime import datetime, timedelta
 import pytz
 import logging
 from typing import Dict, Tuple, Any
+from ..solar_events import sun_times
 
 logger = logging.getLogger(__name__)
 
@@ -48,32 +47,8 @@ class EphemerisCalculator:
             Dictionary containing sunrise and sunset times
         """
         try:
-            # Create location info
-            location = LocationInfo(
-                name="Location", 
-                timezone=timezone, 
-                latitude=latitude, 
-                longitude=longitude
-            )
-            
-            # Get timezone
-            tz = pytz.timezone(timezone)
-            
-            # Calculate sun times
-            sun_times = sun(location.observer, date=date.date(), tzinfo=tz)
-            
-            # Calculate next day's sunrise for night calculations
-            next_sunrise = sun(location.observer, 
-                             date=date.date() + timedelta(days=1), 
-                             tzinfo=tz)['sunrise']
-            
-            result = {
-                'sunrise': sun_times['sunrise'],
-                'sunset': sun_times['sunset'],
-                'next_sunrise': next_sunrise,
-                'day_duration': sun_times['sunset'] - sun_times['sunrise'],
-                'night_duration': next_sunrise - sun_times['sunset']
-            }
+            # Cached per location and date; the next sunrise is the following day's
+            result = sun_times(date, latitude, longitude, timezone)
             
             logger.debug(f"Calculated sun times for {date.date()}: "
                         f"sunrise={result['sunrise'].strftime('%H:%M')}, "
@@ -0,0 +1,122 @@
+"""
+Solar Events Service
+
+Process-wide sunrise/sunset and timezone lookups shared by the bird batch
+and dashboard generators:
+- one TimezoneFinder per process, with an LRU of rounded coordinates
+- sunrise/sunset cached per location and date, so day N+1's sunrise is
+  reused as the end of day N's night instead of being calculated twice
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date as date_type, datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+import pytz
+from astral import Observer
+from astral.sun import sunrise, sunset
+
+# Cache Settings
+COORDINATE_PRECISION = 4  # decimal places (~11 m) for timezone lookups
+MAX_CACHED_TIMEZONES = 4096
+MAX_CACHED_SUN_DAYS = 20000
+
+_tz_finder = None
+_tz_finder_lock = threading.Lock()
+
+_sun_days = OrderedDict()
+_sun_lock = threading.Lock()
+
+
+def get_timezone_finder():
+    """The process-wide TimezoneFinder (its polygon data is loaded once)."""
+    global _tz_finder
+    with _tz_finder_lock:
+        if _tz_finder is None:
+            from timezonefinder import TimezoneFinder
+            _tz_finder = TimezoneFinder()
+        return _tz_finder
+
+
+@lru_cache(maxsize=MAX_CACHED_TIMEZONES)
+def _timezone_at_rounded(latitude: float, longitude: float) -> Optional[str]:
+    finder = get_timezone_finder()
+    with _tz_finder_lock:
+        return finder.timezone_at(lat=latitude, lng=longitude)
+
+
+def timezone_at(latitude: float, longitude: float) -> Optional[str]:
+    """IANA timezone name at the coordinates (None if unknown)."""
+    return _timezone_at_rounded(round(float(latitude), COORDINATE_PRECISION),
+                                round(float(longitude), COORDINATE_PRECISION))
+
+
+@lru_cache(maxsize=256)
+def _pytz_timezone(timezone: str):
+    return pytz.timezone(timezone)
+
+
+def _location_key(latitude: float, longitude: float, timezone: str) -> tuple:
+    return (float(latitude), float(longitude), timezone)
+
+
+def _sun_day(location: tuple, day: date_type) -> Tuple[datetime, datetime]:
+    """Cached (sunrise, sunset) for one local date."""
+    key = location + (day,)
+    with _sun_lock:
+        if key in _sun_days:
+            _sun_days.move_to_end(key)
+            return _sun_days[key]
+
+    latitude, longitude, timezone = location
+    observer = Observer(latitude=latitude, longitude=longitude)
+    tz = _pytz_timezone(timezone)
+    times = (sunrise(observer, day, tz), sunset(observer, day, tz))
+
+    with _sun_lock:
+        _sun_days[key] = times
+        if len(_sun_days) > MAX_CACHED_SUN_DAYS:
+            _sun_days.popitem(last=False)
+    return times
+
+
+def sun_times(date, latitude: float, longitude: float, timezone: str) -> Dict[str, object]:
+    """
+    Sunrise, sunset and next sunrise for a date, as calculate_sunrise_sunset
+    returns them. The next sunrise comes from the cached following day.
+    """
+    day = date.date() if isinstance(date, datetime) else date
+    location = _location_key(latitude, longitude, timezone)
+    sunrise_time, sunset_time = _sun_day(location, day)
+    next_sunrise = _sun_day(location, day + timedelta(days=1))[0]
+    return {
+        'sunrise': sunrise_time,
+        'sunset': sunset_time,
+        'next_sunrise': next_sunrise,
+        'day_duration': sunset_time - sunrise_time,
+        'night_duration': next_sunrise - sunset_time
+    }
+
+
+def sun_times_for_range(start_date, num_days: int, latitude: float, longitude: float,
+                        timezone: str) -> Tuple[List[datetime], List[datetime]]:
+    """
+    Sunrises and sunsets for num_days + 1 consecutive days from start_date.
+
+    Day N runs from sunrises[N] to sunsets[N], its night from sunsets[N] to
+    sunrises[N + 1]. Every day is cached, so later sun_times calls for the
+    range are lookups.
+    """
+    day = start_date.date() if isinstance(start_date, datetime) else start_date
+    location = _location_key(latitude, longitude, timezone)
+    days = [_sun_day(location, day + timedelta(days=i)) for i in range(num_days + 1)]
+    return [d[0] for d in days], [d[1] for d in days]
+
+
+def clear_cache():
+    """Drop the cached sun times and timezone lookups."""
+    with _sun_lock:
+        _sun_days.clear()
+    _timezone_at_rounded.cache_clear()
@@ -3,57 +3,331 @@ Calendar Database Manager - PostgreSQL-based replacement for Replit KV
 """
 
 import json
+import os
 import secrets
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from .models import db, CalendarData, SubscriptionToken, UserProfile, ManualCalendarEntry
+from flask import g, has_app_context
+from .models import db, CalendarData, CalendarSection, SubscriptionToken, UserProfile, ManualCalendarEntry, CollectiveDayCache
+from .models import MicrotransitEvent, MicrotransitCoverage, MicroBirdEvent, MicroBirdRun
+
+
+CALENDARS_PREFIX = 'calendars.'
+
+# Loaded calendar data is kept per (user, version, sections) for this long;
+# a save changes the version, so entries never go stale within the TTL
+CALENDAR_CACHE_SECONDS = float(os.environ.get('CALENDAR_CACHE_SECONDS', '30'))
+MAX_CACHED_CALENDARS = 64
+
+_calendar_cache = OrderedDict()
+_calendar_cache_lock = threading.Lock()
+
+
+def _to_json(value):
+    return json.loads(json.dumps(value, default=str))
+
+
+def split_sections(calendar_data):
+    """{section: value} for calendar data: top-level keys, one 'calendars.<name>' per calendar."""
+    sections = {}
+    for key, value in (calendar_data or {}).items():
+        if key == 'calendars' and isinstance(value, dict):
+            for name, calendar in value.items():
+                sections[CALENDARS_PREFIX + name] = calendar
+        else:
+            sections[key] = value
+    return sections
+
+
+def join_sections(rows):
+    """Calendar data from (section, value) pairs."""
+    calendar_data = {}
+    for section, value in rows:
+        if section.startswith(CALENDARS_PREFIX):
+            calendar_data.setdefault('calendars', {})[section[len(CALENDARS_PREFIX):]] = value
+        else:
+            calendar_data[section] = value
+    return calendar_data
+
+
+def _wanted(section, sections):
+    return section in sections or ('calendars' in sections and section.startswith(CALENDARS_PREFIX))
+
+
+def _sections_key(sections):
+    return None if sections is None else tuple(sorted(set(sections)))
+
+
+def _copy_json(value):
+    """Copy of JSON-shaped data (dicts, lists, scalars), cheaper than copy.deepcopy."""
+    if isinstance(value, dict):
+        return {k: _copy_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_json(v) for v in value]
+    return value
+
+
+def _request_memo():
+    """Calendar lookups of the current request (None outside an app context)."""
+    if not has_app_context():
+        return None
+    if '_calendar_memo' not in g:
+        g._calendar_memo = {}
+    return g._calendar_memo
+
+
+def _cached_calendar(user_email, version, sections_key):
+    """A copy of cached calendar data, from an entry for the same sections or the full data."""
+    now = time.monotonic()
+    with _calendar_cache_lock:
+        for key in ((user_email, version, sections_key), (user_email, version, None)):
+            cached = _calendar_cache.get(key)
+            if cached is None:
+                continue
+            if cached[0] < now:
+                del _calendar_cache[key]
+                continue
+            _calendar_cache.move_to_end(key)
+            data = cached[1]
+            break
+        else:
+            return None
+    if key[2] != sections_key:
+        data = join_sections(
+            (section, value) for section, value in split_sections(data).items()
+            if _wanted(section, sections_key)
+        )
+    return _copy_json(data)
+
+
+def _cache_calendar(user_email, version, sections_key, data):
+    with _calendar_cache_lock:
+        _calendar_cache[(user_email, version, sections_key)] = (time.monotonic() + CALENDAR_CACHE_SECONDS, data)
+        while len(_calendar_cache) > MAX_CACHED_CALENDARS:
+            _calendar_cache.popitem(last=False)
+
+
+def _forget_calendar(user_email):
+    """Drop a user's cached calendar data after it was written."""
+    memo = _request_memo()
+    if memo is not None:
+        for key in [k for k in memo if k[1] == user_email]:
+            del memo[key]
+    with _calendar_cache_lock:
+        for key in [k for k in _calendar_cache if k[0] == user_email]:
+            del _calendar_cache[key]
+
+
+def clear_calendar_cache():
+    """Drop every cached calendar."""
+    with _calendar_cache_lock:
+        _calendar_cache.clear()
+
+
+def _section_filter(sections):
+    conditions = [CalendarSection.section.in_(list(sections))]
+    if 'calendars' in sections:
+        conditions.append(CalendarSection.section.like(CALENDARS_PREFIX + '%'))
+    return db.or_(*conditions)
+
 
 
 class CalendarDatabaseManager:
 
+    def _calendar_header(self, user_email):
+        return CalendarData.query.filter_by(
+            user_email=user_email, calendar_type='dashboard'
+        ).order_by(CalendarData.created_at.desc()).first()
+
+    def _write_sections(self, user_email, sections, now, replace=False):
+        """Stage section rows; replace drops the user's sections not in sections."""
+        if replace:
+            CalendarSection.query.filter_by(
+                user_email=user_email, calendar_type='dashboard'
+            ).delete(synchronize_session=False)
+        for section, value in sections.items():
+            value = _to_json(value)
+            updated = 0 if replace else CalendarSection.query.filter_by(
+                user_email=user_email, calendar_type='dashboard', section=section
+            ).update({'section_json': value, 'updated_at': now}, synchronize_session=False)
+            if not updated:
+                db.session.add(CalendarSection(
+                    user_email=user_email, calendar_type='dashboard', section=section,
+                    section_json=value, updated_at=now,
+                ))
+
+    def _stage_header(self, user_email, entry, now):
+        """Bump the header row's version, moving a legacy blob into sections first."""
+        if entry is None:
+            db.session.add(CalendarData(
+                user_email=user_email,
+                calendar_type='dashboard',
+                date_range_start=now.date(),
+                date_range_end=(now + timedelta(days=90)).date(),
+                calendar_json={},
+                created_at=now,
+            ))
+            return
+        if entry.calendar_json:
+            self._write_sections(user_email, split_sections(entry.calendar_json), now, replace=True)
+            entry.calendar_json = {}
+        entry.created_at = now
+
     def save_calendar_data(self, user_email, calendar_data):
         try:
-            serialized = json.dumps(calendar_data, default=str)
-            existing = CalendarData.query.filter_by(
-                user_email=user_email, calendar_type='dashboard'
-            ).first()
-            if existing:
-                existing.calendar_json = json.loads(serialized)
-                existing.created_at = datetime.utcnow()
-            else:
-                new_entry = CalendarData(
-                    user_email=user_email,
-                    calendar_type='dashboard',
-                    date_range_start=datetime.utcnow().date(),
-                    date_range_end=(datetime.utcnow() + timedelta(days=90)).date(),
-                    calendar_json=json.loads(serialized),
-                )
-                db.session.add(new_entry)
+            now = datetime.utcnow()
+            entry = self._calendar_header(user_email)
+            if entry is not None:
+                entry.calendar_json = {}
+            self._stage_header(user_email, entry, now)
+            self._write_sections(user_email, split_sections(calendar_data), now, replace=True)
             db.session.commit()
+            _forget_calendar(user_email)
             return True
         except Exception as e:
             print(f"Error saving calendar data: {e}")
             db.session.rollback()
             return False
 
-    def get_calendar_data(self, user_email):
+    def save_calendar_sections(self, user_email, sections):
+        """Upsert only the given sections ({section: value}), leaving the rest untouched."""
         try:
-            entry = CalendarData.query.filter_by(
-                user_email=user_email, calendar_type='dashboard'
-            ).order_by(CalendarData.created_at.desc()).first()
-            if entry:
-                return entry.calendar_json
+            now = datetime.utcnow()
+            self._stage_header(user_email, self._calendar_header(user_email), now)
+            self._write_sections(user_email, sections, now)
+            db.session.commit()
+            _forget_calendar(user_email)
+            return True
+        except Exception as e:
+            print(f"Error saving calendar sections: {e}")
+            db.session.rollback()
+            return False
+
+    def get_calendar_data(self, user_email, sections=None):
+        """
+        The user's calendar data, or None. With sections (top-level keys,
+        'calendars.<name>', or 'calendars' for every calendar) only those
+        rows are loaded; the result keeps the full data's shape.
+
+        Repeated calls in a request return the same object; across requests
+        data is served from a short-lived cache keyed by the saved version.
+        """
+        version = self.get_calendar_version(user_email)
+        if version is None:
             return None
+        sections_key = _sections_key(sections)
+        memo = _request_memo()
+        memo_key = ('data', user_email, version, sections_key)
+        if memo is not None and memo_key in memo:
+            return memo[memo_key]
+
+        data = _cached_calendar(user_email, version, sections_key)
+        if data is None:
+            data = self._load_calendar_data(user_email, sections)
+            if data is None:
+                return None
+            _cache_calendar(user_email, version, sections_key, data)
+            data = _copy_json(data)
+        if memo is not None:
+            memo[memo_key] = data
+        return data
+
+    def _load_calendar_data(self, user_email, sections=None):
+        try:
+            query = CalendarSection.query.filter_by(user_email=user_email, calendar_type='dashboard')
+            if sections is not None:
+                query = query.filter(_section_filter(sections))
+            rows = query.with_entities(CalendarSection.section, CalendarSection.section_json).all()
+            if rows:
+                return join_sections(rows)
+
+            entry = self._calendar_header(user_email)
+            if entry is None:
+                return None
+            # Saved before the section layout
+            legacy = entry.calendar_json or {}
+            if sections is None:
+                return legacy
+            return join_sections(
+                (section, value) for section, value in split_sections(legacy).items()
+                if _wanted(section, sections)
+            )
         except Exception as e:
             print(f"Error loading calendar data: {e}")
             db.session.rollback()
             return None
 
+    def save_calendar_data_batch(self, records, chunk_size=50):
+        """
+        Save calendar data for many users ({user_email: data}), one
+        transaction per chunk_size users. Returns the saved user emails.
+        """
+        saved = []
+        emails = list(records)
+        for i in range(0, len(emails), chunk_size):
+            chunk = emails[i:i + chunk_size]
+            try:
+                existing = {}
+                for entry in CalendarData.query.filter(
+                    CalendarData.user_email.in_(chunk),
+                    CalendarData.calendar_type == 'dashboard',
+                ).all():
+                    existing.setdefault(entry.user_email, entry)
+
+                now = datetime.utcnow()
+                CalendarSection.query.filter(
+                    CalendarSection.user_email.in_(chunk),
+                    CalendarSection.calendar_type == 'dashboard',
+                ).delete(synchronize_session=False)
+                for user_email in chunk:
+                    entry = existing.get(user_email)
+                    if entry is not None:
+                        entry.calendar_json = {}
+                    self._stage_header(user_email, entry, now)
+                    for section, value in split_sections(records[user_email]).items():
+                        db.session.add(CalendarSection(
+                            user_email=user_email, calendar_type='dashboard', section=section,
+                            section_json=_to_json(value), updated_at=now,
+                        ))
+                db.session.commit()
+                for user_email in chunk:
+                    _forget_calendar(user_email)
+                saved.extend(chunk)
+            except Exception as e:
+                print(f"Error saving calendar data batch: {e}")
+                db.session.rollback()
+        return saved
+
+    def get_calendar_version(self, user_email):
+        """When the user's calendar data was last saved (once per request), without loading the JSON."""
+        memo = _request_memo()
+        if memo is not None and ('version', user_email) in memo:
+            return memo[('version', user_email)]
+        try:
+            row = db.session.query(CalendarData.created_at).filter_by(
+                user_email=user_email, calendar_type='dashboard'
+            ).order_by(CalendarData.created_at.desc()).first()
+            version = row[0] if row else None
+            if memo is not None:
+                memo[('version', user_email)] = version
+            return version
+        except Exception as e:
+            print(f"Error loading calendar version: {e}")
+            db.session.rollback()
+            return None
+
     def clear_calendar_data(self, user_email, year=None, month=None):
         try:
+            CalendarSection.query.filter_by(
+                user_email=user_email, calendar_type='dashboard'
+            ).delete()
             CalendarData.query.filter_by(
                 user_email=user_email, calendar_type='dashboard'
             ).delete()
             db.session.commit()
+            _forget_calendar(user_email)
             return True
         except Exception:
             db.session.rollback()
@@ -81,26 +355,10 @@ class CalendarDatabaseManager:
 
 
     def update_background_days(self, user_email, background_days):
-        try:
-            saved = self.get_calendar_data(user_email)
-            if saved is None:
-                saved = {}
-            saved['background_days'] = background_days
-            return self.save_calendar_data(user_email, saved)
-        except Exception as e:
-            print(f"Error updating background days: {e}")
-            return False
+        return self.save_calendar_sections(user_email, {'background_days': background_days})
 
     def save_precision_timing(self, user_email, precision_data):
-        try:
-            saved = self.get_calendar_data(user_email)
-            if saved is None:
-                saved = {}
-            saved['precision_timing'] = precision_data
-            return self.save_calendar_data(user_email, saved)
-        except Exception as e:
-            print(f"Error saving precision timing: {e}")
-            return False
+        return self.save_calendar_sections(user_email, {'precision_timing': precision_data})
 
 
     def get_manual_calendar(self, calendar_type, category, start_date, end_date):
@@ -177,4 +435,169 @@ class CalendarDatabaseManager:
             return False
 
 
+    def get_collective_days(self, calendar_type, version, start_date, end_date):
+        try:
+            entries = CollectiveDayCache.query.filter(
+                CollectiveDayCache.calendar_type == calendar_type,
+                CollectiveDayCache.version == version,
+                CollectiveDayCache.date >= start_date,
+                CollectiveDayCache.date <= end_date,
+            ).all()
+            return {e.date.isoformat(): e.day_json for e in entries}
+        except Exception as e:
+            print(f"Error loading collective days: {e}")
+            db.session.rollback()
+            return {}
+
+    def save_collective_days(self, calendar_type, version, days):
+        try:
+            from datetime import date as date_type
+            dates = [date_type.fromisoformat(d) for d in days]
+            CollectiveDayCache.query.filter(
+                CollectiveDayCache.calendar_type == calendar_type,
+                CollectiveDayCache.date.in_(dates),
+            ).delete(synchronize_session=False)
+            for day_date, day_data in zip(dates, days.values()):
+                db.session.add(CollectiveDayCache(
+                    calendar_type=calendar_type,
+                    date=day_date,
+                    version=version,
+                    day_json=day_data,
+                ))
+            db.session.commit()
+            return True
+        except Exception as e:
+            print(f"Error saving collective days: {e}")
+            db.session.rollback()
+            return False
+
+
+    def get_transit_coverage(self, subject, engine, params_hash):
+        try:
+            coverage = MicrotransitCoverage.query.filter_by(
+                subject=subject, engine=engine, params_hash=params_hash
+            ).first()
+            if coverage:
+                return coverage.range_start, coverage.range_end, coverage.resume_at or coverage.range_end
+            return None
+        except Exception as e:
+            print(f"Error loading transit coverage: {e}")
+            db.session.rollback()
+            return None
+
+    def get_transit_events(self, subject, engine, params_hash, start, end):
+        """Stored events overlapping [start, end], ordered by start."""
+        try:
+            entries = MicrotransitEvent.query.filter(
+                MicrotransitEvent.subject == subject,
+                MicrotransitEvent.engine == engine,
+                MicrotransitEvent.params_hash == params_hash,
+                MicrotransitEvent.start <= end,
+                MicrotransitEvent.end >= start,
+            ).order_by(MicrotransitEvent.start, MicrotransitEvent.id).all()
+            return [(e.transit_code, e.start, e.end, e.event_json) for e in entries]
+        except Exception as e:
+            print(f"Error loading transit events: {e}")
+            db.session.rollback()
+            return []
+
+    def save_transit_events(self, subject, engine, params_hash, events, range_start, range_end,
+                            replace=False, resume_at=None):
+        """
+        Add events ((transit_code, start, end, event_json) tuples) and record
+        [range_start, range_end] as the computed window, with resume_at the
+        earliest start of a transit still open at range_end (default
+        range_end). With replace, stored events overlapping the window are
+        deleted first.
+        """
+        resume_at = resume_at or range_end
+        try:
+            if replace:
+                MicrotransitEvent.query.filter(
+                    MicrotransitEvent.subject == subject,
+                    MicrotransitEvent.engine == engine,
+                    MicrotransitEvent.params_hash == params_hash,
+                    MicrotransitEvent.start <= range_end,
+                    MicrotransitEvent.end >= range_start,
+                ).delete(synchronize_session=False)
+            for transit_code, start, end, event_json in events:
+                db.session.add(MicrotransitEvent(
+                    subject=subject,
+                    engine=engine,
+                    params_hash=params_hash,
+                    transit_code=transit_code,
+                    start=start,
+                    end=end,
+                    event_json=event_json,
+                ))
+
+            coverage = MicrotransitCoverage.query.filter_by(
+                subject=subject, engine=engine, params_hash=params_hash
+            ).first()
+            if coverage:
+                coverage.range_start = range_start
+                coverage.range_end = range_end
+                coverage.resume_at = resume_at
+                coverage.updated_at = datetime.utcnow()
+            else:
+                db.session.add(MicrotransitCoverage(
+                    subject=subject,
+                    engine=engine,
+                    params_hash=params_hash,
+                    range_start=range_start,
+                    range_end=range_end,
+                    resume_at=resume_at,
+                ))
+            db.session.commit()
+            return True
+        except Exception as e:
+            print(f"Error saving transit events: {e}")
+            db.session.rollback()
+            return False
+
+    def get_microbird_fingerprint(self, subject):
+        try:
+            run = MicroBirdRun.query.filter_by(subject=subject).first()
+            return run.fingerprint if run else None
+        except Exception as e:
+            print(f"Error loading MicroBird run: {e}")
+            db.session.rollback()
+            return None
+
+    def get_microbird_events(self, subject, start_date):
+        try:
+            entries = MicroBirdEvent.query.filter(
+                MicroBirdEvent.subject == subject,
+                MicroBirdEvent.date >= start_date,
+            ).order_by(MicroBirdEvent.start, MicroBirdEvent.id).all()
+            return [e.to_dict() for e in entries]
+        except Exception as e:
+            print(f"Error loading MicroBird events: {e}")
+            db.session.rollback()
+            return []
+
+    def save_microbird_events(self, subject, fingerprint, start_date, events):
+        """Replace the subject's events from start_date on; earlier events are kept."""
+        try:
+            MicroBirdEvent.query.filter(
+                MicroBirdEvent.subject == subject,
+                MicroBirdEvent.date >= start_date,
+            ).delete(synchronize_session=False)
+            for event in events:
+                db.session.add(MicroBirdEvent(subject=subject, **event))
+
+            run = MicroBirdRun.query.filter_by(subject=subject).first()
+            if run:
+                run.fingerprint = fingerprint
+                run.range_start = start_date
+                run.updated_at = datetime.utcnow()
+            else:
+                db.session.add(MicroBirdRun(subject=subject, fingerprint=fingerprint, range_start=start_date))
+            db.session.commit()
+            return True
+        except Exception as e:
+            print(f"Error saving MicroBird events: {e}")
+            db.session.rollback()
+            return False
+
 db_manager = CalendarDatabaseManager()
@@ -133,6 +133,29 @@ class CalendarData(db.Model):
         return f'<CalendarData {self.user_email} {self.calendar_type}>'
 
 
+class CalendarSection(db.Model):
+    """
+    One section of a user's calendar data: a top-level key such as
+    'background_days' or 'period', or one calendar as 'calendars.<name>'.
+    The CalendarData row stays the header whose created_at versions the set.
+    """
+    __tablename__ = 'calendar_sections'
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_email = db.Column(db.String(255), nullable=False)
+    calendar_type = db.Column(db.String(50), nullable=False, default='dashboard')
+    section = db.Column(db.String(100), nullable=False)
+    section_json = db.Column(db.JSON)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('user_email', 'calendar_type', 'section', name='uq_calendar_section'),
+    )
+
+    def __repr__(self):
+        return f'<CalendarSection {self.user_email} {self.section}>'
+
+
 class ManualCalendarEntry(db.Model):
     __tablename__ = 'manual_calendar_entries'
 
@@ -160,6 +183,165 @@ class ManualCalendarEntry(db.Model):
         }
 
 
+class CollectiveDayCache(db.Model):
+    __tablename__ = 'collective_day_cache'
+
+    id = db.Column(db.Integer, primary_key=True)
+    calendar_type = db.Column(db.String(50), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    version = db.Column(db.String(20), nullable=False)
+    day_json = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('calendar_type', 'date', name='uq_collective_day_type_date'),
+    )
+
+    def __repr__(self):
+        return f'<CollectiveDayCache {self.calendar_type} {self.date}>'
+
+
+class MicrotransitEvent(db.Model):
+    __tablename__ = 'microtransit_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    engine = db.Column(db.String(20), nullable=False)
+    params_hash = db.Column(db.String(64), nullable=False)
+    transit_code = db.Column(db.String(50))
+    start = db.Column(db.DateTime, nullable=False)  # UTC
+    end = db.Column(db.DateTime, nullable=False)  # UTC
+    event_json = db.Column(db.JSON, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_microtransit_event_key_start', 'subject', 'engine', 'params_hash', 'start'),
+    )
+
+    def __repr__(self):
+        return f'<MicrotransitEvent {self.subject} {self.engine} {self.transit_code} {self.start}>'
+
+
+class MicrotransitCoverage(db.Model):
+    __tablename__ = 'microtransit_coverage'
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    engine = db.Column(db.String(20), nullable=False)
+    params_hash = db.Column(db.String(64), nullable=False)
+    range_start = db.Column(db.DateTime, nullable=False)  # UTC
+    range_end = db.Column(db.DateTime, nullable=False)  # UTC
+    # Earliest start of a transit still open at range_end (UTC); extensions re-scan from here
+    resume_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        db.UniqueConstraint('subject', 'engine', 'params_hash', name='uq_microtransit_coverage_key'),
+    )
+
+    def __repr__(self):
+        return f'<MicrotransitCoverage {self.subject} {self.engine} {self.range_start}-{self.range_end}>'
+
+
+class MicroBirdEvent(db.Model):
+    __tablename__ = 'microbird_events'
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    start = db.Column(db.DateTime, nullable=False)
+    end = db.Column(db.DateTime, nullable=False)
+    duration_minutes = db.Column(db.Integer, nullable=False)
+    transit_source = db.Column(db.String(20), nullable=False)
+    transit_name = db.Column(db.String(100))
+    transit_code = db.Column(db.String(50))
+    bird_tier = db.Column(db.String(50))
+    bird = db.Column(db.String(50))
+    activity = db.Column(db.String(100))
+    period_rank = db.Column(db.Integer)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_microbird_event_subject_date', 'subject', 'date'),
+    )
+
+    def to_dict(self):
+        return {
+            'date': self.date.isoformat(),
+            'start': self.start,
+            'end': self.end,
+            'duration_minutes': self.duration_minutes,
+            'transit_source': self.transit_source,
+            'transit_name': self.transit_name,
+            'transit_code': self.transit_code,
+            'bird_tier': self.bird_tier,
+            'bird': self.bird,
+            'activity': self.activity,
+            'period_rank': self.period_rank,
+        }
+
+    def __repr__(self):
+        return f'<MicroBirdEvent {self.subject} {self.transit_source} {self.start}>'
+
+
+class MicroBirdRun(db.Model):
+    __tablename__ = 'microbird_runs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    subject = db.Column(db.String(255), unique=True, nullable=False)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    range_start = db.Column(db.Date, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<MicroBirdRun {self.subject} {self.range_start}>'
+
+
+class GenerationJob(db.Model):
+    __tablename__ = 'generation_jobs'
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)
+    subject = db.Column(db.String(255), nullable=True, index=True)
+    client_id = db.Column(db.Integer, nullable=True)
+    payload = db.Column(db.JSON, nullable=False)
+    context = db.Column(db.JSON, nullable=True)
+    priority = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(db.String(20), nullable=False, default='queued')
+    stage = db.Column(db.String(50), nullable=True)
+    progress = db.Column(db.Integer, nullable=False, default=0)
+    worker = db.Column(db.String(100), nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    result_json = db.Column(db.JSON, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_generation_job_queue', 'status', 'priority', 'created_at'),
+    )
+
+    def __repr__(self):
+        return f'<GenerationJob {self.id} {self.kind} {self.status}>'
+
+    def to_dict(self, include_result=False):
+        data = {
+            'job_id': self.id,
+            'kind': self.kind,
+            'client_id': self.client_id,
+            'status': self.status,
+            'stage': self.stage,
+            'progress': self.progress,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None,
+        }
+        if include_result:
+            data['result'] = self.result_json
+        return data
+
+
 class SubscriptionToken(db.Model):
     __tablename__ = 'subscription_tokens'
 
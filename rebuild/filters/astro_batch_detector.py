@@ -5,15 +5,17 @@ Takes filtered bird periods from Step 1 and runs all micro-transit scripts
 to find "supercharged moments" where transits overlap with favorable bird periods
 """
 
-import sys
-import os
 import json
-import importlib.util
+import logging
 from datetime import datetime, timedelta
 from typing import List, Dict, Any, Tuple
 import pytz
 from zoneinfo import ZoneInfo
 
+from core.instrumentation import log_event
+
+logger = logging.getLogger(__name__)
+
 class AstroBatchDetector:
     """
     Detects overlaps between favorable bird periods and micro-transit events
@@ -29,69 +31,31 @@ class AstroBatchDetector:
             'yp.py'    # Yogi Point specific transits
         ]
     
-    def import_script(self, script_name: str):
+    def create_engine(self, script_name: str, birth_date=None, birth_latitude=None, birth_longitude=None, latitude=None, longitude=None):
         """
-        Dynamically import a micro-transit script
+        Build a configured transit engine for a micro-transit script
         """
         try:
-            script_path = os.path.join(os.path.dirname(__file__), 'micro_transits', script_name)
-            
-            if not os.path.exists(script_path):
-                raise FileNotFoundError(f"{script_name} not found at {script_path}")
-            
-            # Import the module
-            module_name = script_name.replace('.py', '')
-            spec = importlib.util.spec_from_file_location(module_name, script_path)
-            module = importlib.util.module_from_spec(spec)
+            from microtransits.engine import get_engine
+            engine_class = get_engine(script_name)
             
-            # Set up module environment if needed
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)
-            
-            return module
-            
-        except Exception as e:
-            print(f"Warning: Could not import {script_name}: {e}")
-            return None
-    
-    def setup_script_environment(self, script_module, start_date: datetime, end_date: datetime, birth_date=None, birth_latitude=None, birth_longitude=None, latitude=None, longitude=None):
-        """
-        Set up environment variables and parameters needed by transit scripts
-        """
-        try:
             # Use actual birth data instead of hardcoded defaults
-            birth_params = {
-                'BIRTH_DATE': birth_date if birth_date else datetime(1973, 3, 9, 16, 56),
-                'BIRTH_LAT': birth_latitude if birth_latitude is not None else 29.2108,
-                'BIRTH_LON': birth_longitude if birth_longitude is not None else -81.0228,
-                'TRANSIT_LOCATION': [latitude if latitude is not None else 29.2108, longitude if longitude is not None else -81.0228]
-            }
-            
-            # Set up environment variables - create exports in root
-            exports_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'exports')
-            os.makedirs(exports_dir, exist_ok=True)
-            os.environ['EXPORT_FOLDER'] = exports_dir
-            
-            # Set module attributes if they exist
-            for attr, value in birth_params.items():
-                if hasattr(script_module, attr):
-                    setattr(script_module, attr, value)
-                elif hasattr(script_module, attr.lower()):
-                    setattr(script_module, attr.lower(), value)
-                # Force set the attribute even if it doesn't exist
-                setattr(script_module, attr, value)
-            
-            # Set ORB variables if needed
-            if hasattr(script_module, 'DEFAULT_ORB'):
-                script_module.ORB = script_module.DEFAULT_ORB
-            else:
-                script_module.ORB = 1.0
-            
-            return True
+            birth_location = (
+                birth_latitude if birth_latitude is not None else 29.2108,
+                birth_longitude if birth_longitude is not None else -81.0228
+            )
+            transit_location = (
+                latitude if latitude is not None else 29.2108,
+                longitude if longitude is not None else -81.0228
+            )
+            
+            return engine_class(birth_date if birth_date else datetime(1973, 3, 9, 16, 56),
+                                location=transit_location,
+                                birth_location=birth_location)
             
         except Exception as e:
-            print(f"Warning: Could not set up environment for script: {e}")
-            return False
+            print(f"Warning: Could not create engine for {script_name}: {e}")
+            return None
     
     def run_micro_transit_script(self, script_name: str, start_date: datetime, end_date: datetime, 
                                 birth_date=None, birth_time=None, birth_latitude=None, birth_longitude=None,
@@ -100,10 +64,6 @@ class AstroBatchDetector:
         Run a single micro-transit script and return its results
         """
         try:
-            script_module = self.import_script(script_name)
-            if not script_module:
-                return []
-            
             # Parse birth date and time if provided
             if birth_date and birth_time:
                 if isinstance(birth_date, str):
@@ -120,35 +80,33 @@ class AstroBatchDetector:
             else:
                 birth_dt = datetime(1973, 3, 9, 16, 56)  # Default
             
-            # Set up the script environment with actual birth data
-            self.setup_script_environment(script_module, start_date, end_date, 
+            # Each run gets its own engine, so concurrent batches don't share settings
+            engine = self.create_engine(script_name,
                                         birth_date=birth_dt,
                                         birth_latitude=birth_latitude,
                                         birth_longitude=birth_longitude,
                                         latitude=current_latitude,
                                         longitude=current_longitude)
-            
-            # Call the process_transits function
-            if hasattr(script_module, 'process_transits'):
-                print(f"Running {script_name}...")
-                
-                # Convert dates to timezone-aware if needed
-                ny_tz = ZoneInfo("America/New_York")
-                if start_date.tzinfo is None:
-                    start_date = start_date.replace(tzinfo=ny_tz)
-                if end_date.tzinfo is None:
-                    end_date = end_date.replace(tzinfo=ny_tz)
-                
-                transits = script_module.process_transits(start_date, end_date)
-                
-                # Normalize the output format
-                normalized_transits = self._normalize_transit_output(transits, script_name)
-                print(f"Found {len(normalized_transits)} transits from {script_name}")
-                
-                return normalized_transits
-            else:
-                print(f"Warning: {script_name} does not have process_transits function")
+            if not engine:
                 return []
+            
+            log_event(logger, logging.INFO, 'astro_batch.engine_start', engine=script_name)
+            
+            # Convert dates to timezone-aware if needed
+            ny_tz = ZoneInfo("America/New_York")
+            if start_date.tzinfo is None:
+                start_date = start_date.replace(tzinfo=ny_tz)
+            if end_date.tzinfo is None:
+                end_date = end_date.replace(tzinfo=ny_tz)
+            
+            transits = engine.scan(start_date, end_date)
+            
+            # Normalize the output format
+            normalized_transits = self._normalize_transit_output(transits, script_name)
+            log_event(logger, logging.INFO, 'astro_batch.engine_done', engine=script_name,
+                      transits=len(normalized_transits))
+            
+            return normalized_transits
                 
         except Exception as e:
             print(f"Error running {script_name}: {e}")
@@ -261,8 +219,8 @@ class AstroBatchDetector:
         automation_moments = []
         
         # Debug: Log sample data
-        if bird_periods and transit_events:
-            print(f"🔍 OVERLAP DEBUG: Checking {len(bird_periods)} bird periods against {len(transit_events)} transits")
+        log_event(logger, logging.DEBUG, 'astro_batch.overlap_start',
+                  bird_periods=len(bird_periods), transits=len(transit_events))
         
         for period in bird_periods:
             try:
@@ -392,7 +350,8 @@ class AstroBatchDetector:
                 print(f"Error detecting overlaps for period {period}: {e}")
                 continue
         
-        print(f"🔍 OVERLAP RESULT: Found {len(automation_moments)} automation moments from {len(bird_periods)} periods")
+        log_event(logger, logging.DEBUG, 'astro_batch.overlap_done',
+                  moments=len(automation_moments), bird_periods=len(bird_periods))
         
         # Sort chronologically by date and time
         automation_moments.sort(key=lambda x: (x['date'], x['time']))
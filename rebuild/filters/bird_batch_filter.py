@@ -112,15 +112,20 @@ class BirdBatchFilter:
             else:
                 birth_dt = datetime(1973, 3, 9, 16, 56)
             
-            from timezonefinder import TimezoneFinder
-            tf = TimezoneFinder()
-            tz_str = tf.timezone_at(lat=c_lat, lng=c_lon) or 'UTC'
+            from core.solar_events import timezone_at, sun_times_for_range
+            tz_str = timezone_at(c_lat, c_lon) or 'UTC'
+            # Sun times for the whole range at once; each sunrise is calculated once
+            sun_times_for_range(start_dt, days, c_lat, c_lon, tz_str)
             
+            # Birth star and bird once per range, from the birth moment and place
+            birth_tz = timezone_at(b_lat, b_lon) or tz_str
+            birth_star, birth_bird = calc.calculate_birth_bird(birth_dt, b_lat, b_lon, birth_tz)
+            
+            # Only the periods and paksha are read from each day
             first_day = calc.calculate_bird_periods(
-                start_dt, birth_dt, c_lat, c_lon, tz_str
+                start_dt, birth_dt, c_lat, c_lon, tz_str,
+                fields=calc.PERIOD_FIELDS, birth=(birth_star, birth_bird)
             )
-            birth_bird = first_day.get('birth_bird', '')
-            birth_star = first_day.get('birth_star', '')
             
             all_periods = {
                 "start_date": start_date,
@@ -141,7 +146,8 @@ class BirdBatchFilter:
                     result = first_day
                 else:
                     result = calc.calculate_bird_periods(
-                        current_date, birth_dt, c_lat, c_lon, tz_str
+                        current_date, birth_dt, c_lat, c_lon, tz_str,
+                        fields=calc.PERIOD_FIELDS, birth=(birth_star, birth_bird)
                     )
                 
                 day_periods = self._extract_periods_from_timing(result)
@@ -77,88 +77,126 @@ def get_nakshatra_from_longitude(sidereal_lon):
     return nak_num, nak_name, nak_ruler
 
 
-def find_nakshatra_periods_for_day(day_date, tz_offset=-5, lat=0, lon=0, tz_name=None):
-    day_start = datetime.combine(day_date, datetime.min.time())
-    day_end = datetime.combine(day_date, datetime.max.time().replace(microsecond=0))
-
-    def local_to_utc(local_dt):
-        if tz_name:
-            try:
-                local_tz = ZoneInfo(tz_name)
-                local_aware = local_dt.replace(tzinfo=local_tz)
-                return local_aware.astimezone(dt_timezone.utc).replace(tzinfo=None)
-            except Exception:
-                pass
-        return local_dt - timedelta(hours=tz_offset)
-
-    moon_lon = get_moon_sidereal_position(day_start, lat, lon, tz_offset, tz_name)
-    current_nak_num, current_nak_name, current_nak_ruler = get_nakshatra_from_longitude(moon_lon)
-
-    current_start = day_start
-    check_time = day_start + timedelta(minutes=30)
-    periods = []
+SOLVER_TOLERANCE = 0.5 / 86400.0  # days (half a second)
+MAX_NEWTON_STEPS = 8
+
+
+def _local_to_utc(local_dt, local_tz, tz_offset):
+    if local_tz is not None:
+        return local_dt.replace(tzinfo=local_tz).astimezone(dt_timezone.utc).replace(tzinfo=None)
+    return local_dt - timedelta(hours=tz_offset)
+
+
+def _utc_to_local(utc_dt, local_tz, tz_offset):
+    if local_tz is not None:
+        return utc_dt.replace(tzinfo=dt_timezone.utc).astimezone(local_tz).replace(tzinfo=None)
+    return utc_dt + timedelta(hours=tz_offset)
+
+
+def _julian_day(utc_dt):
+    return swe.julday(utc_dt.year, utc_dt.month, utc_dt.day,
+                      utc_dt.hour + utc_dt.minute / 60.0 + utc_dt.second / 3600.0
+                      + utc_dt.microsecond / 3600e6)
+
+
+def _jd_to_utc(jd):
+    year, month, day, hours = swe.revjul(jd)
+    return datetime(year, month, day) + timedelta(seconds=round(hours * 3600.0))
+
+
+class _MoonSidereal:
+    """Sidereal (Lahiri) Moon longitude and speed, set up once for a location."""
+
+    def __init__(self, lat, lon):
+        _ensure_swe_path()
+        swe.set_sid_mode(swe.SIDM_LAHIRI)
+        self.flags = None
+        self.lat, self.lon = lat, lon
+
+    def _calc(self, jd):
+        if self.flags is None:
+            # Same fallbacks as get_moon_sidereal_position, resolved once
+            for flags in (swe.FLG_TOPOCTR | swe.FLG_SPEED, swe.FLG_SPEED, swe.FLG_MOSEPH | swe.FLG_SPEED):
+                try:
+                    if flags & swe.FLG_TOPOCTR:
+                        swe.set_topo(self.lon, self.lat, 0)
+                    result = swe.calc_ut(jd, swe.MOON, flags)[0]
+                    self.flags = flags
+                    return result
+                except Exception:
+                    continue
+            raise RuntimeError("Moon position calculation failed")
+        return swe.calc_ut(jd, swe.MOON, self.flags)[0]
+
+    def __call__(self, jd):
+        result = self._calc(jd)
+        return (result[0] - swe.get_ayanamsa_ut(jd)) % 360.0, result[3]
+
+    def crossing(self, jd, boundary):
+        """Time after jd when the Moon reaches the sidereal longitude boundary (Newton's method)."""
+        moon_lon, speed = self(jd)
+        t = jd + ((boundary - moon_lon) % 360.0) / speed
+        for _ in range(MAX_NEWTON_STEPS):
+            moon_lon, speed = self(t)
+            step = (((moon_lon - boundary) + 180.0) % 360.0 - 180.0) / speed
+            t -= step
+            if abs(step) < SOLVER_TOLERANCE:
+                break
+        return t
+
 
-    while check_time <= day_end:
-        moon_lon = get_moon_sidereal_position(check_time, lat, lon, tz_offset, tz_name)
-        nak_num, nak_name, nak_ruler = get_nakshatra_from_longitude(moon_lon)
-
-        if nak_num != current_nak_num:
-            search_start = check_time - timedelta(minutes=30)
-            search_end = check_time
-
-            while (search_end - search_start).total_seconds() > 60:
-                mid_time = search_start + (search_end - search_start) / 2
-                moon_mid = get_moon_sidereal_position(mid_time, lat, lon, tz_offset, tz_name)
-                nak_mid_num, _, _ = get_nakshatra_from_longitude(moon_mid)
-
-                if nak_mid_num == current_nak_num:
-                    search_start = mid_time
-                else:
-                    search_end = mid_time
-
-            transition_time = search_end
-            start_utc = local_to_utc(current_start)
-            end_utc = local_to_utc(transition_time)
-
-            periods.append({
-                'nakshatra_num': current_nak_num,
-                'nakshatra_name': current_nak_name,
-                'ruler': current_nak_ruler,
-                'start_time': start_utc,
-                'end_time': end_utc,
-                'start_local': current_start,
-                'end_local': transition_time
-            })
-
-            current_start = transition_time
-            current_nak_num = nak_num
-            current_nak_name = nak_name
-            current_nak_ruler = nak_ruler
-            check_time = transition_time
-
-        check_time += timedelta(minutes=30)
-
-    start_utc = local_to_utc(current_start)
-    end_utc = local_to_utc(day_end)
-
-    periods.append({
-        'nakshatra_num': current_nak_num,
-        'nakshatra_name': current_nak_name,
-        'ruler': current_nak_ruler,
-        'start_time': start_utc,
-        'end_time': end_utc,
-        'start_local': current_start,
-        'end_local': day_end
-    })
+def find_nakshatra_transits_for_range(start_date, end_date, tz_offset=-5, lat=0, lon=0, tz_name=None):
+    """
+    Continuous nakshatra periods from local midnight of start_date to the end
+    of end_date. Each boundary crossing is predicted from the Moon's speed and
+    refined with Newton steps, so periods are not split at midnight.
+    """
+    local_tz = None
+    if tz_name:
+        try:
+            local_tz = ZoneInfo(tz_name)
+        except Exception:
+            local_tz = None
+
+    range_start_local = datetime.combine(start_date, datetime.min.time())
+    range_end_local = datetime.combine(end_date, datetime.max.time().replace(microsecond=0))
+    range_start_utc = _local_to_utc(range_start_local, local_tz, tz_offset)
+    range_end_utc = _local_to_utc(range_end_local, local_tz, tz_offset)
+    range_end_jd = _julian_day(range_end_utc)
+
+    moon = _MoonSidereal(lat, lon)
+    jd = _julian_day(range_start_utc)
+    nak_num = get_nakshatra_from_longitude(moon(jd)[0])[0]
+    current_start = (range_start_local, range_start_utc)
+    periods = []
 
+    while True:
+        transition_jd = moon.crossing(jd, ((nak_num + 1) % 27) * NAKSHATRA_SPAN)
+        if transition_jd >= range_end_jd:
+            break
+        transition_utc = _jd_to_utc(transition_jd)
+        transition = (_utc_to_local(transition_utc, local_tz, tz_offset), transition_utc)
+        periods.append(_nakshatra_period(nak_num, current_start, transition))
+        current_start = transition
+        nak_num = (nak_num + 1) % 27
+        jd = transition_jd
+
+    periods.append(_nakshatra_period(nak_num, current_start, (range_end_local, range_end_utc)))
     return periods
 
 
-def find_nakshatra_transits_for_range(start_date, end_date, tz_offset=-5, lat=0, lon=0, tz_name=None):
-    all_periods = []
-    current_date = start_date
-    while current_date <= end_date:
-        day_periods = find_nakshatra_periods_for_day(current_date, tz_offset, lat, lon, tz_name)
-        all_periods.extend(day_periods)
-        current_date += timedelta(days=1)
-    return all_periods
+def _nakshatra_period(nak_num, start, end):
+    """Period dict from (local, utc) start and end times."""
+    return {
+        'nakshatra_num': nak_num,
+        'nakshatra_name': NAKSHATRA_NAMES[nak_num],
+        'ruler': NAKSHATRA_RULERS[nak_num],
+        'start_time': start[1],
+        'end_time': end[1],
+        'start_local': start[0],
+        'end_local': end[0]
+    }
+
+
+def find_nakshatra_periods_for_day(day_date, tz_offset=-5, lat=0, lon=0, tz_name=None):
+    return find_nakshatra_transits_for_range(day_date, day_date, tz_offset, lat, lon, tz_name)
@@ -0,0 +1,151 @@
+"""
+Bulk client regeneration
+Regenerates every client of an owner in one run: the collective calendars
+are computed once, the Bird Batch and Personal engines of all clients are
+fanned out over the dashboard worker pool together, and the calendar rows
+are written with batched upserts. Each saved client's MicroBird events are
+materialized afterwards, as generate_dashboard_core does for one client.
+
+    python -m helpers.client_batch --owner agency@example.com
+"""
+
+import argparse
+import json
+import os
+import time
+import traceback
+from datetime import datetime
+
+from database.models import db, Client
+from database.manager import db_manager
+from helpers.microbird import materialize as materialize_microbird
+from helpers.dashboard import (
+    resolve_parallel, generation_inputs, collective_inputs, collective_steps, personal_steps,
+    store_collective_days, combined_calendar, calendar_record, run_dashboard_steps,
+)
+
+
+def client_payload(client):
+    """Generation request for a client's calendars."""
+    return {
+        'birth_date': client.birth_date.isoformat(),
+        'birth_time': client.birth_time.isoformat(),
+        'birth_latitude': client.birth_latitude or 0,
+        'birth_longitude': client.birth_longitude or 0,
+        'latitude': client.current_latitude or client.birth_latitude or 0,
+        'longitude': client.current_longitude or client.birth_longitude or 0,
+        'location': client.current_location_name or client.birth_location_name or '',
+        'timezone_offset': client.birth_timezone or -5.0,
+        'days': client.calendar_range_days or 60,
+        'force_regenerate': True,
+    }
+
+
+def _set_status(clients, status, generated_at=None):
+    for client in clients:
+        client.calendar_status = status
+        if generated_at:
+            client.last_generated_at = generated_at
+    db.session.commit()
+
+
+def regenerate_clients(owner_email, progress=None, parallel=None):
+    """
+    Regenerate the calendars of every client of owner_email with birth data.
+    Returns counts, timings and throughput in clients per minute.
+    """
+    started = time.perf_counter()
+    clients = Client.query.filter_by(owner_email=owner_email).order_by(Client.id).all()
+    eligible = [c for c in clients if c.birth_date and c.birth_time]
+    skipped = [c.id for c in clients if not (c.birth_date and c.birth_time)]
+    if not eligible:
+        return {'clients': 0, 'generated': 0, 'failed': [], 'skipped': skipped, 'microbird_failed': [],
+                'seconds': 0.0, 'clients_per_minute': 0.0}
+
+    parallel = resolve_parallel(parallel)
+
+    _set_status(eligible, 'generating')
+
+    # Collective calendars once, every client's personal engines in the same pool run
+    collective = collective_inputs()
+    steps = dict(collective_steps(collective))
+    inputs = {}
+    for client in eligible:
+        inputs[client.id] = generation_inputs(client_payload(client))
+        for name, step in personal_steps(inputs[client.id], collective).items():
+            steps[f"{client.id}:{name}"] = step
+
+    if progress:
+        progress("engines", 10)
+    engines_started = time.perf_counter()
+    step_results, _ = run_dashboard_steps(steps, parallel)
+    engine_seconds = round(time.perf_counter() - engines_started, 3)
+    store_collective_days(step_results, collective)
+
+    if progress:
+        progress("combined", 70)
+    records = {}
+    for client in eligible:
+        calendars = {
+            "bird_batch": step_results[f"{client.id}:bird_batch"],
+            "personal": step_results.get(f"{client.id}:personal", {"error": "Birth data required"}),
+            "pti": step_results["pti"],
+            "goslow": step_results["goslow"],
+        }
+        calendars["combined"] = combined_calendar(calendars)
+        records[f"client_{client.id}"] = calendar_record(inputs[client.id], calendars, [])
+
+    if progress:
+        progress("saving", 85)
+    saved = set(db_manager.save_calendar_data_batch(records))
+    generated = [c for c in eligible if f"client_{c.id}" in saved]
+    failed = [c for c in eligible if f"client_{c.id}" not in saved]
+
+    microbird_failed = []
+    for index, client in enumerate(generated):
+        if progress:
+            progress("microbird", 90 + 9 * index // len(generated))
+        subject = f"client_{client.id}"
+        try:
+            materialize_microbird(subject, records[subject])
+        except Exception:
+            traceback.print_exc()
+            microbird_failed.append(client.id)
+
+    _set_status(generated, 'ready', generated_at=datetime.utcnow())
+    if failed:
+        _set_status(failed, 'error')
+
+    seconds = round(time.perf_counter() - started, 3)
+    return {
+        'clients': len(eligible),
+        'generated': len(generated),
+        'failed': [c.id for c in failed],
+        'skipped': skipped,
+        'microbird_failed': microbird_failed,
+        'mode': "process" if parallel else "sequential",
+        'engine_seconds': engine_seconds,
+        'seconds': seconds,
+        'clients_per_minute': round(len(generated) * 60.0 / seconds, 1) if seconds else 0.0,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Regenerate every client calendar of an owner.')
+    parser.add_argument('--owner', required=True, help='owner email of the clients')
+    parser.add_argument('--sequential', action='store_true', help='run the engines in this process')
+    args = parser.parse_args(argv)
+
+    os.environ['JOB_EMBEDDED_WORKERS'] = '0'
+    from app import create_app
+    app = create_app()
+    with app.test_request_context():
+        from flask import session
+        session['user_info'] = {'email': args.owner}
+        summary = regenerate_clients(args.owner, parallel='off' if args.sequential else None)
+    print(json.dumps(summary, indent=2))
+    return 0 if not summary['failed'] else 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
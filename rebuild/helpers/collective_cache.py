@@ -0,0 +1,91 @@
+"""
+Shared date-keyed cache for the collective calendars
+PTI Collective and Vedic Collective days depend only on the date, so each
+day is computed once and shared by every user and client: an in-process
+LRU in front of the collective_day_cache table.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+
+from helpers.utils import make_json_serializable
+from database.manager import db_manager
+
+# Bump a version when its classification logic changes; old rows are then ignored
+CACHE_VERSIONS = {
+    'pti': 'tuned-1',
+    'vedic': 'rules-1',
+}
+MAX_CACHED_DAYS = 4096
+
+_days = OrderedDict()
+_lock = threading.Lock()
+
+
+def serialize_day(day):
+    """JSON-safe copy of a day result, the form every cached day is returned in."""
+    return json.loads(json.dumps(make_json_serializable(day), default=str))
+
+
+def get_cached_days(calendar_type, start_date, end_date):
+    """Cached days between start_date and end_date as {iso date: day}, LRU first, then the DB."""
+    version = CACHE_VERSIONS[calendar_type]
+    found, missing = {}, []
+    with _lock:
+        cur = start_date
+        while cur <= end_date:
+            key = (calendar_type, version, cur.isoformat())
+            if key in _days:
+                _days.move_to_end(key)
+                found[cur.isoformat()] = _days[key]
+            else:
+                missing.append(cur)
+            cur += timedelta(days=1)
+
+    if missing:
+        stored = db_manager.get_collective_days(calendar_type, version, missing[0], missing[-1])
+        stored = {d: v for d, v in stored.items() if d not in found}
+        _remember(calendar_type, version, stored)
+        found.update(stored)
+    return found
+
+
+def store_days(calendar_type, days):
+    """Save newly computed days ({iso date: serialized day}) to the DB and the LRU."""
+    if not days:
+        return
+    version = CACHE_VERSIONS[calendar_type]
+    _remember(calendar_type, version, days)
+    db_manager.save_collective_days(calendar_type, version, days)
+
+
+def missing_runs(start_date, end_date, cached):
+    """Consecutive uncached stretches of the range as (first date, number of days)."""
+    runs = []
+    cur = start_date
+    while cur <= end_date:
+        if cur.isoformat() not in cached:
+            if runs and runs[-1][0] + timedelta(days=runs[-1][1]) == cur:
+                runs[-1] = (runs[-1][0], runs[-1][1] + 1)
+            else:
+                runs.append((cur, 1))
+        cur += timedelta(days=1)
+    return runs
+
+
+def clear_cache():
+    """Drop the in-process days (the DB rows are kept)."""
+    with _lock:
+        _days.clear()
+
+
+def _remember(calendar_type, version, days):
+    with _lock:
+        for date_str, day in days.items():
+            key = (calendar_type, version, date_str)
+            _days[key] = day
+            _days.move_to_end(key)
+        while len(_days) > MAX_CACHED_DAYS:
+            _days.popitem(last=False)
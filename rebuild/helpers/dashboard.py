@@ -7,7 +7,12 @@ import os
 import sys
 import json
 import math
+import time
+import threading
 import traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import date, datetime, timedelta
 from flask import session
 
@@ -17,9 +22,21 @@ from helpers.utils import (
     calculate_is_double_go, apply_double_go_to_combined_results
 )
 from helpers.astro import find_nakshatra_transits_for_range
+from helpers.collective_cache import get_cached_days, store_days, missing_runs, serialize_day
+from helpers.microbird import materialize as materialize_microbird
+from core.instrumentation import drain_counters, merge_counters
+from core.solar_events import timezone_at
 from database.manager import db_manager
 from database.models import UserProfile
 
+# Parallel Settings
+_PARALLEL_OFF = {"0", "false", "off", "no", "sequential"}
+DASHBOARD_PARALLEL = os.environ.get("DASHBOARD_PARALLEL", "process").lower() not in _PARALLEL_OFF
+DASHBOARD_WORKERS = int(os.environ.get("DASHBOARD_WORKERS", min(4, os.cpu_count() or 1)))
+
+_executor = None
+_executor_lock = threading.Lock()
+
 
 def get_user_defaults():
     user_profile = session.get('user_profile', {})
@@ -140,217 +157,139 @@ def _normalize_personal_rows(rows, start_d, end_d):
     return out
 
 
-def generate_dashboard_core(data: dict, user_id: str = None) -> dict:
-    if user_id and data.get("force_regenerate"):
-        try:
-            db_manager.clear_calendar_data(user_id)
-        except Exception:
-            pass
-
-    try:
-        if user_id and not data.get("force_regenerate"):
-            saved = db_manager.get_calendar_data(user_id)
-            if saved:
-                cached_days = saved.get("period", {}).get("days", 60)
-                requested_days = data.get("days")
-                if requested_days is None:
-                    _, _, requested_days = get_two_month_range()
-                try:
-                    requested_days = int(requested_days) if requested_days else 60
-                    cached_days = int(cached_days) if cached_days else 60
-                except (ValueError, TypeError):
-                    requested_days = 60
-                    cached_days = 60
-
-                if abs(cached_days - requested_days) <= 2:
-                    cached_result = {
-                        "dashboard_type": "Complete_6_Calendar_Dashboard",
-                        "period": {"days": cached_days, "generated_at": saved.get("period", {}).get("generated_at")},
-                        "calendars": saved.get("calendars", {}),
-                        "from_cache": True,
-                        "background_days": saved.get("background_days", []),
-                    }
-                    cached_result = normalize_dashboard_data(cached_result)
-                    return cached_result
-    except Exception:
-        traceback.print_exc()
-
-    user_defaults = get_user_defaults()
-
-    birth_date = data.get("birth_date") or user_defaults.get("birth_date")
-    birth_time = data.get("birth_time") or user_defaults.get("birth_time")
-    birth_latitude = float(data.get("birth_latitude") or user_defaults.get("birth_latitude", 25.76))
-    birth_longitude = float(data.get("birth_longitude") or user_defaults.get("birth_longitude", -80.19))
-    location = data.get("location") or user_defaults.get("location", "Miami, FL")
-    latitude = float(data.get("latitude") or user_defaults.get("latitude", 25.76))
-    longitude = float(data.get("longitude") or user_defaults.get("longitude", -80.19))
-    timezone_offset = _tz_offset_hours(data, user_defaults, fallback=-5.0)
-    timezone_label = data.get("timezone") or user_defaults.get("timezone")
-
-    if "days" in data and data.get("days") is not None:
-        days = int(data.get("days"))
-    else:
-        _, _, days = get_two_month_range()
-
-    dashboard_results = {
-        "dashboard_type": "Complete_6_Calendar_Dashboard",
-        "period": {"days": days, "generated_at": datetime.now().isoformat()},
-        "calendars": {},
-    }
-
-    # 1) Bird Batch
+def _bird_batch_calendar(start_date, days, birth_date, birth_time, birth_latitude, birth_longitude):
     try:
         from filters.bird_batch_filter import BirdBatchFilter
         bird_filter = BirdBatchFilter()
         bird_result = bird_filter.process_batch(
-            start_date=datetime.now().strftime("%Y-%m-%d"),
+            start_date=start_date,
             days=days, max_periods_per_day=6,
             birth_date=birth_date,
             birth_time=birth_time if ':' in str(birth_time or '') else None,
             birth_latitude=birth_latitude,
             birth_longitude=birth_longitude,
         )
-        dashboard_results["calendars"]["bird_batch"] = bird_result
+        return bird_result
     except Exception as e:
-        dashboard_results["calendars"]["bird_batch"] = {"error": str(e)}
+        return {"error": str(e)}
 
-    # 2) Personal
-    if birth_date and birth_time:
-        try:
-            from personal_calendar.personal_transit_yp import EnhancedPersonalTransitCalculator
-            personal_calc = EnhancedPersonalTransitCalculator()
 
-            if isinstance(birth_date, str):
-                birth_date_obj = datetime.strptime(birth_date, "%Y-%m-%d").date()
-            else:
-                birth_date_obj = birth_date
-            if isinstance(birth_time, str):
-                try:
-                    birth_time_obj = datetime.strptime(birth_time, "%H:%M:%S").time()
-                except ValueError:
-                    birth_time_obj = datetime.strptime(birth_time, "%H:%M").time()
-            else:
-                birth_time_obj = birth_time
+def _personal_calendar(birth_date, birth_time, birth_latitude, birth_longitude, timezone_offset, p_start, p_end):
+    try:
+        from personal_calendar.personal_transit_yp import EnhancedPersonalTransitCalculator
+        personal_calc = EnhancedPersonalTransitCalculator()
+
+        if isinstance(birth_date, str):
+            birth_date_obj = datetime.strptime(birth_date, "%Y-%m-%d").date()
+        else:
+            birth_date_obj = birth_date
+        if isinstance(birth_time, str):
+            try:
+                birth_time_obj = datetime.strptime(birth_time, "%H:%M:%S").time()
+            except ValueError:
+                birth_time_obj = datetime.strptime(birth_time, "%H:%M").time()
+        else:
+            birth_time_obj = birth_time
+
+        expected_days = (p_end - p_start).days + 1
 
-            p_start, p_end, _ = get_two_month_range()
-            expected_days = (p_end - p_start).days + 1
+        birth_chart = personal_calc.calculate_birth_chart(
+            birth_date_obj, birth_time_obj, birth_latitude, birth_longitude, timezone_offset
+        )
 
+        bulk_rows = None
+        try:
+            if hasattr(personal_calc, "generate_personal_calendar"):
+                if birth_chart:
+                    bulk = personal_calc.generate_personal_calendar(
+                        birth_chart, p_start, p_end,
+                        birth_latitude, birth_longitude,
+                        timezone_offset, "composite"
+                    )
+                    if isinstance(bulk, dict):
+                        bulk_rows = []
+                        for date_str, day_data in bulk.items():
+                            if day_data.get('personal_score'):
+                                bulk_rows.append({
+                                    'date': date_str,
+                                    'day_score': {
+                                        'quality': day_data['personal_score'].get('quality', 'neutral'),
+                                        'score': day_data['personal_score'].get('score', 0),
+                                        'factors': day_data['personal_score'].get('factors', []),
+                                    },
+                                    'moon_house': day_data['personal_score'].get('moon_house'),
+                                    'moon_sign': day_data['personal_score'].get('transits', {}).get('moon_sign'),
+                                    'weekday': day_data.get('weekday', '')
+                                })
+        except Exception as e:
+            print(f"Personal bulk failed: {e}")
             bulk_rows = None
+
+        personal_rows = bulk_rows if bulk_rows and len(bulk_rows) == expected_days else []
+        if not personal_rows:
             try:
-                if hasattr(personal_calc, "generate_personal_calendar"):
-                    birth_chart = personal_calc.calculate_birth_chart(
-                        birth_date_obj, birth_time_obj, birth_latitude,
-                        birth_longitude, timezone_offset
-                    )
-                    if birth_chart:
-                        bulk = personal_calc.generate_personal_calendar(
-                            birth_chart, p_start, p_end,
-                            birth_latitude, birth_longitude,
-                            timezone_offset, "composite"
+                cur = p_start
+                while cur <= p_end:
+                    try:
+                        daily_transits = personal_calc.calculate_daily_transits(
+                            cur, birth_latitude, birth_longitude, timezone_offset
                         )
-                        if isinstance(bulk, dict):
-                            bulk_rows = []
-                            for date_str, day_data in bulk.items():
-                                if day_data.get('personal_score'):
-                                    bulk_rows.append({
-                                        'date': date_str,
-                                        'day_score': {
-                                            'quality': day_data['personal_score'].get('quality', 'neutral'),
-                                            'score': day_data['personal_score'].get('score', 0),
-                                            'factors': day_data['personal_score'].get('factors', []),
-                                        },
-                                        'moon_house': day_data['personal_score'].get('moon_house'),
-                                        'moon_sign': day_data['personal_score'].get('transits', {}).get('moon_sign'),
-                                        'weekday': day_data.get('weekday', '')
-                                    })
+                        if daily_transits and birth_chart:
+                            day_score = personal_calc.score_personal_day(birth_chart, daily_transits)
+                            moon_house = personal_calc.calculate_moon_house_from_lagna(
+                                birth_chart["lagna_sign"], daily_transits["moon_sign"]
+                            )
+                            personal_rows.append({
+                                "date": cur.isoformat(),
+                                "day_score": day_score,
+                                "moon_house": moon_house,
+                                "moon_sign": daily_transits.get("moon_sign"),
+                                "transits": daily_transits,
+                            })
+                    except Exception:
+                        pass
+                    cur += timedelta(days=1)
             except Exception as e:
-                print(f"Personal bulk failed: {e}")
-                bulk_rows = None
+                print(f"Personal fallback error: {e}")
 
-            personal_rows = bulk_rows if bulk_rows and len(bulk_rows) == expected_days else []
-            if not personal_rows:
-                try:
-                    birth_chart = personal_calc.calculate_birth_chart(
-                        birth_date_obj, birth_time_obj, birth_latitude,
-                        birth_longitude, timezone_offset
-                    )
-                    cur = p_start
-                    while cur <= p_end:
-                        try:
-                            daily_transits = personal_calc.calculate_daily_transits(
-                                cur, birth_latitude, birth_longitude, timezone_offset
-                            )
-                            if daily_transits and birth_chart:
-                                day_score = personal_calc.score_personal_day(birth_chart, daily_transits)
-                                moon_house = personal_calc.calculate_moon_house_from_lagna(
-                                    birth_chart["lagna_sign"], daily_transits["moon_sign"]
-                                )
-                                personal_rows.append({
-                                    "date": cur.isoformat(),
-                                    "day_score": day_score,
-                                    "moon_house": moon_house,
-                                    "moon_sign": daily_transits.get("moon_sign"),
-                                    "transits": daily_transits,
-                                })
-                        except Exception:
-                            pass
-                        cur += timedelta(days=1)
-                except Exception as e:
-                    print(f"Personal fallback error: {e}")
+        personal_rows = _normalize_personal_rows(personal_rows, p_start, p_end)
 
-            personal_rows = _normalize_personal_rows(personal_rows, p_start, p_end)
+        nakshatra_transits_serializable = []
+        try:
+            tz_name = timezone_at(birth_latitude, birth_longitude)
+            nakshatra_transits_raw = find_nakshatra_transits_for_range(
+                p_start, p_end, tz_offset=timezone_offset,
+                lat=birth_latitude, lon=birth_longitude, tz_name=tz_name
+            )
+            for t in nakshatra_transits_raw:
+                st = t.get('start_time') or t.get('entry_time')
+                et = t.get('end_time') or t.get('exit_time')
+                nakshatra_transits_serializable.append({
+                    'nakshatra_num': t.get('nakshatra_num'),
+                    'nakshatra_name': t.get('nakshatra_name'),
+                    'ruler': t.get('ruler'),
+                    'entry_time': st.isoformat() if st else None,
+                    'exit_time': et.isoformat() if et else None,
+                })
+        except Exception:
+            pass
 
-            try:
-                birth_chart_payload = personal_calc.calculate_birth_chart(
-                    birth_date_obj, birth_time_obj, birth_latitude, birth_longitude, timezone_offset
-                )
-            except Exception:
-                birth_chart_payload = {}
+        return {
+            "calendar_type": "Enhanced_Personal_Transit",
+            "birth_chart": birth_chart,
+            "period": {"start_date": p_start.isoformat(), "end_date": p_end.isoformat()},
+            "total_periods": len(personal_rows),
+            "daily_results": personal_rows,
+            "nakshatra_transits": nakshatra_transits_serializable,
+        }
+    except Exception as e:
+        print(f"Personal calendar error: {e}")
+        traceback.print_exc()
+        return {"error": str(e)}
 
-            nakshatra_transits_serializable = []
-            try:
-                from timezonefinder import TimezoneFinder
-                tf = TimezoneFinder()
-                tz_name = tf.timezone_at(lat=birth_latitude, lng=birth_longitude)
-                nakshatra_transits_raw = find_nakshatra_transits_for_range(
-                    p_start, p_end, tz_offset=timezone_offset,
-                    lat=birth_latitude, lon=birth_longitude, tz_name=tz_name
-                )
-                for t in nakshatra_transits_raw:
-                    st = t.get('start_time') or t.get('entry_time')
-                    et = t.get('end_time') or t.get('exit_time')
-                    nakshatra_transits_serializable.append({
-                        'nakshatra_num': t.get('nakshatra_num'),
-                        'nakshatra_name': t.get('nakshatra_name'),
-                        'ruler': t.get('ruler'),
-                        'entry_time': st.isoformat() if st else None,
-                        'exit_time': et.isoformat() if et else None,
-                    })
-            except Exception:
-                pass
-
-            dashboard_results["calendars"]["personal"] = {
-                "calendar_type": "Enhanced_Personal_Transit",
-                "birth_chart": birth_chart_payload,
-                "period": {"start_date": p_start.isoformat(), "end_date": p_end.isoformat()},
-                "total_periods": len(personal_rows),
-                "daily_results": personal_rows,
-                "nakshatra_transits": nakshatra_transits_serializable,
-            }
-        except Exception as e:
-            print(f"Personal calendar error: {e}")
-            traceback.print_exc()
-            dashboard_results["calendars"]["personal"] = {"error": str(e)}
-    else:
-        dashboard_results["calendars"]["personal"] = {"error": "Birth data required"}
 
-    # 3) PTI Collective — check manual data first
+def _pti_calendar(start_date_pti, end_date_pti, manual_pti, cached_days=None):
     try:
-        start_date_pti, end_date_pti, _ = get_two_month_range()
-        manual_pti = db_manager.get_manual_calendar('magi', 'SUCCESS_LOVE', start_date_pti, end_date_pti)
-        if not manual_pti:
-            manual_pti = db_manager.get_manual_calendar('magi', 'COLLECTIVE', start_date_pti, end_date_pti)
-
         if manual_pti:
             pti_cls_map = {'Best': 'PTI Best', 'Good': 'PTI Go', 'Normal': 'Normal', 'Slow': 'PTI Slow', 'Worst': 'PTI Worst'}
             pti_result = []
@@ -368,7 +307,7 @@ def generate_dashboard_core(data: dict, user_id: str = None) -> dict:
                     'source': 'manual',
                 })
                 cur += timedelta(days=1)
-            dashboard_results["calendars"]["pti"] = {
+            return {
                 "calendar_type": "PTI_Collective",
                 "results": pti_result,
                 "period": {"start_date": start_date_pti.isoformat(), "end_date": end_date_pti.isoformat()},
@@ -378,10 +317,13 @@ def generate_dashboard_core(data: dict, user_id: str = None) -> dict:
         else:
             from core.magi_collective import PTICollectiveCalendar
             pti_system = PTICollectiveCalendar()
-            start_dt = datetime.combine(start_date_pti, datetime.min.time())
-            days_count_pti = (end_date_pti - start_date_pti).days + 1
-            pti_result = pti_system.generate_calendar(start_dt, days_count_pti)
-            dashboard_results["calendars"]["pti"] = {
+            pti_days = dict(cached_days or {})
+            for run_start, days_count_pti in missing_runs(start_date_pti, end_date_pti, pti_days):
+                start_dt = datetime.combine(run_start, datetime.min.time())
+                for day_result in pti_system.generate_calendar(start_dt, days_count_pti):
+                    pti_days[day_result["date"]] = serialize_day(day_result)
+            pti_result = [pti_days[d] for d in sorted(pti_days)]
+            return {
                 "calendar_type": "PTI_Collective",
                 "results": pti_result,
                 "period": {"start_date": start_date_pti.isoformat(), "end_date": end_date_pti.isoformat()},
@@ -390,13 +332,11 @@ def generate_dashboard_core(data: dict, user_id: str = None) -> dict:
     except Exception as e:
         print(f"PTI Collective error: {e}")
         traceback.print_exc()
-        dashboard_results["calendars"]["pti"] = {"error": str(e), "generated": False}
+        return {"error": str(e), "generated": False}
 
-    # 4) Vedic Collective — check manual data first
-    try:
-        start_date_vs, end_date_vs, _ = get_two_month_range()
-        manual_vedic = db_manager.get_manual_calendar('vedic', 'COLLECTIVE', start_date_vs, end_date_vs)
 
+def _vedic_calendar(start_date_vs, end_date_vs, manual_vedic, cached_days=None):
+    try:
         if manual_vedic:
             vedic_color_map = {'GO': 'green', 'MILD GO': 'mild_green', 'BUILD': 'purple', 'NEUTRAL': 'neutral', 'STOP': 'red', 'MEGA RED': 'mega_red'}
             vedic_layer_map = {'GO': 'L7', 'MILD GO': 'L8', 'BUILD': 'L4', 'NEUTRAL': 'L9', 'STOP': 'L2', 'MEGA RED': 'L1'}
@@ -418,7 +358,7 @@ def generate_dashboard_core(data: dict, user_id: str = None) -> dict:
                     'source': 'manual',
                 })
                 cur += timedelta(days=1)
-            dashboard_results["calendars"]["goslow"] = {
+            return {
                 "calendar_type": "Vedic_Collective_Calendar",
                 "period": {"start_date": start_date_vs.isoformat(), "end_date": end_date_vs.isoformat()},
                 "results": vedic_results,
@@ -427,13 +367,13 @@ def generate_dashboard_core(data: dict, user_id: str = None) -> dict:
             }
         else:
             from core.vedic_collective import classify_day_rules
-            cur = start_date_vs
-            vedic_results = []
-            while cur <= end_date_vs:
-                day_result = classify_day_rules(cur)
-                vedic_results.append(day_result)
-                cur += timedelta(days=1)
-            dashboard_results["calendars"]["goslow"] = {
+            vedic_days = dict(cached_days or {})
+            for run_start, run_days in missing_runs(start_date_vs, end_date_vs, vedic_days):
+                for offset in range(run_days):
+                    day_result = classify_day_rules(run_start + timedelta(days=offset))
+                    vedic_days[day_result["date"]] = serialize_day(day_result)
+            vedic_results = [vedic_days[d] for d in sorted(vedic_days)]
+            return {
                 "calendar_type": "Vedic_Collective_Calendar",
                 "period": {"start_date": start_date_vs.isoformat(), "end_date": end_date_vs.isoformat()},
                 "results": vedic_results,
@@ -442,13 +382,169 @@ def generate_dashboard_core(data: dict, user_id: str = None) -> dict:
     except Exception as e:
         print(f"Vedic Collective error: {e}")
         traceback.print_exc()
-        dashboard_results["calendars"]["goslow"] = {"error": str(e), "generated": False}
+        return {"error": str(e), "generated": False}
 
-    # 5) Combined
+
+def _timed_step(func, *args):
+    started = time.perf_counter()
+    result = func(*args)
+    return result, round(time.perf_counter() - started, 3)
+
+
+def _worker_step(func, *args):
+    """_timed_step in a pool worker, also returning the engine counters the step added there."""
+    result, seconds = _timed_step(func, *args)
+    return result, seconds, drain_counters()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: Swiss Ephemeris globals and the DB pool are not inherited
+            _executor = ProcessPoolExecutor(
+                max_workers=DASHBOARD_WORKERS,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def resolve_parallel(parallel=None) -> bool:
+    """Whether steps run in worker processes: the request's 'parallel' flag, DASHBOARD_PARALLEL and the pool size."""
+    if parallel is None:
+        parallel = DASHBOARD_PARALLEL
+    return str(parallel).lower() not in _PARALLEL_OFF and DASHBOARD_WORKERS > 1
+
+
+def run_dashboard_steps(steps, parallel=None):
+    """
+    Run independent dashboard steps, in worker processes when parallel.
+
+    steps maps a calendar name to (function, args); the functions must be
+    module-level so they can be sent to the workers. Returns
+    (results, timings) keyed by calendar name, with the seconds each step
+    took inside its worker; the engine counters workers add are merged into
+    this process. Steps whose worker fails are rerun in-process, and
+    everything runs in-process when only one worker is configured.
+    """
+    if parallel is None:
+        parallel = DASHBOARD_PARALLEL
+    results, timings = {}, {}
+
+    if parallel and len(steps) > 1 and DASHBOARD_WORKERS > 1:
+        try:
+            executor = _get_executor()
+            futures = {name: executor.submit(_worker_step, func, *args)
+                       for name, (func, args) in steps.items()}
+        except Exception as e:
+            print(f"Dashboard worker pool unavailable: {e}")
+            futures = {}
+        for name, future in futures.items():
+            try:
+                results[name], timings[name], step_counters = future.result()
+                merge_counters(step_counters)
+            except BrokenProcessPool as e:
+                print(f"Dashboard worker pool broken ({name}): {e}")
+                _reset_executor()
+            except Exception as e:
+                print(f"Dashboard worker error ({name}): {e}")
+
+    for name, (func, args) in steps.items():
+        if name not in results:
+            results[name], timings[name] = _timed_step(func, *args)
+    return results, timings
+
+
+def generation_inputs(data: dict) -> dict:
+    """Birth data, location and period of a generation request, with session defaults."""
+    user_defaults = get_user_defaults()
+
+    if "days" in data and data.get("days") is not None:
+        days = int(data.get("days"))
+    else:
+        _, _, days = get_two_month_range()
+
+    return {
+        "birth_date": data.get("birth_date") or user_defaults.get("birth_date"),
+        "birth_time": data.get("birth_time") or user_defaults.get("birth_time"),
+        "birth_latitude": float(data.get("birth_latitude") or user_defaults.get("birth_latitude", 25.76)),
+        "birth_longitude": float(data.get("birth_longitude") or user_defaults.get("birth_longitude", -80.19)),
+        "location": data.get("location") or user_defaults.get("location", "Miami, FL"),
+        "latitude": float(data.get("latitude") or user_defaults.get("latitude", 25.76)),
+        "longitude": float(data.get("longitude") or user_defaults.get("longitude", -80.19)),
+        "timezone_offset": _tz_offset_hours(data, user_defaults, fallback=-5.0),
+        "timezone": data.get("timezone") or user_defaults.get("timezone"),
+        "days": days,
+    }
+
+
+def collective_inputs() -> dict:
+    """Range, manual entries and cached days for the collective calendars (request-bound)."""
+    range_start, range_end, _ = get_two_month_range()
+    manual_pti = db_manager.get_manual_calendar('magi', 'SUCCESS_LOVE', range_start, range_end)
+    if not manual_pti:
+        manual_pti = db_manager.get_manual_calendar('magi', 'COLLECTIVE', range_start, range_end)
+    manual_vedic = db_manager.get_manual_calendar('vedic', 'COLLECTIVE', range_start, range_end)
+    return {
+        "range_start": range_start,
+        "range_end": range_end,
+        "manual_pti": manual_pti,
+        "manual_vedic": manual_vedic,
+        "cached_pti": {} if manual_pti else get_cached_days('pti', range_start, range_end),
+        "cached_vedic": {} if manual_vedic else get_cached_days('vedic', range_start, range_end),
+    }
+
+
+def collective_steps(collective: dict) -> dict:
+    """PTI Collective and Vedic Collective steps for run_dashboard_steps."""
+    return {
+        "pti": (_pti_calendar, (collective["range_start"], collective["range_end"],
+                                collective["manual_pti"], collective["cached_pti"])),
+        "goslow": (_vedic_calendar, (collective["range_start"], collective["range_end"],
+                                     collective["manual_vedic"], collective["cached_vedic"])),
+    }
+
+
+def personal_steps(inputs: dict, collective: dict) -> dict:
+    """Bird Batch and (with birth data) Personal steps for run_dashboard_steps."""
+    steps = {
+        "bird_batch": (_bird_batch_calendar, (
+            datetime.now().strftime("%Y-%m-%d"), inputs["days"], inputs["birth_date"], inputs["birth_time"],
+            inputs["birth_latitude"], inputs["birth_longitude"],
+        )),
+    }
+    if inputs["birth_date"] and inputs["birth_time"]:
+        steps["personal"] = (_personal_calendar, (
+            inputs["birth_date"], inputs["birth_time"], inputs["birth_latitude"], inputs["birth_longitude"],
+            inputs["timezone_offset"], collective["range_start"], collective["range_end"],
+        ))
+    return steps
+
+
+def store_collective_days(step_results: dict, collective: dict):
+    """Share newly computed collective days with every other user and client."""
+    for name, cache_type, manual, cached in (
+            ("pti", "pti", collective["manual_pti"], collective["cached_pti"]),
+            ("goslow", "vedic", collective["manual_vedic"], collective["cached_vedic"])):
+        results = step_results[name].get("results") or []
+        if not manual and len(cached) < len(results):
+            store_days(cache_type, {r["date"]: r for r in results if r.get("date") not in cached})
+
+
+def combined_calendar(calendars: dict) -> dict:
+    """The Combined calendar from the personal, PTI and Vedic calendars."""
     try:
         from core.combined_calendar import CombinedCalendarAnalyzer
         combined_calc = CombinedCalendarAnalyzer()
-        personal_data = dashboard_results["calendars"].get("personal", {})
+        personal_data = calendars.get("personal", {})
         daily_results = personal_data.get("daily_results", [])
         daily_scores = {}
         for item in daily_results:
@@ -466,11 +562,11 @@ def generate_dashboard_core(data: dict, user_id: str = None) -> dict:
 
         calendar_data_for_combined = {
             "personal": {"data": {"daily_periods": daily_results, "daily_scores": daily_scores}},
-            "pti_collective": {"data": dashboard_results["calendars"].get("pti", {})},
-            "vedic_pti": {"data": dashboard_results["calendars"].get("goslow", {})},
+            "pti_collective": {"data": calendars.get("pti", {})},
+            "vedic_pti": {"data": calendars.get("goslow", {})},
         }
         combined_result = combined_calc.analyze_calendar_data(calendar_data_for_combined)
-        dashboard_results["calendars"]["combined"] = {
+        return {
             "calendar_type": "Combined_All_Calendar",
             "results": combined_result.get("results", []),
             "summary": combined_result.get("summary", {}),
@@ -479,9 +575,104 @@ def generate_dashboard_core(data: dict, user_id: str = None) -> dict:
     except Exception as e:
         print(f"Combined calendar error: {e}")
         traceback.print_exc()
-        dashboard_results["calendars"]["combined"] = {"error": str(e), "generated": False}
+        return {"error": str(e), "generated": False}
+
+
+def calendar_record(inputs: dict, calendars: dict, background_days: list) -> dict:
+    """The JSON-safe calendar data saved for a user or client."""
+    return make_json_serializable({
+        "birth_data": {
+            "birth_date": inputs["birth_date"], "birth_time": inputs["birth_time"],
+            "birth_latitude": inputs["birth_latitude"], "birth_longitude": inputs["birth_longitude"],
+            "timezone_offset": inputs["timezone_offset"], "timezone": inputs["timezone"],
+        },
+        "location": {"name": inputs["location"], "latitude": inputs["latitude"], "longitude": inputs["longitude"]},
+        "background_days": background_days,
+        "calendars": calendars,
+        "period": {"days": inputs["days"], "generated_at": datetime.now().isoformat()},
+    })
+
+
+def generate_dashboard_core(data: dict, user_id: str = None, progress=None) -> dict:
+    if user_id and data.get("force_regenerate"):
+        try:
+            db_manager.clear_calendar_data(user_id)
+        except Exception:
+            pass
+
+    try:
+        if user_id and not data.get("force_regenerate"):
+            saved = db_manager.get_calendar_data(user_id)
+            if saved:
+                cached_days = saved.get("period", {}).get("days", 60)
+                requested_days = data.get("days")
+                if requested_days is None:
+                    _, _, requested_days = get_two_month_range()
+                try:
+                    requested_days = int(requested_days) if requested_days else 60
+                    cached_days = int(cached_days) if cached_days else 60
+                except (ValueError, TypeError):
+                    requested_days = 60
+                    cached_days = 60
+
+                if abs(cached_days - requested_days) <= 2:
+                    cached_result = {
+                        "dashboard_type": "Complete_6_Calendar_Dashboard",
+                        "period": {"days": cached_days, "generated_at": saved.get("period", {}).get("generated_at")},
+                        "calendars": saved.get("calendars", {}),
+                        "from_cache": True,
+                        "background_days": saved.get("background_days", []),
+                    }
+                    cached_result = normalize_dashboard_data(cached_result)
+                    return cached_result
+    except Exception:
+        traceback.print_exc()
+
+    inputs = generation_inputs(data)
+    days = inputs["days"]
+
+    dashboard_results = {
+        "dashboard_type": "Complete_6_Calendar_Dashboard",
+        "period": {"days": days, "generated_at": datetime.now().isoformat()},
+        "calendars": {},
+    }
+
+    parallel = resolve_parallel(data.get("parallel"))
+    started = time.perf_counter()
+
+    # Request-bound lookups (session range, manual entries) stay in this process
+    collective = collective_inputs()
+
+    # 1-4) Bird Batch, Personal, PTI Collective and Vedic Collective are independent
+    steps = dict(collective_steps(collective))
+    steps.update(personal_steps(inputs, collective))
+
+    if progress:
+        progress("engines", 10)
+    step_results, timings = run_dashboard_steps(steps, parallel)
+    step_results.setdefault("personal", {"error": "Birth data required"})
+    for name in ("bird_batch", "personal", "pti", "goslow"):
+        dashboard_results["calendars"][name] = step_results[name]
+
+    # Share newly computed collective days with every other user and client
+    store_collective_days(step_results, collective)
+
+    # 5) Combined
+    if progress:
+        progress("combined", 70)
+    combined_started = time.perf_counter()
+    dashboard_results["calendars"]["combined"] = combined_calendar(dashboard_results["calendars"])
+    timings["combined"] = round(time.perf_counter() - combined_started, 3)
+
+    dashboard_results["timings"] = {
+        "mode": "process" if parallel else "sequential",
+        "engines": timings,
+        "total": round(time.perf_counter() - started, 3),
+    }
 
     # Save to DB
+    if progress:
+        progress("saving", 85)
     background_days_to_save = []
     try:
         if user_id:
@@ -490,28 +681,35 @@ def generate_dashboard_core(data: dict, user_id: str = None) -> dict:
                 background_days_to_save = selected_dates_from_request
             else:
                 try:
-                    existing_saved = db_manager.get_calendar_data(user_id)
+                    existing_saved = db_manager.get_calendar_data(user_id, sections=('background_days',))
                     if existing_saved:
                         background_days_to_save = existing_saved.get("background_days", [])
                 except Exception:
                     pass
 
-            calendar_data_to_save = {
-                "birth_data": {
-                    "birth_date": birth_date, "birth_time": birth_time,
-                    "birth_latitude": birth_latitude, "birth_longitude": birth_longitude,
-                    "timezone_offset": timezone_offset, "timezone": timezone_label,
-                },
-                "location": {"name": location, "latitude": latitude, "longitude": longitude},
-                "background_days": background_days_to_save,
-                "calendars": dashboard_results["calendars"],
-                "period": {"days": days, "generated_at": datetime.now().isoformat()},
-            }
-            calendar_data_to_save = make_json_serializable(calendar_data_to_save)
+            calendar_data_to_save = calendar_record(inputs, dashboard_results["calendars"], background_days_to_save)
             json.dumps(calendar_data_to_save)
             db_manager.save_calendar_data(user_id, calendar_data_to_save)
+            if progress:
+                progress("microbird", 90)
+            materialize_microbird(user_id, calendar_data_to_save)
     except Exception:
         traceback.print_exc()
 
     dashboard_results["background_days"] = background_days_to_save
     return dashboard_results
+
+
+def calendar_summary(results: dict) -> dict:
+    """Per-calendar status ('ready', 'partial' or 'error') of a dashboard result."""
+    summary = {}
+    calendars = (results or {}).get("calendars", {})
+    for cal_name, cal_data in calendars.items():
+        if isinstance(cal_data, dict):
+            if cal_data.get("error"):
+                summary[cal_name] = {"status": "error", "error": str(cal_data["error"])}
+            elif cal_data.get("generated") or cal_data.get("results") or cal_data.get("daily_results"):
+                summary[cal_name] = {"status": "ready"}
+            else:
+                summary[cal_name] = {"status": "partial"}
+    return summary
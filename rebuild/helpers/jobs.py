@@ -0,0 +1,300 @@
+"""
+Background calendar generation jobs
+Generation requests are queued as generation_jobs rows and return a job id
+straight away; workers claim queued rows (FOR UPDATE SKIP LOCKED on
+Postgres), run generate_dashboard_core and record stage and progress on the
+row, and on Client.calendar_status for client jobs.
+
+Workers run in the web process (JOB_EMBEDDED_WORKERS threads, default 1) or
+as separate processes:
+
+    python -m helpers.jobs --processes 4 --bulk-limit 1
+
+Bulk jobs (priority PRIORITY_BULK) are only claimed while fewer than
+JOB_BULK_LIMIT of them run on this host, so a large batch of client
+regenerations leaves workers free for interactive requests. On Postgres the
+count and the claim share a per-host advisory lock, so two workers cannot
+both pass the limit.
+"""
+
+import argparse
+import json
+import os
+import socket
+import threading
+import traceback
+from datetime import datetime, timedelta
+
+from sqlalchemy import text
+
+from database.models import db, GenerationJob, Client
+from helpers.client_batch import regenerate_clients
+from helpers.dashboard import generate_dashboard_core, calendar_summary
+from helpers.utils import make_json_serializable
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 10
+ACTIVE_STATUSES = ('queued', 'running')
+
+JOB_BULK_LIMIT = int(os.environ.get('JOB_BULK_LIMIT', '1'))
+JOB_POLL_SECONDS = float(os.environ.get('JOB_POLL_SECONDS', '1.0'))
+JOB_TIMEOUT_SECONDS = int(os.environ.get('JOB_TIMEOUT_SECONDS', '3600'))
+MAX_SESSION_JOBS = 50
+
+HOST = socket.gethostname()
+
+_wakeup = threading.Event()
+_workers = []
+
+
+def _same_inputs(job, payload, context):
+    def key(value):
+        return json.dumps(value or {}, sort_keys=True, default=str)
+    return key(job.payload) == key(payload) and key(job.context) == key(context)
+
+
+def enqueue_job(kind, payload, subject=None, client_id=None, priority=PRIORITY_INTERACTIVE, context=None):
+    """
+    Queue a generation job and return its id. A queued or running job for the
+    same kind, subject and inputs is reused instead of starting a second one;
+    a queued job with other inputs is updated to the new ones.
+    """
+    payload = make_json_serializable(payload)
+    context = make_json_serializable(context or {})
+    if subject:
+        expire_stale_jobs()
+        active = GenerationJob.query.filter(
+            GenerationJob.kind == kind,
+            GenerationJob.subject == subject,
+            GenerationJob.status.in_(ACTIVE_STATUSES),
+        ).order_by(GenerationJob.id.desc()).with_for_update().all()
+        for existing in active:
+            if _same_inputs(existing, payload, context):
+                job_id = existing.id
+                db.session.rollback()
+                return job_id
+        for existing in active:
+            if existing.status == 'queued':
+                existing.payload = payload
+                existing.context = context
+                db.session.commit()
+                _wakeup.set()
+                return existing.id
+
+    job = GenerationJob(
+        kind=kind,
+        subject=subject,
+        client_id=client_id,
+        payload=payload,
+        context=context,
+        priority=priority,
+        status='queued',
+        stage='queued',
+        progress=0,
+    )
+    db.session.add(job)
+    if client_id:
+        client = Client.query.get(client_id)
+        if client:
+            client.calendar_status = 'queued'
+    db.session.commit()
+    _wakeup.set()
+    return job.id
+
+
+def session_context():
+    """The parts of the requester's session generation reads (calendar range, profile defaults)."""
+    from flask import session
+    return {key: session[key] for key in ('user_info', 'user_profile') if key in session}
+
+
+def remember_job(job_id):
+    """Allow the current session to poll the job."""
+    from flask import session
+    jobs = [j for j in session.get('jobs', []) if j != job_id]
+    session['jobs'] = (jobs + [job_id])[-MAX_SESSION_JOBS:]
+
+
+def can_view_job(job_id):
+    from flask import session
+    return job_id in session.get('jobs', [])
+
+
+def expire_stale_jobs():
+    """Fail running jobs older than JOB_TIMEOUT_SECONDS (their worker is gone)."""
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_TIMEOUT_SECONDS)
+    stale = GenerationJob.query.filter(
+        GenerationJob.status == 'running',
+        GenerationJob.started_at < cutoff,
+    ).all()
+    for job in stale:
+        job.status = job.stage = 'error'
+        job.error = 'Job timed out'
+        job.finished_at = datetime.utcnow()
+        if job.client_id:
+            client = Client.query.get(job.client_id)
+            if client:
+                client.calendar_status = 'error'
+    if stale:
+        db.session.commit()
+    return len(stale)
+
+
+def get_job(job_id, include_result=False):
+    """Job status as a dict, or None."""
+    job = GenerationJob.query.get(job_id)
+    return job.to_dict(include_result=include_result) if job else None
+
+
+def _running_bulk_jobs():
+    return GenerationJob.query.filter(
+        GenerationJob.status == 'running',
+        GenerationJob.priority >= PRIORITY_BULK,
+        GenerationJob.worker.like(f'{HOST}:%'),
+    ).count()
+
+
+def _lock_bulk_count():
+    """Hold this host's claim lock until the transaction ends (Postgres only)."""
+    if db.engine.dialect.name == 'postgresql':
+        db.session.execute(text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+                           {'key': f'generation_jobs:bulk:{HOST}'})
+
+
+def claim_next_job(worker_id, bulk_limit=JOB_BULK_LIMIT):
+    """Mark the next queued job as running for this worker and return it (None if idle)."""
+    try:
+        expire_stale_jobs()
+        _lock_bulk_count()
+        query = GenerationJob.query.filter(GenerationJob.status == 'queued')
+        if _running_bulk_jobs() >= bulk_limit:
+            query = query.filter(GenerationJob.priority < PRIORITY_BULK)
+        job = query.order_by(
+            GenerationJob.priority, GenerationJob.created_at, GenerationJob.id
+        ).with_for_update(skip_locked=True).first()
+        if not job:
+            db.session.rollback()
+            return None
+        job.status = 'running'
+        job.stage = 'starting'
+        job.worker = worker_id
+        job.started_at = datetime.utcnow()
+        if job.client_id:
+            client = Client.query.get(job.client_id)
+            if client:
+                client.calendar_status = 'generating'
+        db.session.commit()
+        return job
+    except Exception as e:
+        print(f"Error claiming generation job: {e}")
+        db.session.rollback()
+        return None
+
+
+def _set_progress(job_id, stage, percent):
+    try:
+        GenerationJob.query.filter_by(id=job_id).update({'stage': stage, 'progress': int(percent)})
+        db.session.commit()
+    except Exception as e:
+        print(f"Error updating job {job_id} progress: {e}")
+        db.session.rollback()
+
+
+def _generate(job, progress):
+    if job.kind == 'clients_bulk':
+        return regenerate_clients(job.subject, progress=progress)
+    results = generate_dashboard_core(dict(job.payload), user_id=job.subject, progress=progress)
+    if results and results.get('error'):
+        raise RuntimeError(results['error'])
+    if job.kind == 'client':
+        return {'calendar_summary': calendar_summary(results)}
+    if job.kind == 'dashboard':
+        return make_json_serializable(results)
+    return {'status': 'success'}
+
+
+def run_job(app, job):
+    """Run a claimed job inside a request context carrying the requester's session."""
+    job_id = job.id
+    try:
+        with app.test_request_context():
+            from flask import session
+            session.update(job.context or {})
+            result = _generate(job, lambda stage, percent: _set_progress(job_id, stage, percent))
+        status, error = 'done', None
+    except Exception as e:
+        traceback.print_exc()
+        db.session.rollback()
+        result, status, error = None, 'error', str(e)
+
+    job = GenerationJob.query.get(job_id)
+    job.status = status
+    job.stage = status
+    job.error = error
+    job.result_json = result
+    job.finished_at = datetime.utcnow()
+    if status == 'done':
+        job.progress = 100
+    if job.client_id:
+        client = Client.query.get(job.client_id)
+        if client:
+            client.calendar_status = 'ready' if status == 'done' else 'error'
+            if status == 'done':
+                client.last_generated_at = job.finished_at
+    db.session.commit()
+    return status
+
+
+def work(app, bulk_limit=JOB_BULK_LIMIT, stop=None):
+    """Claim and run jobs until stop is set."""
+    worker_id = f'{HOST}:{os.getpid()}:{threading.get_ident()}'
+    while stop is None or not stop.is_set():
+        with app.app_context():
+            job = claim_next_job(worker_id, bulk_limit)
+            if job:
+                run_job(app, job)
+                continue
+        _wakeup.wait(JOB_POLL_SECONDS)
+        _wakeup.clear()
+
+
+def start_embedded_workers(app, count=None):
+    """Start worker threads in the web process (none with JOB_EMBEDDED_WORKERS=0)."""
+    if count is None:
+        count = int(os.environ.get('JOB_EMBEDDED_WORKERS', '1'))
+    if _workers or count <= 0:
+        return
+    for _ in range(count):
+        worker = threading.Thread(target=work, args=(app,), daemon=True, name='generation-worker')
+        worker.start()
+        _workers.append(worker)
+
+
+def _worker_process(bulk_limit):
+    os.environ['JOB_EMBEDDED_WORKERS'] = '0'
+    from app import create_app
+    work(create_app(), bulk_limit)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run calendar generation workers.')
+    parser.add_argument('--processes', type=int, default=1, help='worker processes to start')
+    parser.add_argument('--bulk-limit', type=int, default=JOB_BULK_LIMIT,
+                        help='bulk jobs allowed to run at once on this host')
+    args = parser.parse_args(argv)
+
+    import multiprocessing
+    processes = [multiprocessing.Process(target=_worker_process, args=(args.bulk_limit,))
+                 for _ in range(max(1, args.processes))]
+    for process in processes:
+        process.start()
+    try:
+        for process in processes:
+            process.join()
+    except KeyboardInterrupt:
+        for process in processes:
+            process.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,227 @@
+"""
+MicroBird materialization
+Overlaps of bird batch periods with the Yogi Point, Part of Fortune and WB3
+microtransits on background days. They are computed once per subject when
+its calendar is generated, stored in the microbird_events table, and read by
+the ICS feed, the Publer push and the client API. A fingerprint of the
+inputs (background days, bird periods, birth data, window) triggers a
+recompute when any of them changes.
+"""
+
+import hashlib
+import json
+from datetime import datetime, date, timedelta
+
+from database.manager import db_manager
+from helpers.transit_store import get_transits
+
+BACKGROUND_CLASSIFICATIONS = ('OMNI', 'DOUBLE GO', 'DOUBLE_GO', 'GOOD')
+# Calendar data sections MicroBird events are derived from
+SECTIONS = ('calendars.combined', 'calendars.bird_batch', 'period')
+TIME_FORMATS = ('%I:%M %p', '%I:%M:%S %p', '%H:%M:%S', '%H:%M')
+
+
+def background_dates(saved_data):
+    """Dates classified as background days in the combined calendar."""
+    calendars = (saved_data or {}).get('calendars', {})
+    combined_cal = calendars.get('combined', {})
+    combined_results = (
+        combined_cal.get('data', {}).get('results', [])
+        or combined_cal.get('results', [])
+    )
+    bg_dates = set()
+    for day in combined_results:
+        if not isinstance(day, dict) or not day.get('date'):
+            continue
+        classification = str(day.get('classification', '')).upper()
+        if classification in BACKGROUND_CLASSIFICATIONS or day.get('is_background', False):
+            bg_dates.add(day['date'])
+    return bg_dates
+
+
+def _parse_time(day_date, time_str):
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.combine(day_date, datetime.strptime(time_str, fmt).time())
+        except ValueError:
+            continue
+    raise ValueError(f"Cannot parse time: {time_str}")
+
+
+def bird_windows(saved_data, bg_dates):
+    """Bird batch periods on background days, with their rank within the day."""
+    bird_cal = (saved_data or {}).get('calendars', {}).get('bird_batch', {})
+    daily_results = bird_cal.get('daily_results', []) or bird_cal.get('results', [])
+    if not daily_results and isinstance(bird_cal.get('data'), dict):
+        daily_results = bird_cal['data'].get('daily_results', [])
+
+    windows = []
+    for day_data in daily_results:
+        day_date_str = day_data.get('date', '')
+        if day_date_str not in bg_dates:
+            continue
+        try:
+            day_date = datetime.strptime(day_date_str, '%Y-%m-%d').date()
+        except ValueError:
+            continue
+        for rank, period in enumerate(day_data.get('periods', [])):
+            try:
+                start = _parse_time(day_date, period.get('start_time', ''))
+                end = _parse_time(day_date, period.get('end_time', ''))
+            except (ValueError, TypeError):
+                continue
+            if end <= start:
+                end += timedelta(days=1)
+            windows.append({
+                'date': day_date_str,
+                'start': start,
+                'end': end,
+                'rank': rank,
+                'tier': period.get('tier', ''),
+                'bird': period.get('bird', ''),
+                'activity': period.get('sub_activity', period.get('main_activity', period.get('activity', ''))),
+            })
+    return windows
+
+
+def overlap_join(transits, windows):
+    """
+    Yield every (transit, window) pair whose intervals overlap, with a
+    sweep over both lists sorted by start instead of comparing every pair.
+    """
+    windows = sorted(windows, key=lambda w: w['start'])
+    active = []
+    next_window = 0
+    for transit in sorted(transits, key=lambda t: t['start']):
+        while next_window < len(windows) and windows[next_window]['start'] < transit['end']:
+            active.append(windows[next_window])
+            next_window += 1
+        # Transit starts only increase, so windows ending before this one are done
+        active = [w for w in active if w['end'] > transit['start']]
+        for window in active:
+            if window['start'] < transit['end']:
+                yield transit, window
+
+
+def _subject_record(subject):
+    if subject.startswith('client_'):
+        from database.models import Client
+        return Client.query.get(int(subject.split('_', 1)[1]))
+    from database.models import UserProfile
+    return UserProfile.query.filter_by(email=subject).first()
+
+
+def subject_engines(subject):
+    """(source, engine) pairs for the subject: Yogi Point always, PoF and WB3 with birth data."""
+    from microtransits.yp import YPEngine
+    from microtransits.wb1 import WB1Engine
+    from microtransits.wb3 import WB3Engine
+
+    rec = _subject_record(subject)
+    location = None
+    if rec:
+        lat = rec.current_latitude or rec.birth_latitude
+        lon = rec.current_longitude or rec.birth_longitude
+        if lat and lon:
+            location = (float(lat), float(lon))
+
+    engines = [('YP', YPEngine(location=location))]
+    if rec and rec.birth_date and rec.birth_time:
+        birth_dt = datetime.combine(rec.birth_date, rec.birth_time)
+        engines.append(('PoF', WB1Engine(birth_dt, location=location)))
+        engines.append(('WB3', WB3Engine(birth_dt, location=location)))
+    return engines
+
+
+def _naive(value):
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    return value.replace(tzinfo=None)
+
+
+def _window(saved_data):
+    try:
+        days = int((saved_data or {}).get('period', {}).get('days', 60))
+    except (ValueError, TypeError):
+        days = 60
+    start_date = datetime.combine(date.today(), datetime.min.time())
+    return start_date, start_date + timedelta(days=days)
+
+
+def subject_transits(subject, saved_data, force=False):
+    """{source: transits} for the subject's window, from the transit store, with naive start/end."""
+    start_date, end_date = _window(saved_data)
+    transits = {}
+    for source, engine in subject_engines(subject):
+        try:
+            found, _ = get_transits(subject, engine, start_date, end_date, force=force)
+        except Exception as e:
+            print(f"{source} transit error for {subject}: {e}")
+            found = []
+        transits[source] = [dict(t, start=_naive(t['start']), end=_naive(t['end'])) for t in found]
+    return transits
+
+
+def _fingerprint(subject, saved_data, bg_dates, windows):
+    start_date, end_date = _window(saved_data)
+    params = {
+        'window': [start_date.isoformat(), end_date.isoformat()],
+        'background_days': sorted(bg_dates),
+        'bird_windows': [[w['start'].isoformat(), w['end'].isoformat(), w['tier'], w['activity']]
+                         for w in windows],
+        'engines': [repr(engine) for _, engine in subject_engines(subject)],
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def materialize(subject, saved_data, force=False):
+    """Compute and store the subject's MicroBird events; returns them."""
+    bg_dates = background_dates(saved_data)
+    windows = bird_windows(saved_data, bg_dates)
+    fingerprint = _fingerprint(subject, saved_data, bg_dates, windows)
+
+    all_transits = []
+    if windows:
+        for source, transits in subject_transits(subject, saved_data, force=force).items():
+            all_transits.extend(dict(t, _source=source) for t in transits)
+
+    events = []
+    for transit, window in overlap_join(all_transits, windows):
+        if transit['start'].strftime('%Y-%m-%d') != window['date']:
+            continue
+        overlap_start = max(transit['start'], window['start'])
+        overlap_end = min(transit['end'], window['end'])
+        duration = int((overlap_end - overlap_start).total_seconds() / 60)
+        if duration < 1:
+            continue
+        events.append({
+            'date': date.fromisoformat(window['date']),
+            'start': overlap_start,
+            'end': overlap_end,
+            'duration_minutes': duration,
+            'transit_source': transit['_source'],
+            'transit_name': transit.get('planet') or transit.get('type') or transit.get('description', ''),
+            'transit_code': transit.get('transit_code', ''),
+            'bird_tier': window['tier'],
+            'bird': window['bird'],
+            'activity': window['activity'],
+            'period_rank': window['rank'],
+        })
+    events.sort(key=lambda e: e['start'])
+
+    db_manager.save_microbird_events(subject, fingerprint, _window(saved_data)[0].date(), events)
+    return [dict(e, date=e['date'].isoformat()) for e in events]
+
+
+def get_microbird_events(subject, saved_data=None, force=False):
+    """The subject's stored MicroBird events, recomputed first if their inputs changed."""
+    if saved_data is None:
+        saved_data = db_manager.get_calendar_data(subject, sections=SECTIONS)
+    if not saved_data:
+        return []
+
+    bg_dates = background_dates(saved_data)
+    windows = bird_windows(saved_data, bg_dates)
+    if force or db_manager.get_microbird_fingerprint(subject) != _fingerprint(subject, saved_data, bg_dates, windows):
+        return materialize(subject, saved_data, force=force)
+    return db_manager.get_microbird_events(subject, _window(saved_data)[0].date())
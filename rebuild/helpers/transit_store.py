@@ -0,0 +1,130 @@
+"""
+Persistent microtransit event store
+Events are kept per (subject, engine, parameters hash) in the
+microtransit_events table, with the computed window recorded in
+microtransit_coverage. When the rolling window moves forward only the newly
+added days are scanned, starting from the earliest transit that was still
+open at the old edge; events before the window are kept for auditing.
+Engines that read wall-clock times in a zone (wall_clock_tz) are scanned in
+that zone and their events stored in UTC.
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+
+from helpers.utils import make_json_serializable
+from database.manager import db_manager
+
+# Bump an engine's version when its scan logic changes; old events are then ignored
+STORE_VERSIONS = {
+    'yp': 'solver-2',
+    'wb1': 'solver-2',
+    'wb3': 'scan-2',
+}
+# Engines without reports_open_runs re-scan this much of the covered window
+# instead; only transits shorter than it keep their real start
+EXTENSION_OVERLAP = timedelta(days=1)
+DUPLICATE_TOLERANCE = 60  # seconds between edges of the same stored event
+
+
+def _utc_naive(value, tz=None):
+    """
+    Naive UTC datetime for a datetime or ISO string. Naive input is UTC, as in
+    the engines, or wall-clock time in tz when given (any label is ignored).
+    """
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if tz is not None:
+        value = value.replace(tzinfo=tz)
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _wall_clock(engine, value):
+    """A naive UTC datetime as the engine's naive wall-clock time."""
+    if engine.wall_clock_tz is None:
+        return value
+    return value.replace(tzinfo=timezone.utc).astimezone(engine.wall_clock_tz).replace(tzinfo=None)
+
+
+def params_hash(engine):
+    """Hash of everything an engine's scan depends on."""
+    params = {
+        'engine': engine.name,
+        'version': STORE_VERSIONS.get(engine.name, '1'),
+        'birth_date': engine.birth_date.isoformat() if engine.birth_date else None,
+        'location': list(engine.location),
+        'birth_location': list(engine.birth_location),
+        'orb': engine.orb,
+    }
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+
+def _to_rows(transits, tz=None):
+    rows = []
+    for transit in transits:
+        if tz is not None:
+            # Keep the wall-clock times in the event, with their real offset
+            transit = {k: v.replace(tzinfo=tz) if isinstance(v, datetime) else v
+                       for k, v in transit.items()}
+        event_json = json.loads(json.dumps(make_json_serializable(transit), default=str))
+        rows.append((transit.get('transit_code'), _utc_naive(transit['start']),
+                     _utc_naive(transit['end']), event_json))
+    return rows
+
+
+def _is_stored(row, stored, scan_start):
+    """Whether a freshly scanned event is already in the store."""
+    code, start, end, _ = row
+    for stored_code, stored_start, stored_end, _ in stored:
+        if stored_code != code:
+            continue
+        if abs((stored_start - start).total_seconds()) <= DUPLICATE_TOLERANCE \
+                and abs((stored_end - end).total_seconds()) <= DUPLICATE_TOLERANCE:
+            return True
+        # Open at the re-scan start: the scan reports it truncated there
+        if start <= scan_start and stored_start <= scan_start <= stored_end:
+            return True
+    return False
+
+
+def get_transits(subject, engine, start_date, end_date, force=False):
+    """
+    Transits of the engine between start_date and end_date (naive is UTC),
+    as JSON-safe dicts ordered by start, and whether they all came from the
+    store. Only the part of the window not yet covered for this subject is
+    scanned; force re-scans the whole window and replaces its events.
+    """
+    start_date, end_date = _utc_naive(start_date), _utc_naive(end_date)
+    key = (subject, engine.name, params_hash(engine))
+    coverage = None if force else db_manager.get_transit_coverage(*key)
+
+    if coverage and coverage[0] <= start_date and end_date <= coverage[1]:
+        return [e[3] for e in db_manager.get_transit_events(*key, start_date, end_date)], True
+
+    if coverage and coverage[0] <= start_date <= coverage[1]:
+        # Window moved forward: scan the new days, from the start of any
+        # transit still open at the old edge (the engines drop those)
+        resume_at = coverage[2] if engine.reports_open_runs else coverage[1] - EXTENSION_OVERLAP
+        scan_start = max(coverage[0], resume_at)
+        range_start = coverage[0]
+    else:
+        scan_start = range_start = start_date
+
+    tz = engine.wall_clock_tz
+    options = {'include_open': True} if engine.reports_open_runs else {}
+    scanned = engine.scan(_wall_clock(engine, scan_start), _wall_clock(engine, end_date), **options)
+    open_starts = [_utc_naive(t['start'], tz) for t in scanned if t.get('open')]
+    rows = _to_rows([t for t in scanned if not t.get('open')], tz)
+    if force:
+        new_rows = rows
+    else:
+        stored = db_manager.get_transit_events(*key, scan_start, end_date)
+        new_rows = [row for row in rows if not _is_stored(row, stored, scan_start)]
+    if not db_manager.save_transit_events(*key, new_rows, range_start, end_date, replace=force,
+                                          resume_at=min(open_starts, default=end_date)):
+        return [row[3] for row in rows if row[1] <= end_date and row[2] >= start_date], False
+
+    return [e[3] for e in db_manager.get_transit_events(*key, start_date, end_date)], False
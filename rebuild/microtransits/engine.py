@@ -0,0 +1,111 @@
+"""Parameterized entry point shared by the microtransit engines.
+
+Each engine module (yp, vb1, vb2, wb1, wb2, wb3) defines a TransitEngine
+subclass that carries everything a scan depends on - birth data, transit
+location and orb - so callers never assign module globals and engines for
+different people can run side by side:
+
+    engine = get_engine('wb3')(birth_date, location=(lat, lon))
+    transits = engine.scan(start_date, end_date)
+
+The module-level process_transits functions remain as wrappers that build
+an engine from the module globals, for the standalone scripts.
+
+Engines with reports_open_runs accept scan(..., include_open=True), which
+also returns the transits still in orb at end_date (normally dropped) as
+{'transit_code', 'start', 'end': None, 'open': True}; the transit store uses
+them to resume its next extension from their real start.
+
+Scans decorated with instrumented_scan are counted per engine (scans,
+transits found, seconds, and the ephemeris calls and scan steps made
+inside them); see core.instrumentation.
+"""
+import functools
+import importlib
+from datetime import datetime
+
+from core.instrumentation import engine_scope, increment
+
+DEFAULT_LOCATION = (40.7128, -74.0060)  # NYC, the engines' historical default
+
+# Engine name -> (module, class name); imported lazily
+ENGINE_CLASSES = {
+    'vb1': ('microtransits.vb1', 'VB1Engine'),
+    'vb2': ('microtransits.vb2', 'VB2Engine'),
+    'wb1': ('microtransits.wb1', 'WB1Engine'),
+    'wb2': ('microtransits.wb2', 'WB2Engine'),
+    'wb3': ('microtransits.wb3', 'WB3Engine'),
+    'yp': ('microtransits.yp', 'YPEngine'),
+}
+
+
+def _coordinates(value):
+    if value is None or None in tuple(value):
+        return None
+    lat, lon = value
+    return (float(lat), float(lon))
+
+
+class TransitEngine:
+    """
+    One engine configured for one person and place.
+
+    birth_date is the naive wall-clock birth time, location the transit
+    (lat, lon) and birth_location the birth place (defaults to location).
+    Instances are immutable after construction and hold no scan state,
+    so one engine can be shared between threads.
+    """
+    name = None
+    default_orb = 1.0
+    # Zone of the wall-clock times the scan reads and returns (None: UT)
+    wall_clock_tz = None
+    # Whether scan accepts include_open (see the module docstring)
+    reports_open_runs = False
+
+    def __init__(self, birth_date=None, location=None, orb=None, birth_location=None):
+        self.birth_date = birth_date
+        self.location = _coordinates(location) or DEFAULT_LOCATION
+        self.birth_location = _coordinates(birth_location) or self.location
+        self.orb = self.default_orb if orb is None else float(orb)
+
+    def __repr__(self):
+        return (f"{type(self).__name__}(birth_date={self.birth_date!r}, "
+                f"location={self.location}, orb={self.orb})")
+
+    def scan(self, start_date, end_date):
+        """Return the engine's transits between start_date and end_date."""
+        raise NotImplementedError
+
+
+def instrumented_scan(scan):
+    """Run an engine's scan inside its counter scope and count the transits it returns."""
+    @functools.wraps(scan)
+    def wrapper(self, start_date, end_date, **options):
+        with engine_scope(self.name):
+            transits = scan(self, start_date, end_date, **options)
+            increment('transits_found', sum(1 for t in transits or () if not t.get('open')))
+        return transits
+    return wrapper
+
+
+def parse_birth_datetime(birth_date, birth_time=None):
+    """Combine the API wrappers' birth date (ISO string or datetime) and 'HH:MM[:SS]' time."""
+    if isinstance(birth_date, str):
+        birth_date = datetime.fromisoformat(birth_date)
+    if isinstance(birth_time, str):
+        time_parts = birth_time.split(':')
+        birth_date = birth_date.replace(
+            hour=int(time_parts[0]),
+            minute=int(time_parts[1]),
+            second=int(time_parts[2]) if len(time_parts) > 2 else 0
+        )
+    return birth_date
+
+
+def get_engine(name):
+    """Return the engine class for a name ('wb3', 'wb3.py' or 'WB3')."""
+    key = name.lower().replace('.py', '')
+    if key not in ENGINE_CLASSES:
+        raise ValueError(f"Unknown microtransit engine: {name}")
+    module_name, class_name = ENGINE_CLASSES[key]
+    return getattr(importlib.import_module(module_name), class_name)
@@ -0,0 +1,318 @@
+"""Shared ephemeris sampling layer for the microtransit engines.
+
+Body longitudes and speeds are computed once per window at coarse nodes
+(NODE_STEP days apart) and any time in between is found by cubic Hermite
+interpolation, which keeps the Moon within ~1e-5° of Swiss Ephemeris.
+Grids are cached per process and reused by every engine whose window
+they cover, so the planets are computed once when several engines run
+for the same period. The cache and each grid are guarded by locks, so
+engines may share them from several threads.
+
+Distances to a fixed point are pruned with the bodies' maximum speeds
+(orb_solver.MAX_SPEED): node intervals a body cannot cross into orb
+within are skipped, and only the samples of the remaining intervals are
+interpolated.
+
+The transit ascendant is computed analytically from sidereal time, true
+obliquity (both sampled at the nodes) and latitude, vectorized over the
+sample times, instead of building a Placidus house system per minute.
+MICROTRANSIT_ASCENDANT selects the method: 'fast' (default), 'houses'
+(swe.houses for every sample) or 'validate' (fast, checked against
+swe.houses to ASCENDANT_TOLERANCE).
+"""
+import math
+import os
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+import numpy as np
+import swisseph as swe
+
+from core.instrumentation import increment
+from microtransits.orb_solver import MAX_SPEED, SIDEREAL_RATE
+
+# Grid Settings
+NODE_STEP = 0.5  # days between exact ephemeris samples
+PAD_DAYS = 1.0  # margin around the requested window (covers timezone shifts)
+MAX_CACHED_GRIDS = 8
+MAX_CACHED_ASCENDANTS = 16
+MINUTES_PER_DAY = 1440.0
+PRUNE_MARGIN = 1e-6  # degrees of slack on the reachable-distance bound
+
+# Ascendant Settings
+ASCENDANT_MODE = os.environ.get('MICROTRANSIT_ASCENDANT', 'fast')
+ASCENDANT_TOLERANCE = 1e-4  # degrees allowed between the fast and Placidus ascendants
+FAST_ASCENDANT_MAX_LATITUDE = 66.0  # beyond this swe.houses is always used (polar circles)
+
+# Maximum daily motion by swe planet id, for distance pruning
+BODY_MAX_SPEED = {getattr(swe, name): speed for name, speed in MAX_SPEED.items()}
+
+_grid_cache = OrderedDict()
+_grid_cache_lock = threading.Lock()
+
+
+def angular_distance(pos1, pos2):
+    """Vectorized angular distance (0-180) between two longitude arrays."""
+    diff = np.abs(np.asarray(pos1) - np.asarray(pos2)) % 360
+    return np.minimum(diff, 360 - diff)
+
+
+def ascendant_from_armc(armc, lat, eps):
+    """Vectorized tropical ascendant from ARMC, latitude and obliquity (degrees)."""
+    r = np.radians(armc)
+    e = np.radians(eps)
+    y = np.cos(r)
+    x = -(np.sin(r) * np.cos(e) + math.tan(math.radians(lat)) * np.sin(e))
+    return np.degrees(np.arctan2(y, x)) % 360
+
+
+def houses_ascendant(jds, lat, lon):
+    """Placidus ascendant from swe.houses for each Julian day."""
+    increment('ephemeris_calls', np.size(jds))
+    return np.array([swe.houses(jd, lat, lon, b'P')[1][0] for jd in np.asarray(jds, dtype=float).tolist()])
+
+
+def orb_runs(distance, orb):
+    """
+    Find runs of consecutive samples within orb.
+
+    Returns (start, end) index pairs where start is the first sample in
+    orb and end is the first sample out of orb again (None if the run is
+    still open at the last sample), matching the minute-scan loops.
+    """
+    inside = np.asarray(distance) <= orb
+    if not inside.size:
+        return []
+    edges = np.flatnonzero(np.diff(inside.astype(np.int8))) + 1
+    starts = edges[inside[edges]].tolist()
+    ends = edges[~inside[edges]].tolist()
+    if inside[0]:
+        starts.insert(0, 0)
+    ends = ends + [None] * (len(starts) - len(ends))
+    return list(zip(starts, ends))
+
+
+def minute_count(start_date, end_date):
+    """Number of one-minute samples from start_date up to and including end_date."""
+    if end_date < start_date:
+        return 0
+    return int((end_date - start_date) // timedelta(minutes=1)) + 1
+
+
+def minute_jds(start_date, count, tz=None, include_seconds=False):
+    """
+    Julian days for count one-minute steps of wall-clock time from start_date.
+
+    Without tz the wall-clock fields are used as UT. With tz they are read
+    as local time in that zone (like the engines' convert_local_to_ut),
+    resolving the UTC offset once per wall-clock hour.
+    """
+    hours = start_date.hour + start_date.minute / 60.0
+    if include_seconds:
+        hours += start_date.second / 3600.0
+    jd0 = swe.julday(start_date.year, start_date.month, start_date.day, hours)
+    steps = np.arange(count)
+    jds = jd0 + steps / MINUTES_PER_DAY
+    if tz is None or not count:
+        return jds
+
+    hour_start = start_date.replace(minute=0, second=0, microsecond=0, tzinfo=None)
+    hour_index = (start_date.minute + steps) // 60
+    offsets = np.array([
+        (hour_start + timedelta(hours=h)).replace(tzinfo=tz).utcoffset().total_seconds()
+        for h in range(int(hour_index[-1]) + 1)
+    ]) / 86400.0
+    return jds - offsets[hour_index]
+
+
+class EphemerisGrid:
+    """Body longitudes for one window, sampled coarsely and interpolated on demand."""
+
+    def __init__(self, jd_start, jd_end, step=NODE_STEP):
+        first = math.floor((jd_start - PAD_DAYS) / step) * step
+        last = math.ceil((jd_end + PAD_DAYS) / step) * step
+        self.step = step
+        self.nodes = np.arange(first, last + step / 2, step)
+        self._bodies = {}
+        self._ascendants = OrderedDict()
+        self._lock = threading.Lock()
+
+    def covers(self, jd_start, jd_end):
+        """Whether the grid can interpolate the whole window."""
+        return self.nodes[0] <= jd_start and jd_end <= self.nodes[-1]
+
+    def _samples(self, body, sidereal):
+        key = (body, sidereal)
+        with self._lock:
+            if key not in self._bodies:
+                self._bodies[key] = self._compute_samples(body, sidereal)
+            return self._bodies[key]
+
+    def _compute_samples(self, body, sidereal):
+        increment('ephemeris_calls', len(self.nodes))
+        if isinstance(body, str):
+            # Fixed star: no speed from fixstar_ut, use the node differences
+            lons = np.array([float(swe.fixstar_ut(body, jd)[0][0]) for jd in self.nodes])
+            lons = np.unwrap(lons, period=360)
+            return lons, np.gradient(lons, self.step)
+
+        flags = swe.FLG_SPEED
+        if sidereal:
+            swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
+            flags |= swe.FLG_SIDEREAL
+        data = np.array([swe.calc_ut(jd, body, flags)[0] for jd in self.nodes])
+        return np.unwrap(data[:, 0], period=360), data[:, 3]
+
+    def _interpolate(self, values, speeds, jd):
+        jd = np.asarray(jd, dtype=float)
+        if jd.size and (jd.min() < self.nodes[0] or jd.max() > self.nodes[-1]):
+            raise ValueError("Julian day outside of the ephemeris grid")
+        i = self._intervals(jd)
+        t = (jd - self.nodes[i]) / self.step
+        t2 = t * t
+        t3 = t2 * t
+        return ((2 * t3 - 3 * t2 + 1) * values[i]
+                + (t3 - 2 * t2 + t) * self.step * speeds[i]
+                + (-2 * t3 + 3 * t2) * values[i + 1]
+                + (t3 - t2) * self.step * speeds[i + 1])
+
+    def longitude(self, body, jd, sidereal=False):
+        """Longitude of a body (swe planet id or fixed star name) at jd (scalar or array)."""
+        lons, speeds = self._samples(body, sidereal)
+        result = self._interpolate(lons, speeds, jd) % 360
+        return float(result) if np.ndim(result) == 0 else result
+
+    def _intervals(self, jd):
+        return np.clip(((jd - self.nodes[0]) // self.step).astype(int), 0, len(self.nodes) - 2)
+
+    def reachable(self, body, jds, target, orb, sidereal=False):
+        """
+        Mask of the samples that can be within orb of a fixed target.
+
+        Between two nodes a body moving at most v degrees/day stays at least
+        (d1 + d2 - v * step) / 2 from the target, where d1 and d2 are its
+        node distances, so intervals with a larger bound are skipped whole.
+        Returns None for bodies without a speed bound (every sample can be).
+        """
+        max_speed = BODY_MAX_SPEED.get(body)
+        if max_speed is None:
+            return None
+        lons, _ = self._samples(body, sidereal)
+        node_distance = angular_distance(lons % 360, target)
+        closest = (node_distance[:-1] + node_distance[1:] - max_speed * self.step) / 2
+        in_reach = closest <= orb + PRUNE_MARGIN
+        jds = np.asarray(jds, dtype=float)
+        if jds.size and np.all(jds[1:] >= jds[:-1]):
+            # Sorted samples: one run per node interval
+            bounds = np.searchsorted(jds, self.nodes[1:-1])
+            counts = np.diff(np.concatenate(([0], bounds, [jds.size])))
+            return np.repeat(in_reach, counts)
+        return in_reach[self._intervals(jds)]
+
+    def distance(self, body, jds, target, orb, sidereal=False):
+        """
+        Angular distance of a body from a fixed target at jds, interpolated
+        only where it can be within orb (np.inf elsewhere).
+        """
+        jds = np.asarray(jds, dtype=float)
+        mask = self.reachable(body, jds, target, orb, sidereal)
+        if mask is None:
+            return angular_distance(self.longitude(body, jds, sidereal), target)
+        result = np.full(jds.shape, np.inf)
+        if mask.any():
+            result[mask] = angular_distance(self.longitude(body, jds[mask], sidereal), target)
+        return result
+
+    def ayanamsa(self, jd):
+        """Lahiri ayanamsa at jd, interpolated from the nodes."""
+        with self._lock:
+            if ('AYANAMSA', True) not in self._bodies:
+                swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
+                increment('ephemeris_calls', len(self.nodes))
+                values = np.array([swe.get_ayanamsa(jd) for jd in self.nodes])
+                self._bodies[('AYANAMSA', True)] = (values, np.gradient(values, self.step))
+        result = self._interpolate(*self._bodies[('AYANAMSA', True)], jd)
+        return float(result) if np.ndim(result) == 0 else result
+
+    def _rotation(self):
+        # Sidereal time less the mean rotation, and true obliquity, at the nodes
+        with self._lock:
+            if ('ROTATION', False) not in self._bodies:
+                increment('ephemeris_calls', 2 * len(self.nodes))
+                turns = SIDEREAL_RATE * (self.nodes - self.nodes[0])
+                sidereal = np.array([swe.sidtime(jd) * 15.0 for jd in self.nodes])
+                obliquity = np.array([swe.calc_ut(jd, swe.ECL_NUT)[0][0] for jd in self.nodes])
+                self._bodies[('ROTATION', False)] = (np.unwrap(sidereal - turns, period=360), obliquity)
+            return self._bodies[('ROTATION', False)]
+
+    def fast_ascendant(self, jds, lat, lon):
+        """
+        Tropical ascendant from sidereal time, obliquity and latitude. Both
+        vary smoothly apart from the Earth's rotation, so they are
+        interpolated from the nodes (within ~2e-5° of swe.houses below the
+        polar circles).
+        """
+        jds = np.asarray(jds, dtype=float)
+        residual, obliquity = self._rotation()
+        armc = np.interp(jds, self.nodes, residual) + SIDEREAL_RATE * (jds - self.nodes[0]) + lon
+        return ascendant_from_armc(armc, lat, np.interp(jds, self.nodes, obliquity))
+
+    def ascendant(self, jds, lat, lon, mode=None):
+        """
+        Tropical Placidus ascendant for an array of Julian days.
+
+        Computed once per location and time array (see ASCENDANT_MODE) and
+        shared by every engine that asks for the same samples.
+        """
+        mode = mode or ASCENDANT_MODE
+        jds = np.asarray(jds, dtype=float)
+        key = (float(lat), float(lon), float(jds[0]) if jds.size else 0.0, jds.size,
+               float(jds[-1]) if jds.size else 0.0, mode)
+        with self._lock:
+            if key in self._ascendants:
+                self._ascendants.move_to_end(key)
+                return self._ascendants[key]
+        if mode == 'houses' or abs(lat) > FAST_ASCENDANT_MAX_LATITUDE:
+            values = houses_ascendant(jds, lat, lon)
+        else:
+            values = self.fast_ascendant(jds, lat, lon)
+            if mode == 'validate':
+                deviation = validate_ascendant(self, jds, lat, lon, values=values)
+                if deviation > ASCENDANT_TOLERANCE:
+                    raise ValueError(f"Fast ascendant differs from swe.houses by {deviation:.3g}° "
+                                     f"at {lat}, {lon} (tolerance {ASCENDANT_TOLERANCE}°)")
+        with self._lock:
+            self._ascendants[key] = values
+            if len(self._ascendants) > MAX_CACHED_ASCENDANTS:
+                self._ascendants.popitem(last=False)
+        return values
+
+
+def validate_ascendant(grid, jds, lat, lon, values=None):
+    """Largest difference in degrees between the fast ascendant and swe.houses at jds."""
+    jds = np.asarray(jds, dtype=float)
+    if not jds.size:
+        return 0.0
+    values = grid.fast_ascendant(jds, lat, lon) if values is None else values
+    return float(angular_distance(values, houses_ascendant(jds, lat, lon)).max())
+
+
+def get_grid(jd_start, jd_end):
+    """Return a cached grid covering the window, building one if needed."""
+    with _grid_cache_lock:
+        for key, grid in _grid_cache.items():
+            if grid.covers(jd_start, jd_end):
+                _grid_cache.move_to_end(key)
+                return grid
+        grid = EphemerisGrid(jd_start, jd_end)
+        _grid_cache[(grid.nodes[0], grid.nodes[-1])] = grid
+        if len(_grid_cache) > MAX_CACHED_GRIDS:
+            _grid_cache.popitem(last=False)
+        return grid
+
+
+def clear_grid_cache():
+    """Drop all cached grids."""
+    with _grid_cache_lock:
+        _grid_cache.clear()
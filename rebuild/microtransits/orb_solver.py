@@ -0,0 +1,169 @@
+"""Event-driven orb window solver for the microtransit engines.
+
+Instead of sampling every minute, the separation between two points is
+stepped forward by the largest interval in which it cannot reach the orb
+boundary (distance to the boundary divided by the maximum relative speed).
+Every crossing that is bracketed this way is refined with Brent's method
+to sub-second precision.
+"""
+import math
+from functools import lru_cache
+
+from core.instrumentation import increment
+
+# Solver Settings (all times in days)
+DEFAULT_TOLERANCE = 1e-6  # ~0.09 seconds
+MIN_STEP = 1.0 / 1440.0  # one minute, the resolution of the legacy scans
+SIDEREAL_RATE = 360.98564736629  # ARMC motion in degrees per day
+
+# Upper bounds of geocentric daily motion in degrees/day (with margin)
+MAX_SPEED = {
+    'SUN': 1.03,
+    'MOON': 15.6,
+    'MERCURY': 2.25,
+    'VENUS': 1.3,
+    'MARS': 0.85,
+    'JUPITER': 0.26,
+    'SATURN': 0.15,
+    'MEAN_NODE': 0.06,
+}
+
+
+def angular_distance(sep):
+    """Absolute angular distance (0-180) for a signed separation in degrees."""
+    diff = abs(sep) % 360
+    return min(diff, 360 - diff)
+
+
+def ascendant_longitude(armc, lat, eps=23.4393):
+    """Tropical ascendant from ARMC, geographic latitude and obliquity (degrees)."""
+    r = math.radians(armc)
+    e = math.radians(eps)
+    y = math.cos(r)
+    x = -(math.sin(r) * math.cos(e) + math.tan(math.radians(lat)) * math.sin(e))
+    return math.degrees(math.atan2(y, x)) % 360
+
+
+@lru_cache(maxsize=256)
+def _asc_max_speed(lat):
+    samples = 1440
+    prev = ascendant_longitude(0.0, lat)
+    max_ratio = 0.0
+    for i in range(1, samples + 1):
+        cur = ascendant_longitude(i * 360.0 / samples, lat)
+        max_ratio = max(max_ratio, angular_distance(cur - prev) * samples / 360.0)
+        prev = cur
+    return max_ratio * SIDEREAL_RATE * 1.25
+
+
+def asc_max_speed(lat):
+    """Upper bound of the ascendant's motion in degrees/day at a latitude."""
+    return _asc_max_speed(round(float(lat), 2))
+
+
+def brent_root(func, a, b, fa=None, fb=None, tolerance=DEFAULT_TOLERANCE, max_iter=100):
+    """Find a root of func in [a, b] (fa and fb must differ in sign) using Brent's method."""
+    fa = func(a) if fa is None else fa
+    fb = func(b) if fb is None else fb
+    if fa == 0:
+        return a
+    if fb == 0:
+        return b
+
+    c, fc = a, fa
+    d = e = b - a
+    for _ in range(max_iter):
+        if (fb > 0) == (fc > 0):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+
+        tol = 2.0 * 1e-15 * abs(b) + 0.5 * tolerance
+        m = 0.5 * (c - b)
+        if abs(m) <= tol or fb == 0:
+            return b
+
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            # Inverse quadratic interpolation or secant step
+            s = fb / fa
+            if a == c:
+                p = 2.0 * m * s
+                q = 1.0 - s
+            else:
+                q = fa / fc
+                r = fb / fc
+                p = s * (2.0 * m * q * (q - r) - (b - a) * (r - 1.0))
+                q = (q - 1.0) * (r - 1.0) * (s - 1.0)
+            if p > 0:
+                q = -q
+            else:
+                p = -p
+            if 2.0 * p < min(3.0 * m * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = m
+        else:
+            d = e = m
+
+        a, fa = b, fb
+        b += d if abs(d) > tol else math.copysign(tol, m)
+        fb = func(b)
+
+    return b
+
+
+def find_orb_windows(separation, jd_start, jd_end, orb, max_rate, step_limit=None,
+                     min_step=MIN_STEP, tolerance=DEFAULT_TOLERANCE):
+    """
+    Find the intervals of [jd_start, jd_end] where separation(jd) is within orb.
+
+    separation(jd) returns the signed angular separation in degrees and
+    max_rate bounds its rate of change in degrees/day. step_limit(jd), if
+    given, caps the step taken from jd (used to avoid stepping over
+    discontinuities such as the Part of Fortune day/night switch); it is
+    always called right after separation() for the same jd.
+
+    Returns a list of (jd_in, jd_out, orb_in) tuples. Windows already open
+    at jd_start begin at jd_start; windows still open at jd_end have
+    jd_out set to None.
+    """
+    def gap(jd):
+        return angular_distance(separation(jd)) - orb
+
+    windows = []
+    jd = jd_start
+    g = gap(jd)
+    cap = step_limit(jd) if step_limit else None
+    open_window = (jd, orb + g) if g <= 0 else None
+
+    if max_rate <= 0:
+        # Constant separation: the window state can never change
+        return [(jd_start, None, orb + g)] if open_window else []
+
+    steps = 0
+    while jd < jd_end:
+        steps += 1
+        step = abs(g) / max_rate
+        if cap is not None:
+            step = min(step, cap)
+        nxt = min(jd + max(step, min_step), jd_end)
+
+        g_next = gap(nxt)
+        cap = step_limit(nxt) if step_limit else None
+
+        if (g <= 0) != (g_next <= 0):
+            root = brent_root(gap, jd, nxt, g, g_next, tolerance)
+            if open_window is None:
+                open_window = (root, orb + gap(root))
+            else:
+                windows.append((open_window[0], root, open_window[1]))
+                open_window = None
+
+        jd, g = nxt, g_next
+
+    increment('scan_steps', steps)
+    if open_window:
+        windows.append((open_window[0], None, open_window[1]))
+    return windows
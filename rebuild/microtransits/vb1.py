@@ -12,6 +12,7 @@
 #                                                               #
 # Time Period: Determined by input start and end dates          #
 # Method: Minute-by-minute check with configurable orb         #
+#         (spans out of reach at max speed are skipped)         #
 ################################################################
 
 import swisseph as swe
@@ -20,9 +21,17 @@ from zoneinfo import ZoneInfo
 from decimal import Decimal, getcontext
 import os
 import csv
+import logging
+
+from core.instrumentation import increment, log_event
+from core.natal_points import natal_chart
+from microtransits.engine import TransitEngine, instrumented_scan
+from microtransits.ephemeris_grid import get_grid, minute_count, minute_jds, orb_runs
 
 getcontext().prec = 20
 
+logger = logging.getLogger(__name__)
+
 ################################################################
 #                         CONSTANTS                              #
 ################################################################
@@ -48,7 +57,7 @@ if not os.path.exists(ephe_path):
     os.makedirs(ephe_path)
 swe.set_ephe_path(ephe_path)
 
-# Transit Types and Counters
+# Transit Types and Counters (filled in by main() from the scan results)
 TRANSIT_COUNTS = {
     'RAHU-ASC': {'count': 0, 'name': 'Rahu to D9 Ascendant'},
     'JUPITER-DSC': {'count': 0, 'name': 'Jupiter to D9 Descendant'},
@@ -188,47 +197,46 @@ def is_conjunct(pos1, pos2, orb=DEFAULT_ORB):
 def calculate_d9_ascendant(birth_jd, birth_lat, birth_lon):
     """Calculate D9 Ascendant for birth chart."""
     swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
-    tropical_asc = swe.houses(birth_jd, birth_lat, birth_lon, b'P')[0][0]
-    ayanamsa = swe.get_ayanamsa(birth_jd)
-    sidereal_asc = (tropical_asc - ayanamsa) % 360
+    natal = natal_chart(birth_jd)
+    sidereal_asc = (natal.ascendant(birth_lat, birth_lon) - natal.ayanamsa()) % 360
     d9_asc = calculate_d9(sidereal_asc)
     return d9_asc
 
 def calculate_yogi_planet(birth_jd):
     """Calculate Yogi Planet from birth chart."""
-    swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
-    sun_pos = swe.calc_ut(birth_jd, swe.SUN, swe.FLG_SIDEREAL)[0][0]
-    moon_pos = swe.calc_ut(birth_jd, swe.MOON, swe.FLG_SIDEREAL)[0][0]
-    yogi_point = (sun_pos + moon_pos + 93.33) % 360
+    natal = natal_chart(birth_jd)
+    yogi_point = (natal.sidereal_longitude(swe.SUN) + natal.sidereal_longitude(swe.MOON) + 93.33) % 360
     return swe.JUPITER
 
+class VB1Engine(TransitEngine):
+    """VB1 D9 transits for one birth chart, transit location and orb."""
+    name = 'vb1'
+    default_orb = DEFAULT_ORB
+
+    @instrumented_scan
+    def scan(self, start_date, end_date):
+        """Process VB1 transits between two dates."""
+        return process_transits_with_params(
+            self.birth_date, self.birth_location[0], self.birth_location[1],
+            self.location[0], self.location[1],
+            start_date, end_date, self.orb
+        )
+
 def process_transits(start_date, end_date):
     """Process all transits within the given date range (legacy function)."""
-    global BIRTH_DATE, BIRTH_LAT, BIRTH_LON
-    
     if BIRTH_DATE is None:
-        BIRTH_DATE = datetime(1973, 3, 9, 16, 56)
-        BIRTH_LAT = 29.2108
-        BIRTH_LON = -81.0228
-    
-    birth_jd = get_julian_day(BIRTH_DATE)
-    d9_asc = calculate_d9_ascendant(birth_jd, BIRTH_LAT, BIRTH_LON)
-    d9_dsc = (d9_asc + 180) % 360
-    yogi_planet_id = calculate_yogi_planet(birth_jd)
+        # Legacy test chart, transits at the birth location
+        birth_date, birth_location = datetime(1973, 3, 9, 16, 56), (29.2108, -81.0228)
+    else:
+        birth_date, birth_location = BIRTH_DATE, (BIRTH_LAT, BIRTH_LON)
 
-    return process_transits_with_params(
-        BIRTH_DATE, BIRTH_LAT, BIRTH_LON,
-        BIRTH_LAT, BIRTH_LON,
-        start_date, end_date, ORB
-    )
+    engine = VB1Engine(birth_date, location=birth_location, orb=ORB)
+    return engine.scan(start_date, end_date)
 
 def process_transits_with_params(birth_date, birth_lat, birth_lon, transit_lat, transit_lon, start_date, end_date, orb=DEFAULT_ORB):
     """Process VB1 transits with API parameters - MINUTE-BY-MINUTE scanning."""
-    print(f"\n{SCRIPT_PREFIX} - D9 Transit Calculator (Minute-by-Minute)")
-    print("-" * 50)
-    print(f"Birth: {birth_date.strftime('%Y-%m-%d %H:%M')} at {birth_lat}°N, {birth_lon}°W")
-    print(f"Transit Location: {transit_lat}°N, {transit_lon}°W")
-    print(f"Period: {start_date} to {end_date}")
+    log_event(logger, logging.INFO, 'vb1.scan', birth=birth_date, birth_lat=birth_lat, birth_lon=birth_lon,
+              transit_lat=transit_lat, transit_lon=transit_lon, start=start_date, end=end_date)
     
     ny_tz = ZoneInfo("America/New_York")
     if start_date.tzinfo is None:
@@ -241,14 +249,8 @@ def process_transits_with_params(birth_date, birth_lat, birth_lon, transit_lat,
     d9_dsc = (d9_asc + 180) % 360
     yogi_planet_id = calculate_yogi_planet(birth_jd)
     
-    print(f"D9 Ascendant: {format_position(d9_asc)}")
-    print(f"D9 Descendant: {format_position(d9_dsc)}")
+    log_event(logger, logging.DEBUG, 'vb1.natal', d9_asc=d9_asc, d9_dsc=d9_dsc)
 
-    all_transits = []
-    active_transits = {}
-    current_time = start_date
-    last_day_logged = None
-    
     transit_configs = [
         (swe.MEAN_NODE, d9_asc, 'RAHU-ASC', 'Rahu to D9 Ascendant'),
         (swe.JUPITER, d9_dsc, 'JUPITER-DSC', 'Jupiter to D9 Descendant'),
@@ -258,43 +260,45 @@ def process_transits_with_params(birth_date, birth_lat, birth_lon, transit_lat,
         (yogi_planet_id, d9_asc, 'YOGI-ASC', 'Yogi Planet to D9 Ascendant')
     ]
 
-    while current_time <= end_date:
-        current_jd = get_julian_day(current_time)
-        
-        if current_time.day != last_day_logged:
-            print(f"Processing {current_time.strftime('%Y-%m-%d')}...")
-            last_day_logged = current_time.day
-
-        for planet_id, target_pos, transit_code, description in transit_configs:
-            planet_pos = get_sidereal_position(current_jd, planet_id)
-            is_active, orb_diff = is_conjunct(planet_pos, target_pos, orb)
-
-            if is_active and transit_code not in active_transits:
-                transit = {
-                    'start': current_time,
-                    'end': None,
-                    'jd': current_jd,
-                    'type': description,
-                    'transit_code': transit_code,
-                    'orb': orb_diff,
-                    'planet_pos': {'longitude': planet_pos, 'latitude': 0},
-                    'target_pos': target_pos
-                }
-                active_transits[transit_code] = transit
-                TRANSIT_COUNTS[transit_code]['count'] += 1
-
-            elif not is_active and transit_code in active_transits:
-                transit = active_transits.pop(transit_code)
-                transit['end'] = current_time
-                all_transits.append(transit)
-
-        current_time += timedelta(minutes=1)
-
-    for transit_code, transit in active_transits.items():
-        transit['end'] = end_date
-        all_transits.append(transit)
-
-    print(f"\nFound {len(all_transits)} VB1 transits")
+    # Sample every minute; positions come from the shared ephemeris grid
+    count = minute_count(start_date, end_date)
+    jds = minute_jds(start_date, count, tz=ny_tz, include_seconds=True)
+    grid = get_grid(jds[0], jds[-1]) if count else None
+    increment('scan_steps', count * len(transit_configs))
+
+    closed_transits = []
+    open_transits = []
+    for index, (planet_id, target_pos, transit_code, description) in enumerate(transit_configs):
+        if not count:
+            break
+        # Only the spans the planet can reach at its maximum speed are sampled
+        orb_diffs = grid.distance(planet_id, jds, target_pos, orb, sidereal=True)
+
+        for start_index, end_index in orb_runs(orb_diffs, orb):
+            transit = {
+                'start': start_date + timedelta(minutes=start_index),
+                'end': None,
+                'jd': float(jds[start_index]),
+                'type': description,
+                'transit_code': transit_code,
+                'orb': float(orb_diffs[start_index]),
+                'planet_pos': {'longitude': grid.longitude(planet_id, jds[start_index], sidereal=True), 'latitude': 0},
+                'target_pos': target_pos
+            }
+            if end_index is None:
+                # Still active at the end of the period
+                transit['end'] = end_date
+                open_transits.append((start_index, index, transit))
+            else:
+                transit['end'] = start_date + timedelta(minutes=end_index)
+                closed_transits.append((end_index, index, transit))
+
+    # Same order as the minute scan: closed transits by exit time, then the
+    # ones still active by entry time
+    all_transits = [t for _, _, t in sorted(closed_transits, key=lambda item: item[:2])]
+    all_transits += [t for _, _, t in sorted(open_transits, key=lambda item: item[:2])]
+
+    log_event(logger, logging.INFO, 'vb1.done', transits=len(all_transits))
     return all_transits
 
 def export_transits(transit_events):
@@ -367,26 +371,15 @@ def calculate_vb1_transits(birth_date, birth_lat, birth_lon, transit_lat, transi
     - transit_lon: float, transit location longitude in degrees
     - start_date: datetime object for start of period
     - end_date: datetime object for end of period
-    - ayanamsa: float, ayanamsa value (default: 23.85)
+    - ayanamsa: float, ayanamsa value (default: 23.85; unused, positions use Lahiri)
     - orb: float, orb in degrees (default: 2.5)
     
     Returns:
     - List of transit events with timing and position data
     """
-    global AYANAMSA, ORB
-    AYANAMSA = ayanamsa
-    ORB = orb
-    
-    for transit_type in TRANSIT_COUNTS:
-        TRANSIT_COUNTS[transit_type]['count'] = 0
-    
-    transit_events = process_transits_with_params(
-        birth_date, birth_lat, birth_lon,
-        transit_lat, transit_lon,
-        start_date, end_date, orb
-    )
-    
-    return transit_events
+    engine = VB1Engine(birth_date, location=(transit_lat, transit_lon), orb=orb,
+                       birth_location=(birth_lat, birth_lon))
+    return engine.scan(start_date, end_date)
 
 def main():
     """Main execution function - for backward compatibility."""
@@ -402,6 +395,11 @@ def main():
     transit_events = calculate_vb1_transits(birth_date, birth_lat, birth_lon, transit_lat, transit_lon, start_date, end_date)
     export_transits(transit_events)
 
+    for data in TRANSIT_COUNTS.values():
+        data['count'] = 0
+    for event in transit_events:
+        TRANSIT_COUNTS[event['transit_code']]['count'] += 1
+
     print("\nTransit Counts:")
     for transit_type, data in TRANSIT_COUNTS.items():
         print(f"{data['name']}: {data['count']}")
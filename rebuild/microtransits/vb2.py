@@ -16,12 +16,22 @@ import swisseph as swe
 from datetime import datetime, timedelta
 import os
 import csv
+import logging
 from zoneinfo import ZoneInfo
 from decimal import Decimal, getcontext
 
+from core.instrumentation import increment, log_event
+from core.natal_points import natal_chart
+from microtransits.engine import TransitEngine, instrumented_scan, parse_birth_datetime
+from microtransits.ephemeris_grid import (
+    angular_distance, get_grid, minute_count, minute_jds, orb_runs
+)
+
 # Set decimal precision
 getcontext().prec = 10
 
+logger = logging.getLogger(__name__)
+
 ################################################################
 #                         CONSTANTS                              #
 ################################################################
@@ -72,44 +82,28 @@ def get_julian_day(dt):
         print(f"Error calculating Julian Day: {str(e)}")
         raise
 
-def calculate_natal_yogi_point():
-    """Calculate natal Yogi point in sidereal zodiac."""
+def calculate_natal_yogi_point(birth_date=None, birth_lat=None, birth_lon=None):
+    """Calculate natal Yogi point in sidereal zodiac (module birth data by default)."""
     try:
-        print("\nCalculating Natal Yogi Point:")
-        print(f"Birth Date: {BIRTH_DATE}")
-        print(f"Birth Location: {BIRTH_LAT}°N, {abs(BIRTH_LON)}°W")
-        print(f"Ayanamsa: {AYANAMSA}°")
+        if birth_date is None:
+            birth_date, birth_lat, birth_lon = BIRTH_DATE, BIRTH_LAT, BIRTH_LON
 
-        birth_jd = get_julian_day(BIRTH_DATE)
-        print(f"Birth JD: {birth_jd}")
+        birth_jd = get_julian_day(birth_date)
 
         # Set ayanamsa for sidereal calculations
         swe.set_sid_mode(swe.SIDM_LAHIRI)
 
-        # Calculate Sun and Moon positions
-        sun_result = swe.calc_ut(birth_jd, swe.SUN, swe.FLG_SIDEREAL)
-        moon_result = swe.calc_ut(birth_jd, swe.MOON, swe.FLG_SIDEREAL)
-
-        if sun_result is None or moon_result is None:
-            raise ValueError("Failed to calculate Sun or Moon positions")
-
-        sun_sid = float(sun_result[0][0])
-        moon_sid = float(moon_result[0][0])
-
-        print(f"\nSidereal Positions:")
-        print(f"Sun: {sun_sid:.6f}° ({int(sun_sid)}°{int((sun_sid % 1) * 60)}'{((sun_sid % 1) * 60 % 1) * 60:.2f}\")")
-        print(f"Moon: {moon_sid:.6f}° ({int(moon_sid)}°{int((moon_sid % 1) * 60)}'{((moon_sid % 1) * 60 % 1) * 60:.2f}\")")
+        # Sun and Moon positions from the natal points cache
+        natal = natal_chart(birth_jd)
+        sun_sid = natal.sidereal_longitude(swe.SUN)
+        moon_sid = natal.sidereal_longitude(swe.MOON)
 
         # Calculate Yogi point using sidereal positions
         sum_points = sun_sid + moon_sid
-        print(f"\nCalculation Steps:")
-        print(f"1. Sun + Moon: {sum_points:.6f}°")
-        print(f"2. Adding constant (93.33°): {sum_points + 93.33:.6f}°")
-
         yogi_point = (sum_points + 93.33) % 360
 
-        print(f"\nFinal Yogi Point: {yogi_point:.6f}°")
-        print(f"In DMS: {int(yogi_point)}°{int((yogi_point % 1) * 60)}'{((yogi_point % 1) * 60 % 1) * 60:.2f}\"")
+        log_event(logger, logging.DEBUG, 'vb2.natal_yogi_point', birth=birth_date, birth_lat=birth_lat,
+                  birth_lon=birth_lon, birth_jd=birth_jd, sun=sun_sid, moon=moon_sid, yogi_point=yogi_point)
 
         return yogi_point
 
@@ -147,6 +141,18 @@ def calculate_positions(jd):
         print(f"Error calculating positions: {str(e)}")
         raise
 
+def calculate_position_arrays(grid, jds):
+    """Calculate position arrays for an array of Julian days from the shared grid."""
+    positions = {}
+    for planet, name in [(swe.SUN, 'SUN'), (swe.MOON, 'MOON'), (swe.JUPITER, 'JUP')]:
+        positions[name] = grid.longitude(planet, jds, sidereal=True)
+
+    # Tropical Ascendant at the default location with the fixed sidereal offset
+    asc_tropical = grid.ascendant(jds, 40.7128, -74.0060)
+    positions['ASC'] = (asc_tropical - DEFAULT_AYANAMSA) % 360
+
+    return positions
+
 def is_conjunct(pos1, pos2):
     """Check if two positions are in conjunction within orb."""
     try:
@@ -156,45 +162,47 @@ def is_conjunct(pos1, pos2):
         print(f"Error checking conjunction: {str(e)}")
         raise
 
-def process_transits(start_date=None, end_date=None):
-    """Process VB2 transits between two dates."""
-    if start_date is None or end_date is None:
-        raise ValueError("Both start_date and end_date must be provided")
+class VB2Engine(TransitEngine):
+    """
+    VB2 transits to the natal Yogi Point for one birth chart.
 
-    ny_tz = ZoneInfo("America/New_York")
+    The transit Ascendant is always taken at New York, as in the original
+    script, so only the birth data and orb affect the results.
+    """
+    name = 'vb2'
+    default_orb = DEFAULT_ORB
 
-    # Standardize timezone handling
-    start_date = start_date.astimezone(ny_tz) if start_date.tzinfo else start_date.replace(tzinfo=ny_tz)
-    end_date = end_date.astimezone(ny_tz) if end_date.tzinfo else end_date.replace(tzinfo=ny_tz)
+    @instrumented_scan
+    def scan(self, start_date, end_date):
+        """Process VB2 transits between two dates."""
+        if start_date is None or end_date is None:
+            raise ValueError("Both start_date and end_date must be provided")
 
-    print("\nProcessing VB2 transits...")
-    print(f"Period: {start_date} to {end_date}")
+        ny_tz = ZoneInfo("America/New_York")
 
-    # Calculate birth positions (using legacy hardcoded values)
-    birth_date = datetime(1973, 3, 9, 16, 56)
-    birth_ut = convert_local_to_ut(birth_date)
-    birth_jd = swe.julday(birth_ut.year, birth_ut.month, birth_ut.day,
-                         birth_ut.hour + birth_ut.minute/60.0)
-    birth_positions = calculate_positions(birth_jd)
+        # Standardize timezone handling
+        start_date = start_date.astimezone(ny_tz) if start_date.tzinfo else start_date.replace(tzinfo=ny_tz)
+        end_date = end_date.astimezone(ny_tz) if end_date.tzinfo else end_date.replace(tzinfo=ny_tz)
 
-    natal_yogi_point = calculate_natal_yogi_point() #Added to get the yogi point
+        log_event(logger, logging.INFO, 'vb2.scan', start=start_date, end=end_date)
 
-    print("\nStarting transit search...")
-    transits = find_transits(natal_yogi_point, start_date, end_date)
+        natal_yogi_point = calculate_natal_yogi_point(
+            self.birth_date, self.birth_location[0], self.birth_location[1])
 
-    if transits:
-        print(f"\nFound {len(transits)} VB2 transits")
-        return transits
-    else:
-        print("\nNo VB2 transits found in the specified period")
-        return []
+        transits = find_transits(natal_yogi_point, start_date, end_date, self.orb)
+        log_event(logger, logging.INFO, 'vb2.done', transits=len(transits))
+        return transits or []
+
+def process_transits(start_date=None, end_date=None):
+    """Process VB2 transits between two dates using the module birth data."""
+    engine = VB2Engine(BIRTH_DATE, birth_location=(BIRTH_LAT, BIRTH_LON), orb=ORB)
+    return engine.scan(start_date, end_date)
 
 
-def find_transits(natal_yogi_point, start_date, end_date):
+def find_transits(natal_yogi_point, start_date, end_date, orb=DEFAULT_ORB):
     """Find transits to Yogi Point."""
     try:
         transits = []
-        active_transits = {}
 
         transit_configs = {
             'SUN': {'code': 'SUN-YOG', 'name': 'Sun-Yogi'},
@@ -203,82 +211,60 @@ def find_transits(natal_yogi_point, start_date, end_date):
             'ASC': {'code': 'ASC-YOG', 'name': 'ASC-Yogi'}
         }
 
-        print(f"\nStarting transit search for Yogi Point at {natal_yogi_point:.6f}°")
+        log_event(logger, logging.DEBUG, 'vb2.search', yogi_point=natal_yogi_point)
+
+        # Sample every minute; positions come from the shared ephemeris grid
+        count = minute_count(start_date, end_date)
+        if count < 2:
+            return []
+        jds = minute_jds(start_date, count, tz=ZoneInfo("America/New_York"), include_seconds=True)
+        positions = calculate_position_arrays(get_grid(jds[0], jds[-1]), jds)
+        increment('scan_steps', count * len(transit_configs))
+
+        # Normalize natal Yogi point
+        normalized_yogi = float(natal_yogi_point) % 360
+
+        for index, (body_name, body_config) in enumerate(transit_configs.items()):
+            transit_key = body_config['code']
+            body_positions = positions[body_name]
+            diffs = angular_distance(body_positions, normalized_yogi)
+
+            for start_index, end_index in orb_runs(diffs, orb):
+                # The first sample only seeds the previous position, so a
+                # transit already in orb there has no entry; transits still
+                # in orb at the end of the period have no exit
+                if start_index == 0 or end_index is None:
+                    continue
+
+                start_time = start_date + timedelta(minutes=start_index)
+                end_time = start_date + timedelta(minutes=end_index)
+                transit = {
+                    'type': body_config['name'],
+                    'start': start_time,
+                    'transit_code': transit_key,
+                    'description': f"{body_name} conjunct Natal Yogi Point",
+                    'start_pos': float(body_positions[start_index]),
+                    'min_diff': float(diffs[start_index])
+                }
 
-        current_time = start_date
-        prev_positions = None
+                # Peak: first sample after entry with the smallest orb
+                peak_index = start_index + int(diffs[start_index:end_index].argmin())
+                if peak_index != start_index:
+                    transit['min_diff'] = float(diffs[peak_index])
+                    transit['exact'] = start_date + timedelta(minutes=peak_index)
+                else:
+                    transit['exact'] = start_time + (end_time - start_time)/2
 
-        while current_time <= end_date:
-            try:
-                jd = get_julian_day(current_time)
-                positions = calculate_positions(jd)
+                transit['end'] = end_time
+                transit['end_pos'] = float(body_positions[end_index])
 
-                if prev_positions is None:
-                    prev_positions = positions
-                    current_time += timedelta(minutes=1)
-                    continue
+                log_event(logger, logging.DEBUG, 'vb2.transit', type=body_config['name'], start=start_time,
+                          end=end_time, minutes=end_index - start_index, min_orb=transit['min_diff'])
 
-                for body_name, body_config in transit_configs.items():
-                    transit_key = body_config['code']
-                    current_pos = float(positions.get(body_name, 0)) % 360
-                    prev_pos = float(prev_positions.get(body_name, 0)) % 360
-
-                    # Normalize natal Yogi point
-                    normalized_yogi = float(natal_yogi_point) % 360
-
-                    # Calculate orb with normalized positions
-                    in_orb_now = abs((current_pos - normalized_yogi + 180) % 360 - 180) <= DEFAULT_ORB
-                    in_orb_prev = abs((prev_pos - normalized_yogi + 180) % 360 - 180) <= DEFAULT_ORB
-
-                    # Calculate actual orb distance
-                    diff_now = abs((current_pos - normalized_yogi + 180) % 360 - 180)
-
-                    # Transit entry
-                    if in_orb_now and not in_orb_prev:
-                        active_transits[transit_key] = {
-                            'type': body_config['name'],
-                            'start': current_time,
-                            'transit_code': transit_key,
-                            'description': f"{body_name} conjunct Natal Yogi Point",
-                            'start_pos': current_pos,
-                            'min_diff': diff_now
-                        }
-                        print(f"\nTransit start detected - {body_config['name']}")
-                        print(f"Time: {current_time}")
-                        print(f"Position: {current_pos:.6f}°")
-                        print(f"Orb: {diff_now:.6f}°")
-
-                    # Update minimum orb
-                    elif transit_key in active_transits:
-                        if diff_now < active_transits[transit_key].get('min_diff', ORB):
-                            active_transits[transit_key]['min_diff'] = diff_now
-                            active_transits[transit_key]['exact'] = current_time
-
-                    # Transit exit
-                    if not in_orb_now and in_orb_prev and transit_key in active_transits:
-                        transit = active_transits.pop(transit_key)
-                        transit['end'] = current_time
-                        transit['end_pos'] = current_pos
-
-                        if 'exact' not in transit:
-                            transit['exact'] = transit['start'] + (transit['end'] - transit['start'])/2
-
-                        print(f"\nTransit end detected - {body_config['name']}")
-                        print(f"End Time: {current_time}")
-                        print(f"Duration: {(current_time - transit['start']).total_seconds() / 60:.1f} minutes")
-                        print(f"Minimum Orb: {transit['min_diff']:.6f}°")
-
-                        transits.append(transit)
-
-                prev_positions = positions
-                current_time += timedelta(minutes=1)
-
-            except Exception as e:
-                print(f"Error processing time {current_time}: {str(e)}")
-                current_time += timedelta(minutes=1)
-                continue
-
-        return sorted(transits, key=lambda x: x['start'])
+                transits.append((start_index, end_index, index, transit))
+
+        # Sorted by start; ties keep the scan's exit-time order
+        return [transit for _, _, _, transit in sorted(transits, key=lambda item: item[:3])]
 
     except Exception as e:
         print(f"Error finding transits: {str(e)}")
@@ -405,26 +391,8 @@ def calculate_vb2_transits(birth_date, birth_time, birth_latitude, birth_longitu
     Returns transits in the format expected by the API
     """
     try:
-        global BIRTH_DATE, BIRTH_LAT, BIRTH_LON
-        
-        # Set global birth date from parameters
-        if isinstance(birth_date, str):
-            BIRTH_DATE = datetime.fromisoformat(birth_date)
-        else:
-            BIRTH_DATE = birth_date
-            
-        # Parse birth time if provided as string
-        if isinstance(birth_time, str):
-            time_parts = birth_time.split(':')
-            BIRTH_DATE = BIRTH_DATE.replace(
-                hour=int(time_parts[0]), 
-                minute=int(time_parts[1]),
-                second=int(time_parts[2]) if len(time_parts) > 2 else 0
-            )
-        
-        # Set global location variables
-        BIRTH_LAT = float(birth_latitude)
-        BIRTH_LON = float(birth_longitude)
+        engine = VB2Engine(parse_birth_datetime(birth_date, birth_time),
+                           birth_location=(birth_latitude, birth_longitude))
         
         # Convert parameters to datetime objects
         if isinstance(start_date, str):
@@ -435,7 +403,7 @@ def calculate_vb2_transits(birth_date, birth_time, birth_latitude, birth_longitu
         end_dt = start_dt + timedelta(days=days_span)
         
         # Call the main processing function
-        transits = process_transits(start_dt, end_dt)
+        transits = engine.scan(start_dt, end_dt)
         
         # Convert to API format
         api_transits = []
@@ -462,27 +430,6 @@ def calculate_yogi_point_transits(birth_date, birth_time, birth_latitude, birth_
     API wrapper function for Yogi Point transit calculations (same as VB2)
     """
     try:
-        global BIRTH_DATE, BIRTH_LAT, BIRTH_LON
-        
-        # Set global birth date from parameters
-        if isinstance(birth_date, str):
-            BIRTH_DATE = datetime.fromisoformat(birth_date)
-        else:
-            BIRTH_DATE = birth_date
-            
-        # Parse birth time if provided as string
-        if isinstance(birth_time, str):
-            time_parts = birth_time.split(':')
-            BIRTH_DATE = BIRTH_DATE.replace(
-                hour=int(time_parts[0]), 
-                minute=int(time_parts[1]),
-                second=int(time_parts[2]) if len(time_parts) > 2 else 0
-            )
-        
-        # Set global location variables
-        BIRTH_LAT = float(birth_latitude)
-        BIRTH_LON = float(birth_longitude)
-        
         return calculate_vb2_transits(birth_date, birth_time, birth_latitude, birth_longitude, start_date, days_span)
     except Exception as e:
         print(f"Error in calculate_yogi_point_transits: {str(e)}")
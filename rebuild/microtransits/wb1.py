@@ -10,7 +10,14 @@ from decimal import Decimal, getcontext
 from zoneinfo import ZoneInfo
 import os
 import csv
-import statistics
+import logging
+
+import numpy as np
+
+from core.instrumentation import increment, log_event
+from core.natal_points import natal_chart
+from microtransits.engine import TransitEngine, instrumented_scan, parse_birth_datetime
+from microtransits.ephemeris_grid import get_grid, minute_count, minute_jds, orb_runs
 
 #=============================================
 # SECTION 1: CONFIGURATION AND CONSTANTS
@@ -19,6 +26,8 @@ import statistics
 # Precision settings
 getcontext().prec = 20
 
+logger = logging.getLogger(__name__)
+
 # Default Astrological Settings (can be overridden by API parameters)
 DEFAULT_AYANAMSA = 23.85
 DEFAULT_ORB = 1.0  # Standard 1-degree orb to match yp.py and vb2.py
@@ -64,8 +73,13 @@ def calculate_yogi_point(jd):
     swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
 
     sun_pos = swe.calc_ut(jd, swe.SUN, flags)[0][0]
+    increment('ephemeris_calls')
     moon_pos, _ = calculate_moon_position(jd) # Use improved moon calculation
 
+    return yogi_point_from(sun_pos, moon_pos)
+
+def yogi_point_from(sun_pos, moon_pos):
+    """Yogi point from sidereal Sun and Moon longitudes."""
     return (sun_pos + moon_pos + 93.20) % 360
 
 def calculate_moon_position(jd):
@@ -75,6 +89,7 @@ def calculate_moon_position(jd):
 
     # Get moon position with speed
     moon_data = swe.calc_ut(jd, swe.MOON, flags)
+    increment('ephemeris_calls')
     pos = moon_data[0][0]
     speed = moon_data[0][3]
 
@@ -99,12 +114,10 @@ def calculate_pof(asc, sun, moon):
     # If Sun is ahead of Asc in zodiacal order, it's above horizon (day chart)
     sun_ahead = (sun - asc + 360) % 360 <= 180
 
-    if sun_ahead:  # Day chart
-        pof = (asc + moon - sun) % 360
-    else:  # Night chart
-        pof = (asc - moon + sun) % 360
+    # Works on scalars and on position arrays
+    pof = np.where(sun_ahead, (asc + moon - sun) % 360, (asc - moon + sun) % 360)
 
-    return pof
+    return pof if np.ndim(pof) else float(pof)
 
 def get_planet_position(jd, planet_id):
     """Get sidereal planet position with improved precision."""
@@ -114,12 +127,15 @@ def get_planet_position(jd, planet_id):
     if planet_id == swe.MOON:
         pos, _ = calculate_moon_position(jd)
         return pos
+    increment('ephemeris_calls')
     return swe.calc_ut(jd, planet_id, flags)[0][0]
 
-def calculate_positions(jd):
+def calculate_positions(jd, location=None):
     """Calculate all required positions with POF."""
+    location = TRANSIT_LOCATION if location is None else location
+
     # Get house cusps and Ascendant
-    cusps, ascmc = swe.houses(jd, TRANSIT_LOCATION[0], TRANSIT_LOCATION[1], b'P')
+    cusps, ascmc = swe.houses(jd, location[0], location[1], b'P')
     transit_asc = cusps[0]
 
     # Calculate sun and moon positions
@@ -137,6 +153,33 @@ def calculate_positions(jd):
         'JUP': get_planet_position(jd, swe.JUPITER),
     }
 
+# Position array used for each transit type in find_transits
+TRANSIT_POSITION_KEYS = {
+    'POF': 'POF',
+    'ASC': 'ASC',
+    'RISING': 'JUP',
+    'TRANSIT_YOGI': 'TRANSIT_YOGI',
+    'MOON': 'MOON',
+    'SUN': 'SUN',
+    'JUPITER': 'JUP',
+}
+
+def calculate_position_arrays(grid, jds, location=None):
+    """Calculate all required positions for an array of Julian days from the shared grid."""
+    location = TRANSIT_LOCATION if location is None else location
+    transit_asc = grid.ascendant(jds, location[0], location[1])
+    transit_sun = grid.longitude(swe.SUN, jds, sidereal=True)
+    transit_moon = grid.longitude(swe.MOON, jds, sidereal=True)
+
+    return {
+        'POF': calculate_pof(transit_asc, transit_sun, transit_moon),
+        'ASC': transit_asc,
+        'SUN': transit_sun,
+        'MOON': transit_moon,
+        'JUP': grid.longitude(swe.JUPITER, jds, sidereal=True),
+        'TRANSIT_YOGI': (transit_sun + transit_moon + 93.20) % 360,
+    }
+
 
 #=============================================
 # SECTION 3: POSITION AND FORMAT FUNCTIONS
@@ -156,33 +199,41 @@ def format_position(lon):
 # SECTION 4: TRANSIT DETECTION FUNCTIONS
 #=============================================
 
-def find_exact_transit_time(start_dt, end_dt, transit_type, target_pos):
+def calculate_transit_position(jd, transit_type, location=None):
+    """Position of the point a transit type follows, calculating only what it needs."""
+    if transit_type == 'POF':
+        location = TRANSIT_LOCATION if location is None else location
+        transit_asc = swe.houses(jd, location[0], location[1], b'P')[0][0]
+        increment('ephemeris_calls')
+        return calculate_pof(transit_asc, get_planet_position(jd, swe.SUN),
+                             get_planet_position(jd, swe.MOON))
+    if transit_type == 'ASC':
+        location = TRANSIT_LOCATION if location is None else location
+        increment('ephemeris_calls')
+        return swe.houses(jd, location[0], location[1], b'P')[0][0]
+    if transit_type in ('RISING', 'JUPITER'):
+        return get_planet_position(jd, swe.JUPITER)
+    if transit_type == 'TRANSIT_YOGI':
+        return calculate_yogi_point(jd)
+    if transit_type == 'MOON':
+        return get_planet_position(jd, swe.MOON)
+    if transit_type == 'SUN':
+        return get_planet_position(jd, swe.SUN)
+    raise ValueError(f"Unknown transit type: {transit_type}")
+
+def local_julian_day(local_dt, include_seconds=True):
+    """Julian day (UT) for a New York wall-clock time."""
+    ut = convert_local_to_ut(local_dt)
+    hours = ut.hour + ut.minute/60.0
+    if include_seconds:
+        hours += ut.second/3600.0
+    return swe.julday(ut.year, ut.month, ut.day, hours)
+
+def find_exact_transit_time(start_dt, end_dt, transit_type, target_pos, location=None):
     """Find exact transit time using binary search."""
     while (end_dt - start_dt) > timedelta(seconds=1):
         mid_dt = start_dt + (end_dt - start_dt)/2
-        ut = convert_local_to_ut(mid_dt)
-        jd = swe.julday(ut.year, ut.month, ut.day,
-                       ut.hour + ut.minute/60.0 + ut.second/3600.0)
-
-        # Get position based on transit type
-        positions = calculate_positions(jd)
-        if transit_type == 'POF':
-            pos = positions['POF']
-        elif transit_type == 'ASC':
-            pos = positions['ASC']
-        elif transit_type == 'RISING':
-            pos = positions['JUP']
-        elif transit_type == 'TRANSIT_YOGI':
-            pos = calculate_yogi_point(jd)
-        elif transit_type == 'MOON':
-            pos = positions['MOON']
-        elif transit_type == 'SUN':
-            pos = positions['SUN']
-        elif transit_type == 'JUPITER':
-            pos = positions['JUP']
-        else:
-            raise ValueError(f"Unknown transit type: {transit_type}")
-
+        pos = calculate_transit_position(local_julian_day(mid_dt), transit_type, location)
 
         if abs(pos - target_pos) < ORBTIGHT:
             return mid_dt
@@ -193,74 +244,29 @@ def find_exact_transit_time(start_dt, end_dt, transit_type, target_pos):
 
     return start_dt
 
-def find_transit_edges(exact_time, transit_type, target_pos):
-    """Find applying and separating edges of transit window."""
-    start_time = exact_time
+def find_transit_edge(exact_time, step, transit_type, target_pos, location=None, orb=None):
+    """Walk from the exact time in steps while the orb keeps growing but stays within orb."""
+    orb = ORB if orb is None else orb
+    edge_time = exact_time
     prev_orb = 0
 
-    # Find applying edge (going backwards)
     while True:
-        ut = convert_local_to_ut(start_time)
-        jd = swe.julday(ut.year, ut.month, ut.day,
-                       ut.hour + ut.minute/60.0)
-        positions = calculate_positions(jd)
-        if transit_type == 'POF':
-            pos = positions['POF']
-        elif transit_type == 'ASC':
-            pos = positions['ASC']
-        elif transit_type == 'RISING':
-            pos = positions['JUP']
-        elif transit_type == 'TRANSIT_YOGI':
-            pos = calculate_yogi_point(jd)
-        elif transit_type == 'MOON':
-            pos = positions['MOON']
-        elif transit_type == 'SUN':
-            pos = positions['SUN']
-        elif transit_type == 'JUPITER':
-            pos = positions['JUP']
-        else:
-            raise ValueError(f"Unknown transit type: {transit_type}")
-
+        pos = calculate_transit_position(local_julian_day(edge_time, include_seconds=False),
+                                         transit_type, location)
         current_orb = abs(pos - target_pos)
-        if current_orb > ORB or current_orb <= prev_orb:
+        if current_orb > orb or current_orb <= prev_orb:
             break
         prev_orb = current_orb
-        start_time -= timedelta(minutes=1)
-
-    # Reset prev_orb for separating edge
-    prev_orb = 0
-    end_time = exact_time
-
-    # Find separating edge (going forwards)
-    while True:
-        ut = convert_local_to_ut(end_time)
-        jd = swe.julday(ut.year, ut.month, ut.day,
-                       ut.hour + ut.minute/60.0)
-        positions = calculate_positions(jd)
-        if transit_type == 'POF':
-            pos = positions['POF']
-        elif transit_type == 'ASC':
-            pos = positions['ASC']
-        elif transit_type == 'RISING':
-            pos = positions['JUP']
-        elif transit_type == 'TRANSIT_YOGI':
-            pos = calculate_yogi_point(jd)
-        elif transit_type == 'MOON':
-            pos = positions['MOON']
-        elif transit_type == 'SUN':
-            pos = positions['SUN']
-        elif transit_type == 'JUPITER':
-            pos = positions['JUP']
-        else:
-            raise ValueError(f"Unknown transit type: {transit_type}")
+        edge_time += step
 
-        current_orb = abs(pos - target_pos)
-        if current_orb > ORB or current_orb <= prev_orb:
-            break
-        prev_orb = current_orb
-        end_time += timedelta(minutes=1)
+    return edge_time - step
 
-    return start_time + timedelta(minutes=1), end_time - timedelta(minutes=1)
+def find_transit_edges(exact_time, transit_type, target_pos, location=None, orb=None):
+    """Find applying and separating edges of transit window."""
+    step = timedelta(minutes=1)
+    start_time = find_transit_edge(exact_time, -step, transit_type, target_pos, location, orb)
+    end_time = find_transit_edge(exact_time, step, transit_type, target_pos, location, orb)
+    return start_time, end_time
 
 
 
@@ -268,101 +274,70 @@ def find_transit_edges(exact_time, transit_type, target_pos):
 # SECTION 5: MAIN TRANSIT SEARCH FUNCTION
 #=============================================
 
-def find_transits(birth_yogi_point):
-    """Find all transits to the Yogi Point."""
+def find_transits(birth_yogi_point, start_date, end_date, location=None, orb=None, include_open=False):
+    """Find all transits to the Yogi Point (and, with include_open, those still in orb at the end)."""
+    orb = ORB if orb is None else orb
     transits = []
+    open_runs = []
 
-    print(f"\nCalculating Western Burst One (WB1) transits...")
-    print(f"Birth Yogi Point: {format_position(birth_yogi_point)}")
+    log_event(logger, logging.DEBUG, 'wb1.search', yogi_point=birth_yogi_point)
 
-    # Track timing for validation
-    calculation_times = []
-    prev_time = None
+    # Sample every minute; positions come from the shared ephemeris grid
+    count = minute_count(start_date, end_date)
+    if not count:
+        return transits
+    jds = minute_jds(start_date, count, tz=ZoneInfo("America/New_York"))
+    positions = calculate_position_arrays(get_grid(jds[0], jds[-1]), jds, location)
+    increment('scan_steps', count * len(TRANSIT_CONFIGS))
 
     for transit_name, transit_type, description, named_lt in TRANSIT_CONFIGS:
-        print(f"\nChecking {transit_name} transits...")
-        active_transits = {}  # Track active transits for this type
-        current_dt = START_DATE
-
-        while current_dt <= END_DATE:
-            # Track time intervals for validation
-            if prev_time:
-                interval = (current_dt - prev_time).total_seconds()
-                calculation_times.append(interval)
-            prev_time = current_dt
-
-            ut = convert_local_to_ut(current_dt)
-            jd = swe.julday(ut.year, ut.month, ut.day,
-                           ut.hour + ut.minute/60.0)
-
-            positions = calculate_positions(jd)
-            if transit_type == 'POF':
-                pos = positions['POF']
-            elif transit_type == 'ASC':
-                pos = positions['ASC']
-            elif transit_type == 'RISING':
-                pos = positions['JUP']
-            elif transit_type == 'TRANSIT_YOGI':
-                pos = calculate_yogi_point(jd)
-            elif transit_type == 'MOON':
-                pos = positions['MOON']
-            elif transit_type == 'SUN':
-                pos = positions['SUN']
-            elif transit_type == 'JUPITER':
-                pos = positions['JUP']
-            else:
-                raise ValueError(f"Unknown transit type: {transit_type}")
-
-            orb = abs(pos - birth_yogi_point)
-
-            # Check for transit entry
-            if orb <= ORB:
-                if transit_name not in active_transits:
-                    exact_time = find_exact_transit_time(
-                        current_dt - timedelta(minutes=2),
-                        current_dt + timedelta(minutes=2),
-                        transit_type,
-                        birth_yogi_point
-                    )
-
-                    active_transits[transit_name] = {
-                        'name': f"{SCRIPT_PREFIX} {transit_name}",
-                        'type': transit_type,
-                        'start': current_dt,
-                        'exact': exact_time,
-                        'target_pos': format_position(birth_yogi_point),
-                        'transit_pos': format_position(pos),
-                        'description': description,
-                        'transit_code': transit_type,
-                        'named_lt': named_lt,
-                        'calculation_interval': statistics.mean(calculation_times) if calculation_times else 60.0,
-                        'start_pos': pos,
-                        'min_orb': orb
-                    }
-
-            # Check for transit exit
-            elif transit_name in active_transits:
-                transit = active_transits[transit_name]
-                transit['end'] = current_dt - timedelta(minutes=1)
-                transit['orb'] = transit['min_orb']
-                duration = transit['end'] - transit['start']
-                transit['exact_precision'] = duration >= timedelta(minutes=1)
-                if not transit['exact_precision']:
-                    transit['end'] = transit['start'] + timedelta(minutes=1)
-                transits.append(transit)
-                del active_transits[transit_name]
-
-            # Update minimum orb for active transit
-            elif transit_name in active_transits:
-                active_transits[transit_name]['min_orb'] = min(
-                    active_transits[transit_name]['min_orb'],
-                    orb
-                )
-
-            # Check each minute
-            current_dt += timedelta(minutes=1)
-
-    return sorted(transits, key=lambda x: x['exact'])
+        transit_positions = positions[TRANSIT_POSITION_KEYS[transit_type]]
+        orbs = np.abs(transit_positions - birth_yogi_point)
+
+        for start_index, end_index in orb_runs(orbs, orb):
+            current_dt = start_date + timedelta(minutes=start_index)
+
+            # Transits still active at the end of the period are not reported
+            if end_index is None:
+                if include_open:
+                    open_runs.append({'transit_code': transit_type, 'start': current_dt,
+                                      'end': None, 'open': True})
+                continue
+
+            pos = float(transit_positions[start_index])
+            exact_time = find_exact_transit_time(
+                current_dt - timedelta(minutes=2),
+                current_dt + timedelta(minutes=2),
+                transit_type,
+                birth_yogi_point,
+                location
+            )
+
+            transit = {
+                'name': f"{SCRIPT_PREFIX} {transit_name}",
+                'type': transit_type,
+                'start': current_dt,
+                'exact': exact_time,
+                'target_pos': format_position(birth_yogi_point),
+                'transit_pos': format_position(pos),
+                'description': description,
+                'transit_code': transit_type,
+                'named_lt': named_lt,
+                'calculation_interval': 60.0,
+                'start_pos': pos,
+                'min_orb': float(orbs[start_index])
+            }
+
+            # Transit exit: the last minute still in orb
+            transit['end'] = start_date + timedelta(minutes=end_index - 1)
+            transit['orb'] = transit['min_orb']
+            duration = transit['end'] - transit['start']
+            transit['exact_precision'] = duration >= timedelta(minutes=1)
+            if not transit['exact_precision']:
+                transit['end'] = transit['start'] + timedelta(minutes=1)
+            transits.append(transit)
+
+    return sorted(transits, key=lambda x: x['exact']) + open_runs
 
 #=============================================
 # SECTION 6: EXPORT FUNCTIONS
@@ -415,19 +390,26 @@ def export_transits(transits):
 # SECTION 7: MAIN EXECUTION
 #=============================================
 
+def calculate_birth_yogi_point(birth_date):
+    """Calculate the natal Yogi Point for a New York wall-clock birth time."""
+    birth_ut = convert_local_to_ut(birth_date)
+    birth_jd = swe.julday(birth_ut.year, birth_ut.month, birth_ut.day,
+                         birth_ut.hour + birth_ut.minute/60.0)
+    # Same positions as calculate_yogi_point, from the natal points cache
+    natal = natal_chart(birth_jd)
+    return yogi_point_from(natal.sidereal_longitude(swe.SUN),
+                           natal.sidereal_longitude(swe.MOON, swe.FLG_SPEED) % 360)
+
 def main():
     """Main execution function."""
     try:
         swe.set_ephe_path()
 
         # Calculate birth Yogi Point
-        birth_ut = convert_local_to_ut(BIRTH_DATE)
-        birth_jd = swe.julday(birth_ut.year, birth_ut.month, birth_ut.day,
-                             birth_ut.hour + birth_ut.minute/60.0)
-        birth_yogi_point = calculate_yogi_point(birth_jd)
+        birth_yogi_point = calculate_birth_yogi_point(BIRTH_DATE)
 
         # Find and export transits
-        transits = find_transits(birth_yogi_point)
+        transits = find_transits(birth_yogi_point, START_DATE, END_DATE)
         export_transits(transits)
 
         print("\nCalculation complete! Files exported to 'exports' folder.")
@@ -439,33 +421,35 @@ def main():
     finally:
         swe.close()
 
-def process_transits(start_date=None, end_date=None):
-    """Process WB1 transits between two dates with minute-by-minute precision."""
-    if start_date is None or end_date is None:
-        raise ValueError("Both start_date and end_date must be provided")
+class WB1Engine(TransitEngine):
+    """WB1 transits to the natal Yogi Point for one birth time and location."""
+    name = 'wb1'
+    default_orb = DEFAULT_ORB
+    wall_clock_tz = ZoneInfo("America/New_York")
+    reports_open_runs = True
 
-    print("\nCalculating Western Burst One (WB1) transits...")
-    print(f"Period: {start_date} to {end_date}")
+    @instrumented_scan
+    def scan(self, start_date, end_date, include_open=False):
+        """Find WB1 transits between two dates with minute-by-minute precision."""
+        if start_date is None or end_date is None:
+            raise ValueError("Both start_date and end_date must be provided")
 
-    # Ensure we have timezone-aware datetime objects
-    if start_date.tzinfo is None:
-        start_date = start_date.replace(tzinfo=ZoneInfo("UTC"))
-    if end_date.tzinfo is None:
-        end_date = end_date.replace(tzinfo=ZoneInfo("UTC"))
+        log_event(logger, logging.INFO, 'wb1.scan', start=start_date, end=end_date)
 
-    # Convert start and end dates to JD
-    birth_ut = convert_local_to_ut(BIRTH_DATE)
-    birth_jd = swe.julday(birth_ut.year, birth_ut.month, birth_ut.day,
-                         birth_ut.hour + birth_ut.minute/60.0)
-    birth_yogi_point = calculate_yogi_point(birth_jd)
+        # Ensure we have timezone-aware datetime objects
+        if start_date.tzinfo is None:
+            start_date = start_date.replace(tzinfo=ZoneInfo("UTC"))
+        if end_date.tzinfo is None:
+            end_date = end_date.replace(tzinfo=ZoneInfo("UTC"))
 
-    # Set global date range for find_transits
-    global START_DATE, END_DATE
-    START_DATE = start_date
-    END_DATE = end_date
+        birth_yogi_point = calculate_birth_yogi_point(self.birth_date)
+        return find_transits(birth_yogi_point, start_date, end_date, self.location, self.orb,
+                             include_open=include_open)
 
-    # Find transits
-    transits = find_transits(birth_yogi_point)
+def process_transits(start_date=None, end_date=None):
+    """Process WB1 transits using the module settings and export them to CSV."""
+    engine = WB1Engine(BIRTH_DATE, location=TRANSIT_LOCATION, orb=ORB)
+    transits = engine.scan(start_date, end_date)
 
     if transits:
         export_transits(transits)
@@ -488,25 +472,9 @@ def calculate_wb1_transits(birth_date, birth_time, birth_latitude, birth_longitu
     Returns transits in the format expected by the API
     """
     try:
-        global BIRTH_DATE, TRANSIT_LOCATION
-        
-        # Set global birth date from parameters
-        if isinstance(birth_date, str):
-            BIRTH_DATE = datetime.fromisoformat(birth_date)
-        else:
-            BIRTH_DATE = birth_date
-            
-        # Parse birth time if provided as string
-        if isinstance(birth_time, str):
-            time_parts = birth_time.split(':')
-            BIRTH_DATE = BIRTH_DATE.replace(
-                hour=int(time_parts[0]), 
-                minute=int(time_parts[1]),
-                second=int(time_parts[2]) if len(time_parts) > 2 else 0
-            )
-        
-        # Set transit location (using current location from parameters)
-        TRANSIT_LOCATION = (float(birth_latitude), float(birth_longitude))
+        # Transit location is the location passed in (the birth location)
+        engine = WB1Engine(parse_birth_datetime(birth_date, birth_time),
+                           location=(birth_latitude, birth_longitude))
         
         # Convert parameters to datetime objects
         if isinstance(start_date, str):
@@ -517,7 +485,7 @@ def calculate_wb1_transits(birth_date, birth_time, birth_latitude, birth_longitu
         end_dt = start_dt + timedelta(days=days_span)
         
         # Call the main processing function
-        transits = process_transits(start_dt, end_dt)
+        transits = engine.scan(start_dt, end_dt)
         
         # Convert to API format
         api_transits = []
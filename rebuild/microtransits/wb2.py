@@ -9,8 +9,18 @@ import swisseph as swe
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 import csv
+import logging
 import os
 
+import numpy as np
+
+from core.instrumentation import increment, log_event
+from core.natal_points import natal_chart
+from microtransits.engine import TransitEngine, instrumented_scan
+from microtransits.ephemeris_grid import (
+    angular_distance, get_grid, minute_count, minute_jds, orb_runs
+)
+
 ################################################################
 #                         CONSTANTS                              #
 ################################################################
@@ -27,6 +37,8 @@ DEFAULT_ORBTIGHT = 0.0001  # For exact aspect timing
 ORB = DEFAULT_ORB
 ORBTIGHT = DEFAULT_ORBTIGHT
 
+logger = logging.getLogger(__name__)
+
 ################################################################
 #                    CALCULATION FUNCTIONS                       #
 ################################################################
@@ -57,24 +69,23 @@ def calculate_pof(asc, sun, moon):
     # If Sun needs to travel < 180° to reach ASC, it's above horizon
     is_day_chart = (asc - sun + 360) % 360 < 180
 
-    if is_day_chart:  # Day chart - Sun above horizon
-        pof = (asc + moon - sun) % 360
-    else:  # Night chart - Sun below horizon
-        pof = (asc + sun - moon) % 360
+    # Day chart - Sun above horizon; night chart - Sun below horizon.
+    # Works on scalars and on position arrays.
+    pof = np.where(is_day_chart, (asc + moon - sun) % 360, (asc + sun - moon) % 360)
 
-    return pof
+    return pof if np.ndim(pof) else float(pof)
 
 def calculate_positions_with_location(jd, lat, lon):
-    """Calculate all required positions for given location."""
+    """Calculate all required natal positions for given location (from the natal points cache)."""
     positions = {}
+    natal = natal_chart(jd)
 
-    # Calculate house cusps and Ascendant
-    cusps, ascmc = swe.houses(jd, lat, lon, b'P')
-    positions['ASC'] = float(ascmc[0])
+    # Ascendant
+    positions['ASC'] = natal.ascendant(lat, lon)
 
     # Calculate planetary positions
     for planet, name in [(swe.SUN, 'SUN'), (swe.MOON, 'MOON'), (swe.JUPITER, 'JUP')]:
-        positions[name] = float(swe.calc_ut(jd, planet)[0][0])
+        positions[name] = natal.longitude(planet)
 
     # Calculate POF and POI
     positions['POF'] = calculate_pof(
@@ -83,19 +94,38 @@ def calculate_positions_with_location(jd, lat, lon):
         positions['MOON']
     )
     positions['POI'] = (positions['ASC'] + positions['JUP'] - positions['SUN']) % 360
-    positions['RAHU'] = float(swe.calc_ut(jd, swe.MEAN_NODE)[0][0])
+    positions['RAHU'] = natal.longitude(swe.MEAN_NODE)
     positions['LAGNA_LORD'] = calculate_lagna_lord(positions['ASC'], jd)
     
     # Calculate Regulus position using Swiss Ephemeris (proper precession)
     try:
-        regulus_data = swe.fixstar_ut('Regulus', jd)
-        positions['REGULUS'] = float(regulus_data[0][0])
+        positions['REGULUS'] = natal.fixed_star('Regulus')
     except Exception:
         # Fallback to approximate current position if fixstar fails
         positions['REGULUS'] = 150.0  # ~0° Virgo (Regulus crossed into Virgo in 2012)
 
     return positions
 
+def calculate_position_arrays(grid, jds, lat, lon):
+    """Calculate transit position arrays for given location from the shared grid."""
+    positions = {}
+
+    positions['ASC'] = grid.ascendant(jds, lat, lon)
+    for planet, name in [(swe.SUN, 'SUN'), (swe.MOON, 'MOON'), (swe.JUPITER, 'JUP')]:
+        positions[name] = grid.longitude(planet, jds)
+
+    positions['POF'] = calculate_pof(positions['ASC'], positions['SUN'], positions['MOON'])
+    positions['POI'] = (positions['ASC'] + positions['JUP'] - positions['SUN']) % 360
+    positions['RAHU'] = grid.longitude(swe.MEAN_NODE, jds)
+
+    try:
+        positions['REGULUS'] = grid.longitude('Regulus', jds)
+    except Exception:
+        # Fallback to approximate current position if fixstar fails
+        positions['REGULUS'] = np.full(len(jds), 150.0)
+
+    return positions
+
 def calculate_lagna_lord(asc_pos, jd):
     """Calculate the position of the Lagna Lord based on Ascendant sign"""
     # Determine Ascendant sign (0 = Aries, 1 = Taurus, etc.)
@@ -166,10 +196,8 @@ def get_natal_lagna_lord_planet(natal_asc):
 
 def process_transits_with_params(birth_date, birth_lat, birth_lon, transit_lat, transit_lon, start_date, end_date, orb=DEFAULT_ORB):
     """Process WB2 transits with API parameters."""
-    print("\nProcessing WB2 transits...")
-    print(f"Birth: {birth_date.strftime('%Y-%m-%d %H:%M')} at {birth_lat}°N, {birth_lon}°W")
-    print(f"Transit Location: {transit_lat}°N, {transit_lon}°W")
-    print(f"Period: {start_date} to {end_date}")
+    log_event(logger, logging.INFO, 'wb2.scan', birth=birth_date, birth_lat=birth_lat, birth_lon=birth_lon,
+              transit_lat=transit_lat, transit_lon=transit_lon, start=start_date, end=end_date)
 
     # Calculate birth positions
     birth_ut = convert_local_to_ut(birth_date)
@@ -181,72 +209,80 @@ def process_transits_with_params(birth_date, birth_lat, birth_lon, transit_lat,
     natal_lagna_lord_planet = get_natal_lagna_lord_planet(birth_positions['ASC'])
     planet_names = {swe.SUN: 'Sun', swe.MOON: 'Moon', swe.MARS: 'Mars', swe.MERCURY: 'Mercury',
                    swe.JUPITER: 'Jupiter', swe.VENUS: 'Venus', swe.SATURN: 'Saturn'}
-    print(f"Natal Lagna Lord: {planet_names.get(natal_lagna_lord_planet, 'Unknown')}")
+    log_event(logger, logging.DEBUG, 'wb2.natal', lagna_lord=planet_names.get(natal_lagna_lord_planet, 'Unknown'))
+
+    # Sample every minute; positions come from the shared ephemeris grid
+    count = minute_count(start_date, end_date)
+    if not count:
+        log_event(logger, logging.INFO, 'wb2.done', transits=0)
+        return []
+    jds = minute_jds(start_date, count, tz=ZoneInfo("America/New_York"))
+    grid = get_grid(jds[0], jds[-1])
+    positions = calculate_position_arrays(grid, jds, transit_lat, transit_lon)
+
+    # Get transit position of the NATAL Lagna Lord planet (A1 fix)
+    transit_natal_lagna_lord = grid.longitude(natal_lagna_lord_planet, jds)
+
+    # Define transit configurations (duplicates removed)
+    transit_configs = [
+        ('POF-NAT', birth_positions['POF'], positions['POF'], 'Natal Part of Fortune Conjunct Transit Part of Fortune', None),
+        ('POF-SUN', positions['SUN'], positions['POF'], 'Part of Fortune Conjunct Sun', None),
+        ('POF-MOON', positions['MOON'], positions['POF'], 'Part of Fortune Conjunct Moon', None),
+        ('NAT-POF', birth_positions['ASC'], positions['POF'], 'Natal Ascendant Conjunct Transit Part of Fortune', 'K1'),
+        ('POF-ASC', positions['ASC'], positions['POF'], 'Part of Fortune Conjunct Transit Ascendant', None),
+        ('POF-JUP', positions['JUP'], positions['POF'], 'Part of Fortune Conjunct Jupiter', None),
+        ('NAT-MOON-POF', birth_positions['MOON'], positions['POF'], 'Part of Fortune Conjunct Natal Moon', None),
+        ('POF-INC', positions['POI'], positions['POF'], 'Part of Fortune Conjunct Part of Increase', None),
+        ('POF-RAHU', positions['RAHU'], positions['POF'], 'Part of Fortune Conjunct North Node (Rahu)', 'C1'),
+        ('POF-LAGNA', transit_natal_lagna_lord, positions['POF'], 'Part of Fortune Conjunct Lagna Lord', 'A1'),
+        ('REG-POF', positions['REGULUS'], positions['POF'], 'Regulus Conjunct Part of Fortune', None),
+    ]
 
+    increment('scan_steps', count * len(transit_configs))
     all_transits = []
-    current_time = start_date
-    active_transits = {}
-
-    while current_time <= end_date:
-        ut = convert_local_to_ut(current_time)
-        jd = swe.julday(ut.year, ut.month, ut.day,
-                       ut.hour + ut.minute/60.0)
-
-        positions = calculate_positions_with_location(jd, transit_lat, transit_lon)
-        
-        # Get transit position of the NATAL Lagna Lord planet (A1 fix)
-        transit_natal_lagna_lord = float(swe.calc_ut(jd, natal_lagna_lord_planet)[0][0])
-
-        # Define transit configurations (duplicates removed)
-        transit_configs = [
-            ('POF-NAT', birth_positions['POF'], positions['POF'], 'Natal Part of Fortune Conjunct Transit Part of Fortune', None),
-            ('POF-SUN', positions['SUN'], positions['POF'], 'Part of Fortune Conjunct Sun', None),
-            ('POF-MOON', positions['MOON'], positions['POF'], 'Part of Fortune Conjunct Moon', None),
-            ('NAT-POF', birth_positions['ASC'], positions['POF'], 'Natal Ascendant Conjunct Transit Part of Fortune', 'K1'),
-            ('POF-ASC', positions['ASC'], positions['POF'], 'Part of Fortune Conjunct Transit Ascendant', None),
-            ('POF-JUP', positions['JUP'], positions['POF'], 'Part of Fortune Conjunct Jupiter', None),
-            ('NAT-MOON-POF', birth_positions['MOON'], positions['POF'], 'Part of Fortune Conjunct Natal Moon', None),
-            ('POF-INC', positions['POI'], positions['POF'], 'Part of Fortune Conjunct Part of Increase', None),
-            ('POF-RAHU', positions['RAHU'], positions['POF'], 'Part of Fortune Conjunct North Node (Rahu)', 'C1'),
-            ('POF-LAGNA', transit_natal_lagna_lord, positions['POF'], 'Part of Fortune Conjunct Lagna Lord', 'A1'),
-            ('REG-POF', positions['REGULUS'], positions['POF'], 'Regulus Conjunct Part of Fortune', None),
-        ]
-
-        for transit_code, pos1, pos2, description, named_lt in transit_configs:
-            is_active, orb_diff = is_conjunct(pos1, pos2, orb)
-
-            # Transit entry
-            if is_active and transit_code not in active_transits:
-                transit = {
-                    'start': current_time,
-                    'end': None,
-                    'type': description,
-                    'transit_code': transit_code,
-                    'orb': orb_diff,
-                }
-                active_transits[transit_code] = transit
-
-            # Transit exit
-            elif not is_active and transit_code in active_transits:
-                transit = active_transits.pop(transit_code)
-                transit['end'] = current_time
-                all_transits.append(transit)
-
-        current_time += timedelta(minutes=1)
-
-    print(f"Found {len(all_transits)} WB2 transits")
+    for index, (transit_code, pos1, pos2, description, named_lt) in enumerate(transit_configs):
+        orb_diffs = angular_distance(pos1, pos2)
+
+        for start_index, end_index in orb_runs(orb_diffs, orb):
+            # Transits still active at the end of the period are not reported
+            if end_index is None:
+                continue
+            all_transits.append((end_index, index, {
+                'start': start_date + timedelta(minutes=start_index),
+                'end': start_date + timedelta(minutes=end_index),
+                'type': description,
+                'transit_code': transit_code,
+                'orb': float(orb_diffs[start_index]),
+            }))
+
+    # Same order as the minute scan: by exit time, then configuration
+    all_transits.sort(key=lambda item: item[:2])
+    all_transits = [transit for _, _, transit in all_transits]
+
+    log_event(logger, logging.INFO, 'wb2.done', transits=len(all_transits))
     return all_transits
 
+class WB2Engine(TransitEngine):
+    """WB2 Part of Fortune transits for one birth chart, transit location and orb."""
+    name = 'wb2'
+    default_orb = DEFAULT_ORB
+
+    @instrumented_scan
+    def scan(self, start_date, end_date):
+        """Process WB2 transits between two dates."""
+        return process_transits_with_params(
+            self.birth_date, self.birth_location[0], self.birth_location[1],
+            self.location[0], self.location[1],
+            start_date, end_date, self.orb
+        )
+
 def process_transits(start_date=None, end_date=None):
     """Legacy function for backward compatibility."""
     # Default hardcoded values for testing
-    birth_date = datetime(1973, 3, 9, 16, 56)
-    birth_lat = 29.2108
-    birth_lon = -81.0228
-    transit_lat = 40.7128
-    transit_lon = -74.0060
-    
-    return process_transits_with_params(birth_date, birth_lat, birth_lon, transit_lat, transit_lon, start_date, end_date)
+    engine = WB2Engine(datetime(1973, 3, 9, 16, 56),
+                       location=(40.7128, -74.0060),
+                       birth_location=(29.2108, -81.0228))
+    return engine.scan(start_date, end_date)
 
 def format_position(lon):
     """Format position with sign and degrees."""
@@ -5,6 +5,16 @@ from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 import os
 import csv
+import logging
+
+import numpy as np
+
+from core.instrumentation import increment, log_event
+from core.natal_points import natal_chart
+from microtransits.engine import TransitEngine, instrumented_scan, parse_birth_datetime
+from microtransits.ephemeris_grid import (
+    angular_distance, get_grid, minute_count, minute_jds, orb_runs
+)
 
 # Configuration Constants
 SCRIPT_PREFIX = "WB3"
@@ -18,6 +28,8 @@ ORB = DEFAULT_ORB
 BIRTH_DATE = None  # Will be set by API calls
 TRANSIT_LOCATION = (40.7128, -74.0060)  # Default NYC coordinates
 
+logger = logging.getLogger(__name__)
+
 def calculate_pof(asc, sun, moon):
     """
     Calculate Part of Fortune using correct day/night formula.
@@ -32,12 +44,10 @@ def calculate_pof(asc, sun, moon):
     
     sun_ahead = (sun - asc + 360) % 360 <= 180
     
-    if sun_ahead:  # Day chart
-        pof = (asc + moon - sun) % 360
-    else:  # Night chart
-        pof = (asc - moon + sun) % 360
+    # Day chart / night chart; works on scalars and on position arrays
+    pof = np.where(sun_ahead, (asc + moon - sun) % 360, (asc - moon + sun) % 360)
     
-    return pof
+    return pof if np.ndim(pof) else float(pof)
 
 ################################################################
 #                    API WRAPPER FUNCTIONS                      #
@@ -49,25 +59,9 @@ def calculate_wb3_transits(birth_date, birth_time, birth_latitude, birth_longitu
     Returns transits in the format expected by the API
     """
     try:
-        global BIRTH_DATE, TRANSIT_LOCATION
-        
-        # Set global birth date from parameters
-        if isinstance(birth_date, str):
-            BIRTH_DATE = datetime.fromisoformat(birth_date)
-        else:
-            BIRTH_DATE = birth_date
-            
-        # Parse birth time if provided as string
-        if isinstance(birth_time, str):
-            time_parts = birth_time.split(':')
-            BIRTH_DATE = BIRTH_DATE.replace(
-                hour=int(time_parts[0]), 
-                minute=int(time_parts[1]),
-                second=int(time_parts[2]) if len(time_parts) > 2 else 0
-            )
-        
-        # Set transit location (using current location from parameters)
-        TRANSIT_LOCATION = (float(birth_latitude), float(birth_longitude))
+        # Transit location is the location passed in (the birth location)
+        engine = WB3Engine(parse_birth_datetime(birth_date, birth_time),
+                           location=(birth_latitude, birth_longitude))
         
         # Convert parameters to datetime objects
         if isinstance(start_date, str):
@@ -78,7 +72,7 @@ def calculate_wb3_transits(birth_date, birth_time, birth_latitude, birth_longitu
         end_dt = start_dt + timedelta(days=days_span)
         
         # Call the main processing function
-        transits = process_transits(start_dt, end_dt)
+        transits = engine.scan(start_dt, end_dt)
         
         # Convert to API format
         api_transits = []
@@ -97,19 +91,20 @@ def calculate_wb3_transits(birth_date, birth_time, birth_latitude, birth_longitu
         print(f"Error in calculate_wb3_transits: {str(e)}")
         return []
 
-def get_positions(jd):
-    """Calculate required planetary positions."""
+def get_positions(jd, location=None):
+    """Calculate required natal planetary positions (from the natal points cache)."""
+    location = TRANSIT_LOCATION if location is None else location
     positions = {}
+    natal = natal_chart(jd)
 
     # Calculate POF using proper day/night formula
-    cusps, ascmc = swe.houses(jd, TRANSIT_LOCATION[0], TRANSIT_LOCATION[1], b'P')
-    asc = float(ascmc[0])
-    sun_pos = float(swe.calc_ut(jd, swe.SUN)[0][0])
-    moon_pos = float(swe.calc_ut(jd, swe.MOON)[0][0])
+    asc = natal.ascendant(location[0], location[1])
+    sun_pos = natal.longitude(swe.SUN)
+    moon_pos = natal.longitude(swe.MOON)
     positions['POF'] = calculate_pof(asc, sun_pos, moon_pos)
 
     # Calculate POI (Part of Increase)
-    positions['POI'] = (asc + float(swe.calc_ut(jd, swe.JUPITER)[0][0]) - sun_pos) % 360
+    positions['POI'] = (asc + natal.longitude(swe.JUPITER) - sun_pos) % 360
 
     # Get Moon position
     positions['MOON'] = moon_pos
@@ -118,7 +113,23 @@ def get_positions(jd):
     positions['REGULUS'] = 149.50  # Fixed position for Regulus
 
     # Get North Node position
-    positions['NORTH_NODE'] = float(swe.calc_ut(jd, swe.MEAN_NODE)[0][0])
+    positions['NORTH_NODE'] = natal.longitude(swe.MEAN_NODE)
+
+    return positions
+
+def get_position_arrays(grid, jds, location=None):
+    """Calculate transit position arrays for an array of Julian days from the shared grid."""
+    location = TRANSIT_LOCATION if location is None else location
+    positions = {}
+
+    asc = grid.ascendant(jds, location[0], location[1])
+    sun_pos = grid.longitude(swe.SUN, jds)
+    moon_pos = grid.longitude(swe.MOON, jds)
+    positions['POF'] = calculate_pof(asc, sun_pos, moon_pos)
+    positions['POI'] = (asc + grid.longitude(swe.JUPITER, jds) - sun_pos) % 360
+    positions['MOON'] = moon_pos
+    positions['REGULUS'] = np.full(len(jds), 149.50)  # Fixed position for Regulus
+    positions['NORTH_NODE'] = grid.longitude(swe.MEAN_NODE, jds)
 
     return positions
 
@@ -128,27 +139,32 @@ def is_conjunct(pos1, pos2, orb=ORB):
     min_diff = min(diff, 360 - diff)
     return min_diff <= orb, min_diff
 
-def process_transits(start_date=None, end_date=None):
-    """Process WB3 transits between two dates."""
-    if start_date is None or end_date is None:
-        raise ValueError("Both start_date and end_date must be provided")
-
-    print("\nCalculating Western Burst Three (WB3) transits...")
-
-    # Calculate birth positions
-    birth_jd = swe.julday(BIRTH_DATE.year, BIRTH_DATE.month, BIRTH_DATE.day,
-                         BIRTH_DATE.hour + BIRTH_DATE.minute/60.0)
-    birth_positions = get_positions(birth_jd)
-
-    transits = []
-    current_time = start_date
-    active_transits = {}
-
-    while current_time <= end_date:
-        jd = swe.julday(current_time.year, current_time.month, current_time.day,
-                       current_time.hour + current_time.minute/60.0)
-
-        positions = get_positions(jd)
+class WB3Engine(TransitEngine):
+    """WB3 transits for one birth time and location."""
+    name = 'wb3'
+    default_orb = DEFAULT_ORB
+    reports_open_runs = True
+
+    @instrumented_scan
+    def scan(self, start_date, end_date, include_open=False):
+        """Process WB3 transits between two dates."""
+        if start_date is None or end_date is None:
+            raise ValueError("Both start_date and end_date must be provided")
+
+        log_event(logger, logging.INFO, 'wb3.scan', start=start_date, end=end_date)
+
+        # Calculate birth positions
+        birth_date = self.birth_date
+        birth_jd = swe.julday(birth_date.year, birth_date.month, birth_date.day,
+                             birth_date.hour + birth_date.minute/60.0)
+        birth_positions = get_positions(birth_jd, self.location)
+
+        # Sample every minute; positions come from the shared ephemeris grid
+        count = minute_count(start_date, end_date)
+        if not count:
+            return []
+        jds = minute_jds(start_date, count)
+        positions = get_position_arrays(get_grid(jds[0], jds[-1]), jds, self.location)
 
         # Define transit configurations
         transit_configs = [
@@ -158,27 +174,35 @@ def process_transits(start_date=None, end_date=None):
             (positions['NORTH_NODE'], positions['MOON'], 'NN-MOON', 'North Node to Moon')
         ]
 
-        for pos1, pos2, transit_code, description in transit_configs:
-            is_active, orb = is_conjunct(pos1, pos2)
-
-            if is_active and transit_code not in active_transits:
-                transit = {
-                    'start': current_time,
-                    'end': None,
+        increment('scan_steps', count * len(transit_configs))
+        transits = []
+        open_runs = []
+        for index, (pos1, pos2, transit_code, description) in enumerate(transit_configs):
+            orbs = angular_distance(pos1, pos2)
+
+            for start_index, end_index in orb_runs(orbs, self.orb):
+                # Transits still active at the end of the period are not reported
+                if end_index is None:
+                    if include_open:
+                        open_runs.append({'transit_code': transit_code,
+                                          'start': start_date + timedelta(minutes=start_index),
+                                          'end': None, 'open': True})
+                    continue
+                transits.append((end_index, index, {
+                    'start': start_date + timedelta(minutes=start_index),
+                    'end': start_date + timedelta(minutes=end_index),
                     'type': description,
                     'transit_code': transit_code,
-                    'orb': orb
-                }
-                active_transits[transit_code] = transit
+                    'orb': float(orbs[start_index])
+                }))
 
-            elif not is_active and transit_code in active_transits:
-                transit = active_transits.pop(transit_code)
-                transit['end'] = current_time
-                transits.append(transit)
+        # Same order as the minute scan: by exit time, then configuration
+        transits.sort(key=lambda item: item[:2])
+        return [transit for _, _, transit in transits] + open_runs
 
-        current_time += timedelta(minutes=1)
-
-    return transits
+def process_transits(start_date=None, end_date=None):
+    """Process WB3 transits between two dates using the module settings."""
+    return WB3Engine(BIRTH_DATE, location=TRANSIT_LOCATION, orb=ORB).scan(start_date, end_date)
 
 def export_transits(transits):
     """Export transits to CSV files with consistent format."""
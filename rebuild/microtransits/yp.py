@@ -4,6 +4,12 @@ from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
 import os
 import csv
+import logging
+
+from core.instrumentation import increment, log_event
+from microtransits.engine import TransitEngine, instrumented_scan
+from microtransits.ephemeris_grid import get_grid
+from microtransits.orb_solver import MAX_SPEED, asc_max_speed, find_orb_windows
 
 # Configuration Constants
 SCRIPT_PREFIX = "YP"
@@ -11,11 +17,14 @@ CALENDAR_COLOR = "#9C27B0"  # Purple for Yogi Point
 CATEGORY = "Yogi Point Transits"
 EXPORTS_FOLDER = "exports"
 DEFAULT_ORB = 1.0
+YOGI_OFFSET = 93.33
 
 # Global variables for script compatibility
 ORB = DEFAULT_ORB
 TRANSIT_LOCATION = (40.7128, -74.0060)  # Default NYC coordinates
 
+logger = logging.getLogger(__name__)
+
 def calculate_pof(asc, sun, moon):
     """
     Calculate Part of Fortune using correct day/night formula.
@@ -43,10 +52,11 @@ def calculate_yogi_point(jd):
     swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
     sun_pos = float(swe.calc_ut(jd, swe.SUN, flags)[0][0])
     moon_pos = float(swe.calc_ut(jd, swe.MOON, flags)[0][0])
-    return (sun_pos + moon_pos + 93.33) % 360
+    return (sun_pos + moon_pos + YOGI_OFFSET) % 360
 
-def get_planetary_positions(jd):
+def get_planetary_positions(jd, location=None):
     """Calculate required planetary positions."""
+    location = TRANSIT_LOCATION if location is None else location
     flags = swe.FLG_SIDEREAL
     swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
     positions = {}
@@ -57,7 +67,7 @@ def get_planetary_positions(jd):
         positions[planet] = pos
 
     # Calculate ASC
-    positions['ASC'] = float(swe.houses(jd, TRANSIT_LOCATION[0], TRANSIT_LOCATION[1], b'P')[0][0])
+    positions['ASC'] = float(swe.houses(jd, location[0], location[1], b'P')[0][0])
 
     # Calculate POF using proper day/night formula
     asc = positions['ASC']
@@ -73,8 +83,9 @@ def is_conjunct(pos1, pos2, orb=ORB):
     min_diff = min(diff, 360 - diff)
     return min_diff <= orb, min_diff
 
-def process_transits(start_date=None, end_date=None):
-    """Process Yogi Point transits between two dates."""
+def scan_transits(start_date=None, end_date=None, location=None, orb=None):
+    """Process Yogi Point transits with the legacy minute-by-minute scan."""
+    orb = ORB if orb is None else orb
     if start_date is None or end_date is None:
         raise ValueError("Both start_date and end_date must be provided")
 
@@ -96,7 +107,7 @@ def process_transits(start_date=None, end_date=None):
                        current_time.hour + current_time.minute/60.0)
 
         yogi_point = calculate_yogi_point(jd)
-        positions = get_planetary_positions(jd)
+        positions = get_planetary_positions(jd, location)
 
         # Define transit configurations
         transit_configs = [
@@ -112,7 +123,7 @@ def process_transits(start_date=None, end_date=None):
         ]
 
         for pos1, pos2, transit_code, description in transit_configs:
-            is_active, orb = is_conjunct(pos1, pos2)
+            is_active, diff = is_conjunct(pos1, pos2, orb)
 
             if is_active and transit_code not in active_transits:
                 transit = {
@@ -120,7 +131,7 @@ def process_transits(start_date=None, end_date=None):
                     'end': None,
                     'type': description,
                     'transit_code': transit_code,
-                    'orb': orb
+                    'orb': diff
                 }
                 active_transits[transit_code] = transit
 
@@ -133,6 +144,138 @@ def process_transits(start_date=None, end_date=None):
 
     return all_transits
 
+# Event solver configurations, in the same order as the scan.
+# Each signed separation pos1 - pos2 is a linear combination of body
+# longitudes plus an offset, with the transit Yogi Point expanded to
+# SUN + MOON + YOGI_OFFSET.
+SOLVER_CONFIGS = [
+    ('MOON-YOGI', 'Moon to Yogi Point', {'SUN': -1}, -YOGI_OFFSET),
+    ('SUN-YOGI', 'Sun to Yogi Point', {'MOON': -1}, -YOGI_OFFSET),
+    ('JUP-YOGI', 'Jupiter to Yogi Point', {'JUPITER': 1, 'SUN': -1, 'MOON': -1}, -YOGI_OFFSET),
+    ('ASC-YOGI', 'ASC to Yogi Point', {'ASC': 1, 'SUN': -1, 'MOON': -1}, -YOGI_OFFSET),
+    ('YOGI-MOON', 'Yogi Point to Moon', {'SUN': 1}, YOGI_OFFSET),
+    ('YOGI-SUN', 'Yogi Point to Sun', {'MOON': 1}, YOGI_OFFSET),
+    ('YOGI-JUP', 'Yogi Point to Jupiter', {'SUN': 1, 'MOON': 1, 'JUPITER': -1}, YOGI_OFFSET),
+    ('YOGI-POF', 'Yogi Point to POF', {'SUN': 1, 'MOON': 1, 'POF': -1}, YOGI_OFFSET),
+    ('YOGI-TRANSIT', 'Yogi Point to Transit Yogi Point', {}, 0.0),
+]
+
+SOLVER_BODIES = {'SUN': swe.SUN, 'MOON': swe.MOON, 'JUPITER': swe.JUPITER}
+
+def get_body_positions(jd, bodies, grid=None, location=None):
+    """Calculate only the positions needed by one solver configuration."""
+    location = TRANSIT_LOCATION if location is None else location
+    flags = swe.FLG_SIDEREAL
+    needed = set(bodies)
+    if 'POF' in needed:
+        needed |= {'ASC', 'SUN', 'MOON'}
+
+    positions = {}
+    for name in needed & SOLVER_BODIES.keys():
+        if grid is not None:
+            positions[name] = grid.longitude(SOLVER_BODIES[name], jd, sidereal=True)
+        else:
+            positions[name] = float(swe.calc_ut(jd, SOLVER_BODIES[name], flags)[0][0])
+            increment('ephemeris_calls')
+    if 'ASC' in needed:
+        positions['ASC'] = float(swe.houses(jd, location[0], location[1], b'P')[0][0])
+        increment('ephemeris_calls')
+    if 'POF' in needed:
+        positions['POF'] = calculate_pof(positions['ASC'], positions['SUN'], positions['MOON'])
+    return positions
+
+def _max_separation_rate(coefficients, asc_speed):
+    """Upper bound on the separation's rate of change in degrees/day."""
+    speeds = dict(MAX_SPEED, ASC=asc_speed, POF=asc_speed + MAX_SPEED['SUN'] + MAX_SPEED['MOON'])
+    return sum(abs(c) * speeds[body] for body, c in coefficients.items())
+
+def solve_config(jd_start, jd_end, coefficients, offset, orb=None, grid=None, location=None):
+    """Find the orb windows of one configuration with the event solver."""
+    orb = ORB if orb is None else orb
+    location = TRANSIT_LOCATION if location is None else location
+    asc_speed = asc_max_speed(location[0])
+    last = {}
+
+    def positions_at(jd):
+        if last.get('jd') != jd:
+            last['jd'] = jd
+            last['positions'] = get_body_positions(jd, coefficients, grid, location)
+        return last['positions']
+
+    def separation(jd):
+        positions = positions_at(jd)
+        return sum(c * positions[body] for body, c in coefficients.items()) + offset
+
+    step_limit = None
+    if 'POF' in coefficients:
+        switch_rate = asc_speed + MAX_SPEED['SUN']
+
+        def step_limit(jd):
+            # Don't step across the POF day/night formula switch (Sun on the horizon)
+            positions = positions_at(jd)
+            horizon = (positions['SUN'] - positions['ASC']) % 180
+            return min(horizon, 180 - horizon) / switch_rate
+
+    return find_orb_windows(separation, jd_start, jd_end, orb,
+                            _max_separation_rate(coefficients, asc_speed), step_limit)
+
+class YPEngine(TransitEngine):
+    """Yogi Point transits at one location (no natal data needed)."""
+    name = 'yp'
+    default_orb = DEFAULT_ORB
+    reports_open_runs = True
+
+    @instrumented_scan
+    def scan(self, start_date, end_date, include_open=False):
+        """Process Yogi Point transits between two dates with the event solver."""
+        if start_date is None or end_date is None:
+            raise ValueError("Both start_date and end_date must be provided")
+
+        # Ensure timezone-aware datetime objects
+        if start_date.tzinfo is None:
+            start_date = start_date.replace(tzinfo=ZoneInfo("UTC"))
+        if end_date.tzinfo is None:
+            end_date = end_date.replace(tzinfo=ZoneInfo("UTC"))
+
+        log_event(logger, logging.INFO, 'yp.scan', start=start_date, end=end_date)
+
+        swe.set_sid_mode(swe.SIDM_LAHIRI, 0, 0)
+        jd_start = swe.julday(start_date.year, start_date.month, start_date.day,
+                              start_date.hour + start_date.minute/60.0 + start_date.second/3600.0)
+        jd_end = jd_start + (end_date - start_date).total_seconds() / 86400.0
+
+        grid = get_grid(jd_start, jd_end)
+
+        def to_datetime(jd):
+            return start_date + timedelta(days=jd - jd_start)
+
+        all_transits = []
+        open_runs = []
+        for index, (transit_code, description, coefficients, offset) in enumerate(SOLVER_CONFIGS):
+            windows = solve_config(jd_start, jd_end, coefficients, offset,
+                                   orb=self.orb, grid=grid, location=self.location)
+            for jd_in, jd_out, orb in windows:
+                # Like the scan, transits still active at the end of the period are dropped
+                if jd_out is None:
+                    if include_open:
+                        open_runs.append({'transit_code': transit_code, 'start': to_datetime(jd_in),
+                                          'end': None, 'open': True})
+                    continue
+                all_transits.append((jd_out, index, {
+                    'start': to_datetime(jd_in),
+                    'end': to_datetime(jd_out),
+                    'type': description,
+                    'transit_code': transit_code,
+                    'orb': orb
+                }))
+
+        all_transits.sort(key=lambda item: item[:2])
+        return [transit for _, _, transit in all_transits] + open_runs
+
+def process_transits(start_date=None, end_date=None):
+    """Process Yogi Point transits between two dates using the module settings."""
+    return YPEngine(location=TRANSIT_LOCATION, orb=ORB).scan(start_date, end_date)
+
 def export_transits(transits):
     """Export transits in standardized format."""
     export_folder = os.environ.get('EXPORT_FOLDER')
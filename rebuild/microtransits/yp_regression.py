@@ -0,0 +1,134 @@
+"""
+Yogi Point regression harness.
+
+Compares the event solver (yp.YPEngine.scan) against the legacy
+minute-by-minute scan (yp.scan_transits) and reports unmatched windows,
+edge differences and ephemeris call counts.
+
+Usage (from the rebuild directory):
+    python -m microtransits.yp_regression --start 2025-01-01 --days 365
+"""
+import argparse
+import contextlib
+import io
+import sys
+import time
+from datetime import datetime, timedelta
+
+import swisseph as swe
+
+import microtransits.yp as yp
+
+
+class EphemerisCallCounter:
+    """Counts calls to the named Swiss Ephemeris functions (calc_ut and houses by default) while active."""
+
+    def __init__(self, names=('calc_ut', 'houses')):
+        self.calls = 0
+        self.names = names
+        self._originals = {}
+
+    def _wrap(self, func):
+        def counted(*args, **kwargs):
+            self.calls += 1
+            return func(*args, **kwargs)
+        return counted
+
+    def __enter__(self):
+        for name in self.names:
+            self._originals[name] = getattr(swe, name)
+            setattr(swe, name, self._wrap(self._originals[name]))
+        return self
+
+    def __exit__(self, *exc):
+        for name, func in self._originals.items():
+            setattr(swe, name, func)
+
+
+def run_engine(func, start_date, end_date):
+    """Run one engine quietly, returning (transits, seconds, ephemeris calls)."""
+    with EphemerisCallCounter() as counter, contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        transits = func(start_date, end_date)
+        elapsed = time.perf_counter() - started
+    return transits, elapsed, counter.calls
+
+
+def match_transits(expected, actual, tolerance):
+    """Pair windows with the same transit code whose edges agree within tolerance."""
+    matched, missing = [], []
+    remaining = {}
+    for transit in actual:
+        remaining.setdefault(transit['transit_code'], []).append(transit)
+
+    for transit in expected:
+        candidates = remaining.get(transit['transit_code'], [])
+        best = None
+        for candidate in candidates:
+            start_diff = abs((candidate['start'] - transit['start']).total_seconds())
+            end_diff = abs((candidate['end'] - transit['end']).total_seconds())
+            if start_diff <= tolerance and end_diff <= tolerance:
+                if best is None or start_diff + end_diff < best[0]:
+                    best = (start_diff + end_diff, candidate, start_diff, end_diff)
+        if best is None:
+            missing.append(transit)
+        else:
+            candidates.remove(best[1])
+            matched.append((transit, best[1], best[2], best[3]))
+
+    extra = [t for candidates in remaining.values() for t in candidates]
+    return matched, missing, extra
+
+
+def compare(start_date, end_date, tolerance=60.0, location=yp.TRANSIT_LOCATION):
+    """Run both engines over the period and print a regression report."""
+    engine = yp.YPEngine(location=location)
+    scan, scan_time, scan_calls = run_engine(
+        lambda start, end: yp.scan_transits(start, end, engine.location, engine.orb),
+        start_date, end_date)
+    solved, solve_time, solve_calls = run_engine(engine.scan, start_date, end_date)
+    matched, missing, extra = match_transits(scan, solved, tolerance)
+
+    print(f"Period: {start_date:%Y-%m-%d %H:%M} to {end_date:%Y-%m-%d %H:%M}")
+    print(f"Location: {engine.location}  Orb: {engine.orb}°  Tolerance: {tolerance:.0f}s")
+    print(f"Scan:   {len(scan):5d} transits  {scan_time:8.2f}s  {scan_calls:9d} ephemeris calls")
+    print(f"Solver: {len(solved):5d} transits  {solve_time:8.2f}s  {solve_calls:9d} ephemeris calls")
+    if solve_calls:
+        print(f"Call reduction: {scan_calls / solve_calls:.1f}x")
+
+    if matched:
+        start_diffs = [m[2] for m in matched]
+        end_diffs = [m[3] for m in matched]
+        print(f"Matched: {len(matched)}  max |Δstart| {max(start_diffs):.1f}s  "
+              f"max |Δend| {max(end_diffs):.1f}s")
+
+    for label, transits in (('Missing from solver', missing), ('Extra in solver', extra)):
+        if transits:
+            print(f"{label}: {len(transits)}")
+            for t in transits:
+                print(f"  {t['transit_code']:<12} {t['start']} -> {t['end']}")
+
+    return not missing and not extra
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--start', default='2025-01-01', help='start date (YYYY-MM-DD)')
+    parser.add_argument('--days', type=int, default=365, help='number of days to compare')
+    parser.add_argument('--lat', type=float, default=yp.TRANSIT_LOCATION[0])
+    parser.add_argument('--lon', type=float, default=yp.TRANSIT_LOCATION[1])
+    parser.add_argument('--tolerance', type=float, default=60.0, help='edge tolerance in seconds')
+    args = parser.parse_args(argv)
+
+    start_date = datetime.fromisoformat(args.start)
+    end_date = start_date + timedelta(days=args.days)
+
+    swe.set_ephe_path()
+    try:
+        return 0 if compare(start_date, end_date, args.tolerance, (args.lat, args.lon)) else 1
+    finally:
+        swe.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
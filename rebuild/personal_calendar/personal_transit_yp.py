@@ -7,14 +7,35 @@ Calculates personalized daily transit scores based on birth chart including Yogi
 import sys
 import os
 import json
+import logging
 import calendar as std_calendar
 from datetime import date, datetime, timedelta
 from collections import defaultdict
+import numpy as np
 import swisseph as swe
 
+from core.instrumentation import log_event
+from core.natal_points import natal_chart
+
+logger = logging.getLogger(__name__)
+
 # Add drik-panchanga to path
 sys.path.insert(0, '../drik-panchanga')
 
+HOUSE_THEMES = {
+    1: "Self & Identity", 2: "Wealth & Values", 3: "Courage & Communication",
+    4: "Home & Inner Peace", 5: "Creativity & Children", 6: "Service & Health",
+    7: "Partnership & Others", 8: "Transformation & Research", 9: "Wisdom & Fortune",
+    10: "Career & Recognition", 11: "Gains & Friendships", 12: "Spirituality & Release"
+}
+
+
+def _aspect_penalties(diff, full_orb, mild_orb, full, mild):
+    """Binary degree-based penalties for angular separations (as check_*_aspect)."""
+    diff = np.where(diff > 180, 360 - diff, diff)
+    return np.where(diff <= full_orb, full, np.where(diff <= mild_orb, mild, 0.0))
+
+
 class EnhancedPersonalTransitCalculator:
     def __init__(self):
         self.weekdays = ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday"]
@@ -239,16 +260,12 @@ class EnhancedPersonalTransitCalculator:
             birth_jd = swe.julday(birth_datetime.year, birth_datetime.month, birth_datetime.day, 
                                  birth_datetime.hour + birth_datetime.minute/60.0 - timezone)
 
-            # Set ayanamsa
-            swe.set_sid_mode(swe.SIDM_LAHIRI)
-            ayanamsa = swe.get_ayanamsa_ut(birth_jd)
+            natal = natal_chart(birth_jd)
+            ayanamsa = natal.ayanamsa_ut()
 
             # Get Sun and Moon positions
-            sun_data = swe.calc_ut(birth_jd, swe.SUN)
-            moon_data = swe.calc_ut(birth_jd, swe.MOON)
-
-            sun_longitude = sun_data[0][0]
-            moon_longitude = moon_data[0][0]
+            sun_longitude = natal.longitude(swe.SUN)
+            moon_longitude = natal.longitude(swe.MOON)
 
             # Convert to sidereal
             sun_sidereal = (sun_longitude - ayanamsa) % 360
@@ -280,24 +297,21 @@ class EnhancedPersonalTransitCalculator:
             return None
 
     def calculate_birth_chart(self, birth_date, birth_time, latitude, longitude, timezone):
-        """Calculate natal chart positions including Yogi/Avayogi points"""
+        """Calculate natal chart positions including Yogi/Avayogi points (from the natal points cache)"""
         try:
             # Convert to UTC
             birth_datetime = datetime.combine(birth_date, birth_time)
             birth_jd = swe.julday(birth_datetime.year, birth_datetime.month, birth_datetime.day, 
                                  birth_datetime.hour + birth_datetime.minute/60.0 - timezone)
 
-            # Set ayanamsa
-            swe.set_sid_mode(swe.SIDM_LAHIRI)
-            ayanamsa = swe.get_ayanamsa_ut(birth_jd)
+            natal = natal_chart(birth_jd)
+            ayanamsa = natal.ayanamsa_ut()
 
-            # Calculate Lagna (Ascendant)
-            houses = swe.houses(birth_jd, latitude, longitude, b'P')  # Placidus houses
-            lagna_longitude = houses[1][0]  # Ascendant longitude
+            # Calculate Lagna (Placidus Ascendant)
+            lagna_longitude = natal.ascendant(latitude, longitude)
 
             # Calculate Moon position
-            moon_data = swe.calc_ut(birth_jd, swe.MOON)
-            moon_longitude = moon_data[0][0]
+            moon_longitude = natal.longitude(swe.MOON)
 
             # Calculate sidereal positions
             lagna_sidereal = (lagna_longitude - ayanamsa) % 360
@@ -389,6 +403,54 @@ class EnhancedPersonalTransitCalculator:
             print(f"Error calculating daily transits for {test_date}: {e}")
             return None
 
+    def calculate_transits_for_range(self, start_date, end_date):
+        """
+        calculate_daily_transits for every day from start_date to end_date:
+        noon positions are taken in one pass and signs, nakshatras, tithis
+        and aspect penalties are derived with array arithmetic.
+        """
+        days = (end_date - start_date).days + 1
+        if days <= 0:
+            return []
+        swe.set_sid_mode(swe.SIDM_LAHIRI)
+        jd = swe.julday(start_date.year, start_date.month, start_date.day, 12.0) + np.arange(days)
+
+        positions = np.empty((days, 5))
+        for i, day_jd in enumerate(jd.tolist()):
+            positions[i] = (
+                swe.get_ayanamsa_ut(day_jd),
+                swe.calc_ut(day_jd, swe.SUN)[0][0],
+                swe.calc_ut(day_jd, swe.MOON)[0][0],
+                swe.calc_ut(day_jd, swe.MARS)[0][0],
+                swe.calc_ut(day_jd, swe.SATURN)[0][0],
+            )
+        ayanamsa, sun, moon, mars, saturn = positions.T
+
+        moon_sidereal = (moon - ayanamsa) % 360
+        mars_sidereal = (mars - ayanamsa) % 360
+        saturn_sidereal = (saturn - ayanamsa) % 360
+        lunar_phase = (moon - sun) % 360
+
+        moon_sign = (moon_sidereal / 30).astype(int) + 1
+        tithi = np.minimum((lunar_phase / 12).astype(int) + 1, 15)
+        moon_nakshatra = np.minimum((moon_sidereal / (360 / 27)).astype(int) + 1, 27)
+        saturn_penalty = _aspect_penalties(np.abs(saturn_sidereal - moon_sidereal), 6, 9, -3.0, -1.5)
+        mars_penalty = _aspect_penalties(np.abs(mars_sidereal - moon_sidereal), 5, 8, -2.0, -1.0)
+
+        columns = zip(moon_sign.tolist(), moon_nakshatra.tolist(), tithi.tolist(),
+                      saturn_penalty.tolist(), mars_penalty.tolist(), jd.tolist(),
+                      moon.tolist(), lunar_phase.tolist())
+        return [{
+            'moon_sign': sign,
+            'moon_nakshatra': nakshatra,
+            'tithi': day_tithi,
+            'saturn_aspect_penalty': saturn_pen,
+            'mars_aspect_penalty': mars_pen,
+            'julian_day': day_jd,
+            'moon_longitude': moon_lon,
+            'lunar_phase': phase,
+        } for sign, nakshatra, day_tithi, saturn_pen, mars_pen, day_jd, moon_lon, phase in columns]
+
     def check_saturn_aspect(self, saturn_longitude, moon_longitude):
         """Check Saturn aspect to Moon with binary degree-based logic"""
         diff = abs(saturn_longitude - moon_longitude)
@@ -424,79 +486,20 @@ class EnhancedPersonalTransitCalculator:
         """Calculate personal transit score for a day with Yogi/Avayogi enhancement"""
         if not birth_chart or not daily_transits:
             return None
+        return self.score_personal_days(birth_chart, [daily_transits], scoring_mode)[0]
 
-        score = 0
-        factors = []
-        component_scores = {}
-
-        # 1. Moon House Score (from Lagna)
-        moon_house = self.calculate_moon_house_from_lagna(
-            birth_chart['lagna_sign'], 
-            daily_transits['moon_sign']
-        )
-        house_score = self.house_scores.get(moon_house, 0)
-        component_scores['house'] = house_score
-        
-        # Apply house score based on scoring mode
-        if scoring_mode == 'house_centric':
-            # In house-centric mode, house score has more weight
-            weighted_house_score = house_score * 1.5
-            score += weighted_house_score
-            factors.append(f"House {moon_house} (house-centric mode): {weighted_house_score:+.1f}")
-        else:
-            score += house_score
-
-        # 2. Yogi/Avayogi Nakshatra Analysis
-        yogi_avayogi_bonus = 0
-        yogi_message = ""
-
-        # Check if Moon is in personal Yogi nakshatra (reduced impact to prevent extreme swings)
-        if ('yogi_nakshatra_num' in birth_chart and 
-            daily_transits['moon_nakshatra'] == birth_chart['yogi_nakshatra_num']):
-            yogi_avayogi_bonus += 1  # Reduced from 2.0 to 1.0
-            yogi_message = f"Moon in your Yogi nakshatra ({birth_chart['yogi_nakshatra_name']}) - enhanced wisdom and flow available"
-            factors.append(f"Yogi nakshatra bonus: +1.0 - {yogi_message}")
-
-        # Check if Moon is in personal Avayogi nakshatra
-        elif ('avayogi_nakshatra_num' in birth_chart and 
-              daily_transits['moon_nakshatra'] == birth_chart['avayogi_nakshatra_num']):
-            yogi_avayogi_bonus -= 1  # Reduced from -2.0 to -1.0
-            yogi_message = f"Moon in your Avayogi nakshatra ({birth_chart['avayogi_nakshatra_name']}) - watch for over-efforting"
-            factors.append(f"Avayogi nakshatra: -1.0 - {yogi_message}")
-            
-        component_scores['yogi_avayogi'] = yogi_avayogi_bonus
-        score += yogi_avayogi_bonus
-
-        # Enhanced house awareness for ALL houses with Yogi context
-        awareness = self.house_awareness.get(moon_house, {})
-        base_msg = awareness.get('base_description', f'Moon in {moon_house}th house')
-
-        # Add Yogi/Avayogi enhancement to house message for all houses
-        if ('yogi_nakshatra_num' in birth_chart and 
-            daily_transits['moon_nakshatra'] == birth_chart['yogi_nakshatra_num']):
-            enhanced_msg = f"{base_msg} {awareness.get('yogi_enhancement', '')}"
-        elif ('avayogi_nakshatra_num' in birth_chart and 
-              daily_transits['moon_nakshatra'] == birth_chart['avayogi_nakshatra_num']):
-            enhanced_msg = f"{base_msg} {awareness.get('avayogi_enhancement', '')}"
-        else:
-            enhanced_msg = base_msg
-
-        factors.append(f"Moon in {moon_house}th house: {house_score:+.1f} - {enhanced_msg}")
-
-        # 3. Bulletproof Authentic Vedic Tithi Score
-        tithi = daily_transits['tithi']
+    def _tithi_entry(self, tithi):
+        """(score, type, name, factors) of a tithi"""
         tithi_name = self.tithi_names_full[tithi-1] if tithi <= 30 else f"Tithi {tithi}"
-        
-        # Get score from bulletproof mapping
         tithi_score = self.tithi_score_map.get(tithi, 0.0)  # Fallback to 0 if undefined
         tithi_type = self.tithi_type_map.get(tithi, "Unknown")
-        
+        factors = []
+
         # Failsafe test - catch unexpected +3.0 scores
         if tithi_score == 3.0 and tithi not in [5, 10, 15, 20, 25]:
             print(f"⚠️ WARNING: Unexpected +3.0 Tithi score on Tithi {tithi}")
             factors.append(f"⚠️ DEBUG: Tithi {tithi} got +3.0 unexpectedly")
-        
-        # Add appropriate factor message based on type
+
         if tithi == 30:
             factors.append(f"Amavasya - {tithi_name}: {tithi_score:+.1f} (spiritual introspection, avoid material starts)")
         elif tithi_type.startswith("Poorna"):
@@ -511,162 +514,194 @@ class EnhancedPersonalTransitCalculator:
             factors.append(f"Rikta tithi - {tithi_name}: {tithi_score:+.1f} (emptiness, avoid new starts, good for endings)")
         else:
             factors.append(f"Unknown tithi - {tithi_name}: {tithi_score:+.1f}")
-        
-        component_scores['tithi'] = tithi_score
-        component_scores['tithi_type'] = tithi_type
-        score += tithi_score
-        
+
         # Debug Tithi source data
         if tithi < 1 or tithi > 30:
             print(f"⚠️ WARNING: Invalid Tithi value: {tithi}")
             factors.append(f"⚠️ DEBUG: Invalid Tithi {tithi} detected")
+        return tithi_score, tithi_type, tithi_name, factors
 
-        # 4. Nakshatra Score (normalized to -3 to +3 scale)
-        nakshatra = daily_transits['moon_nakshatra']
-
-        # Check for natal nakshatra return
+    def _nakshatra_entry(self, birth_chart, nakshatra):
+        """(score, factor) of the Moon's nakshatra, normalized to the -3 to +3 scale"""
+        name = self.nakshatra_names[nakshatra-1]
         if nakshatra == birth_chart['moon_nakshatra']:
-            nakshatra_score = 3  # Maximum positive - natal return
-            factors.append(f"Natal nakshatra return ({self.nakshatra_names[nakshatra-1]}): +3.0")
-        elif nakshatra in self.excellent_nakshatras:
-            nakshatra_score = 2
-            factors.append(f"Excellent nakshatra ({self.nakshatra_names[nakshatra-1]}): +2.0")
-        elif nakshatra in self.good_nakshatras:
-            nakshatra_score = 1
-            factors.append(f"Good nakshatra ({self.nakshatra_names[nakshatra-1]}): +1.0")
-        elif nakshatra in self.challenging_nakshatras:
-            nakshatra_score = -3  # Maximum negative for challenging
-            factors.append(f"Challenging nakshatra ({self.nakshatra_names[nakshatra-1]}): -3.0")
-        else:
-            nakshatra_score = 0
-            factors.append(f"Neutral nakshatra ({self.nakshatra_names[nakshatra-1]}): 0.0")
-        
-        component_scores['nakshatra'] = nakshatra_score
-        score += nakshatra_score
-
-        # Optional: Moon dignity modifier for subtle variation
-        dignity_bonus = 0
-        moon_sign_num = daily_transits['moon_sign']
-        
-        # Moon dignity: exaltation, own sign, debilitation
+            return 3, f"Natal nakshatra return ({name}): +3.0"  # Maximum positive - natal return
+        if nakshatra in self.excellent_nakshatras:
+            return 2, f"Excellent nakshatra ({name}): +2.0"
+        if nakshatra in self.good_nakshatras:
+            return 1, f"Good nakshatra ({name}): +1.0"
+        if nakshatra in self.challenging_nakshatras:
+            return -3, f"Challenging nakshatra ({name}): -3.0"  # Maximum negative for challenging
+        return 0, f"Neutral nakshatra ({name}): 0.0"
+
+    @staticmethod
+    def _moon_dignity(moon_sign_num):
+        """Moon dignity modifier: exaltation, own sign, debilitation"""
         if moon_sign_num == 2:  # Taurus - Moon exalted
-            dignity_bonus = 0.5
-            factors.append("Moon exalted (Taurus): +0.5")
-        elif moon_sign_num == 4:  # Cancer - Moon own sign
-            dignity_bonus = 0.3
-            factors.append("Moon in own sign (Cancer): +0.3")
-        elif moon_sign_num == 8:  # Scorpio - Moon debilitated
-            dignity_bonus = -0.5
-            factors.append("Moon debilitated (Scorpio): -0.5")
-        
-        component_scores['moon_dignity'] = dignity_bonus
-        score += dignity_bonus
-
-        # 5. Simplified Binary Aspect Logic (Saturn and Mars only)
-        saturn_penalty = daily_transits.get('saturn_aspect_penalty', 0)
-        mars_penalty = daily_transits.get('mars_aspect_penalty', 0)
-        total_aspect_penalty = saturn_penalty + mars_penalty
-        
-        # Add factor explanations
-        if saturn_penalty < 0:
-            factors.append(f"Saturn aspect to Moon: {saturn_penalty:+.1f}")
-        if mars_penalty < 0:
-            factors.append(f"Mars aspect to Moon: {mars_penalty:+.1f}")
-        if saturn_penalty == 0 and mars_penalty == 0:
-            factors.append("No malefic aspects to Moon: 0.0")
-        
-        component_scores['aspects'] = total_aspect_penalty
-        score += total_aspect_penalty
-
-        # Determine quality with tightened thresholds (reduce neutral zone)
-        awareness_day = moon_house in [6, 12]  # Track awareness houses (removed 8th house - should be caution)
-        
-        if awareness_day:  # Houses of awareness
-            quality = "aware"
-        elif score >= 6:  # Tightened: was 7 - more days get "power"
-            quality = "power"
-        elif score >= 2:  # Tightened: was 3 - more days get "supportive"  
-            quality = "supportive"
-        elif score > -1:  # Changed >= to > so 8th house (-1.0) becomes "avoid" (caution)
-            quality = "neutral"
-        else:
-            quality = "avoid"
-
-        # Generate subject line based on house awareness or quality
-        subject_line = None
-        if moon_house in [6, 12]:  # Removed 8th house - it's now caution, not awareness
-            subject_line = self.house_awareness.get(moon_house, {}).get('subject', f"Personal - {moon_house}th house")
-        elif quality in ['power', 'supportive']:
-            subject_line = "Personal - good"
-
-        # Generate detailed score breakdown for transparency
-        score_breakdown = {
-            'house_score': component_scores.get('house', 0),
-            'house_component': f"House {moon_house}: {component_scores.get('house', 0):+.1f}",
-            'nakshatra_score': component_scores.get('nakshatra', 0),
-            'nakshatra_component': f"Nakshatra: {component_scores.get('nakshatra', 0):+.1f}",
-            'tithi_score': component_scores.get('tithi', 0),
-            'tithi_component': f"Tithi: {component_scores.get('tithi', 0):+.1f}",
-            'tithi_type': component_scores.get('tithi_type', 'Unknown'),
-            'tithi_name': tithi_name,
-            'aspect_score': component_scores.get('aspects', 0),
-            'aspect_component': f"Aspects: {component_scores.get('aspects', 0):+.1f}",
-            'yogi_score': component_scores.get('yogi_avayogi', 0),
-            'yogi_component': f"Yogi/Avayogi: {component_scores.get('yogi_avayogi', 0):+.1f}",
-            'moon_dignity_score': component_scores.get('moon_dignity', 0),
-            'moon_dignity_component': f"Moon Dignity: {component_scores.get('moon_dignity', 0):+.1f}",
-            'total_score': score,
-            'scoring_mode': scoring_mode,
-            'awareness_day': awareness_day
-        }
-
-        # House of the Day - positive messaging even on challenging days
-        house_theme = {
-            1: "Self & Identity", 2: "Wealth & Values", 3: "Courage & Communication",
-            4: "Home & Inner Peace", 5: "Creativity & Children", 6: "Service & Health",
-            7: "Partnership & Others", 8: "Transformation & Research", 9: "Wisdom & Fortune",
-            10: "Career & Recognition", 11: "Gains & Friendships", 12: "Spirituality & Release"
-        }
-        
-        house_of_day = {
-            'house_number': moon_house,
-            'house_theme': house_theme.get(moon_house, f"{moon_house}th house"),
-            'house_message': self.house_awareness.get(moon_house, {}).get('base_description', f'Moon transiting {moon_house}th house'),
-            'positive_potential': self.house_themes_detailed.get(moon_house, f"Focus on {moon_house}th house matters today")
-        }
+            return 0.5, "Moon exalted (Taurus): +0.5"
+        if moon_sign_num == 4:  # Cancer - Moon own sign
+            return 0.3, "Moon in own sign (Cancer): +0.3"
+        if moon_sign_num == 8:  # Scorpio - Moon debilitated
+            return -0.5, "Moon debilitated (Scorpio): -0.5"
+        return 0, None
+
+    def score_personal_days(self, birth_chart, transits, scoring_mode='composite'):
+        """
+        score_personal_day for a list of daily transits. Component scores are
+        looked up per distinct house, tithi, nakshatra and sign, and totals
+        and qualities are computed for all days at once.
+        """
+        house_centric = scoring_mode == 'house_centric'
+        yogi_num = birth_chart.get('yogi_nakshatra_num')
+        avayogi_num = birth_chart.get('avayogi_nakshatra_num')
+        tithi_entries, nakshatra_entries = {}, {}
+
+        rows = []
+        for daily_transits in transits:
+            moon_house = self.calculate_moon_house_from_lagna(birth_chart['lagna_sign'], daily_transits['moon_sign'])
+            nakshatra = daily_transits['moon_nakshatra']
+            tithi = daily_transits['tithi']
+            if tithi not in tithi_entries:
+                tithi_entries[tithi] = self._tithi_entry(tithi)
+            if nakshatra not in nakshatra_entries:
+                nakshatra_entries[nakshatra] = self._nakshatra_entry(birth_chart, nakshatra)
+            house_score = self.house_scores.get(moon_house, 0)
+            # Yogi/Avayogi Nakshatra Analysis (reduced impact to prevent extreme swings)
+            if 'yogi_nakshatra_num' in birth_chart and nakshatra == yogi_num:
+                yogi = 1
+            elif 'avayogi_nakshatra_num' in birth_chart and nakshatra == avayogi_num:
+                yogi = -1
+            else:
+                yogi = 0
+            saturn_penalty = daily_transits.get('saturn_aspect_penalty', 0)
+            mars_penalty = daily_transits.get('mars_aspect_penalty', 0)
+            rows.append((moon_house, house_score, yogi, tithi, nakshatra,
+                         self._moon_dignity(daily_transits['moon_sign']), saturn_penalty, mars_penalty))
+        if not rows:
+            return []
+
+        # Totals in score_personal_day's order of addition
+        houses = np.array([r[0] for r in rows])
+        house_part = np.array([r[1] for r in rows], dtype=float)
+        if house_centric:
+            house_part = house_part * 1.5
+        aspects = np.array([r[6] for r in rows], dtype=float) + np.array([r[7] for r in rows], dtype=float)
+        scores = (house_part
+                  + np.array([r[2] for r in rows], dtype=float)
+                  + np.array([tithi_entries[r[3]][0] for r in rows], dtype=float)
+                  + np.array([nakshatra_entries[r[4]][0] for r in rows], dtype=float)
+                  + np.array([r[5][0] for r in rows], dtype=float)
+                  + aspects)
+        awareness_days = np.isin(houses, (6, 12))  # Houses of awareness
+        qualities = np.select(
+            [awareness_days, scores >= 6, scores >= 2, scores > -1],
+            ["aware", "power", "supportive", "neutral"],
+            "avoid",
+        )
 
-        return {
-            'score': score,
-            'quality': quality,
-            'factors': factors,
-            'score_breakdown': score_breakdown,
-            'moon_house': moon_house,
-            'house_of_day': house_of_day,
-            'transits': daily_transits,
-            'subject_line': subject_line,
-            'awareness_message': self.house_awareness.get(moon_house, {}).get('base_description', None),
-            'yogi_enhancement': yogi_message
-        }
+        results = []
+        for row, daily_transits, score, quality, awareness_day, aspect_score in zip(
+                rows, transits, scores.tolist(), qualities.tolist(), awareness_days.tolist(), aspects.tolist()):
+            moon_house, house_score, yogi, tithi, nakshatra, (dignity_bonus, dignity_factor), saturn_penalty, mars_penalty = row
+            tithi_score, tithi_type, tithi_name, tithi_factors = tithi_entries[tithi]
+            nakshatra_score, nakshatra_factor = nakshatra_entries[nakshatra]
+            awareness = self.house_awareness.get(moon_house, {})
+            base_msg = awareness.get('base_description', f'Moon in {moon_house}th house')
+
+            factors = []
+            if house_centric:
+                factors.append(f"House {moon_house} (house-centric mode): {house_score * 1.5:+.1f}")
+            yogi_message = ""
+            if yogi > 0:
+                yogi_message = f"Moon in your Yogi nakshatra ({birth_chart['yogi_nakshatra_name']}) - enhanced wisdom and flow available"
+                factors.append(f"Yogi nakshatra bonus: +1.0 - {yogi_message}")
+                enhanced_msg = f"{base_msg} {awareness.get('yogi_enhancement', '')}"
+            elif yogi < 0:
+                yogi_message = f"Moon in your Avayogi nakshatra ({birth_chart['avayogi_nakshatra_name']}) - watch for over-efforting"
+                factors.append(f"Avayogi nakshatra: -1.0 - {yogi_message}")
+                enhanced_msg = f"{base_msg} {awareness.get('avayogi_enhancement', '')}"
+            else:
+                enhanced_msg = base_msg
+            factors.append(f"Moon in {moon_house}th house: {house_score:+.1f} - {enhanced_msg}")
+            factors.extend(tithi_factors)
+            factors.append(nakshatra_factor)
+            if dignity_factor:
+                factors.append(dignity_factor)
+            # Simplified Binary Aspect Logic (Saturn and Mars only)
+            if saturn_penalty < 0:
+                factors.append(f"Saturn aspect to Moon: {saturn_penalty:+.1f}")
+            if mars_penalty < 0:
+                factors.append(f"Mars aspect to Moon: {mars_penalty:+.1f}")
+            if saturn_penalty == 0 and mars_penalty == 0:
+                factors.append("No malefic aspects to Moon: 0.0")
+
+            # Subject line based on house awareness or quality
+            subject_line = None
+            if moon_house in [6, 12]:
+                subject_line = awareness.get('subject', f"Personal - {moon_house}th house")
+            elif quality in ['power', 'supportive']:
+                subject_line = "Personal - good"
+
+            results.append({
+                'score': score,
+                'quality': quality,
+                'factors': factors,
+                'score_breakdown': {
+                    'house_score': house_score,
+                    'house_component': f"House {moon_house}: {house_score:+.1f}",
+                    'nakshatra_score': nakshatra_score,
+                    'nakshatra_component': f"Nakshatra: {nakshatra_score:+.1f}",
+                    'tithi_score': tithi_score,
+                    'tithi_component': f"Tithi: {tithi_score:+.1f}",
+                    'tithi_type': tithi_type,
+                    'tithi_name': tithi_name,
+                    'aspect_score': aspect_score,
+                    'aspect_component': f"Aspects: {aspect_score:+.1f}",
+                    'yogi_score': yogi,
+                    'yogi_component': f"Yogi/Avayogi: {yogi:+.1f}",
+                    'moon_dignity_score': dignity_bonus,
+                    'moon_dignity_component': f"Moon Dignity: {dignity_bonus:+.1f}",
+                    'total_score': score,
+                    'scoring_mode': scoring_mode,
+                    'awareness_day': awareness_day
+                },
+                'moon_house': moon_house,
+                # House of the Day - positive messaging even on challenging days
+                'house_of_day': {
+                    'house_number': moon_house,
+                    'house_theme': HOUSE_THEMES.get(moon_house, f"{moon_house}th house"),
+                    'house_message': awareness.get('base_description', f'Moon transiting {moon_house}th house'),
+                    'positive_potential': self.house_themes_detailed.get(moon_house, f"Focus on {moon_house}th house matters today")
+                },
+                'transits': daily_transits,
+                'subject_line': subject_line,
+                'awareness_message': awareness.get('base_description', None),
+                'yogi_enhancement': yogi_message
+            })
+        return results
 
     def generate_personal_calendar(self, birth_chart, start_date, end_date, latitude, longitude, timezone, scoring_mode='composite'):
         """Generate personal transit calendar for date range"""
-        print(f"Generating enhanced personal transit calendar from {start_date} to {end_date} (Mode: {scoring_mode})")
-
-        calendar_data = {}
-        current_date = start_date
+        log_event(logger, logging.INFO, 'personal.calendar', start=start_date, end=end_date, mode=scoring_mode)
 
-        while current_date <= end_date:
-            daily_transits = self.calculate_daily_transits(current_date, latitude, longitude, timezone)
-            personal_score = self.score_personal_day(birth_chart, daily_transits, scoring_mode=scoring_mode)
+        try:
+            transits = self.calculate_transits_for_range(start_date, end_date)
+        except Exception as e:
+            print(f"Error calculating transits from {start_date} to {end_date}: {e}")
+            transits = [self.calculate_daily_transits(start_date + timedelta(days=i), latitude, longitude, timezone)
+                        for i in range((end_date - start_date).days + 1)]
 
+        scores = iter(self.score_personal_days(birth_chart, [t for t in transits if t], scoring_mode)
+                      if birth_chart else [])
+        calendar_data = {}
+        for i, daily_transits in enumerate(transits):
+            current_date = start_date + timedelta(days=i)
             calendar_data[current_date.isoformat()] = {
                 'date': current_date,
                 'weekday': current_date.strftime('%A'),
-                'personal_score': personal_score
+                'personal_score': next(scores) if birth_chart and daily_transits else None
             }
 
-            current_date += timedelta(days=1)
-
         return calendar_data
 
     def print_personal_calendar(self, calendar_data, birth_chart):
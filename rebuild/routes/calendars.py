@@ -15,6 +15,7 @@ from helpers.utils import (
     apply_double_go_to_combined_results
 )
 from helpers.dashboard import generate_dashboard_core, normalize_for_ui
+from helpers.jobs import enqueue_job, get_job, remember_job, can_view_job, session_context
 
 calendars_bp = Blueprint('calendars', __name__)
 
@@ -325,8 +326,9 @@ def generate_dashboard_calendar():
         data = request.get_json(silent=True) or {}
         user_info = session.get('user_info', {})
         user_id = user_info.get('email') or None
-        results = generate_dashboard_core(data, user_id=user_id)
-        return jsonify(results), 200
+        job_id = enqueue_job('dashboard', data, subject=user_id, context=session_context())
+        remember_job(job_id)
+        return jsonify({'status': 'queued', 'job_id': job_id}), 202
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -369,18 +371,28 @@ def generate_all_calendars():
             _, _, auto_days = get_two_month_range()
             profile_payload['days'] = auto_days
 
-        core_result = generate_dashboard_core(profile_payload, user_id=user_id)
-
-        if core_result and not core_result.get('error'):
-            return jsonify({'status': 'success', 'message': 'Calendars generated successfully'})
-        else:
-            return jsonify({'status': 'error', 'error': core_result.get('error', 'Generation failed')})
+        job_id = enqueue_job('calendars', profile_payload, subject=user_id, context=session_context())
+        remember_job(job_id)
+        return jsonify({'status': 'queued', 'job_id': job_id, 'message': 'Calendar generation queued'}), 202
 
     except Exception as e:
         traceback.print_exc()
         return jsonify({'status': 'error', 'error': str(e)}), 500
 
 
+@calendars_bp.route('/api/jobs/<int:job_id>', methods=['GET'])
+def get_generation_job(job_id):
+    """Status and progress of a generation job started from this session"""
+    if not can_view_job(job_id):
+        return jsonify({'error': 'Job not found'}), 404
+    job = get_job(job_id, include_result=True)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    if job['status'] != 'done':
+        job.pop('result', None)
+    return jsonify(job)
+
+
 @calendars_bp.route('/get-saved-calendar', methods=['GET'])
 def get_saved_calendar():
     """Retrieve saved calendar data for authenticated user"""
@@ -1,24 +1,19 @@
 import csv
-import json
 import io
 import traceback
 from flask import Blueprint, request, jsonify, session, Response
 from datetime import datetime, date, timedelta
 from urllib.parse import quote
-from database.models import db, Client, CalendarData, SubscriptionToken
+from database.models import db, Client, CalendarData, CalendarSection, SubscriptionToken
 from database.manager import db_manager
-from helpers.dashboard import generate_dashboard_core
+from helpers.client_batch import client_payload
+from helpers.jobs import enqueue_job, remember_job, session_context, PRIORITY_BULK
+from helpers.microbird import background_dates, get_microbird_events, subject_transits
 from helpers.utils import make_json_serializable, normalize_dashboard_data
 
 clients_bp = Blueprint('clients', __name__)
 
 
-def _serialize_for_cache(obj):
-    if isinstance(obj, (datetime, date)):
-        return obj.isoformat()
-    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
-
-
 def _get_owner_email():
     user_info = session.get('user_info', {})
     return user_info.get('email')
@@ -29,6 +24,26 @@ def _require_admin():
     return user_info.get('is_admin', False)
 
 
+def _client_micro_bird_events(client_user_id, saved_data, force=False):
+    """The client's MicroBird events within the top three bird periods of each day."""
+    events = []
+    for mb in get_microbird_events(client_user_id, saved_data, force=force):
+        if mb['period_rank'] is not None and mb['period_rank'] >= 3:
+            continue
+        events.append({
+            'date': mb['date'],
+            'start': mb['start'].strftime('%H:%M'),
+            'end': mb['end'].strftime('%H:%M'),
+            'duration': mb['duration_minutes'],
+            'transit_type': mb['transit_source'],
+            'transit_name': mb['transit_name'],
+            'bird_tier': mb['bird_tier'],
+            'bird': mb['bird'],
+            'activity': mb['activity'],
+        })
+    return events
+
+
 @clients_bp.route('/api/clients', methods=['GET'])
 def list_clients():
     if not session.get('authenticated'):
@@ -233,6 +248,7 @@ def delete_client(client_id):
             return jsonify({"status": "error", "message": "Forbidden"}), 403
 
         CalendarData.query.filter_by(user_email=f"client_{client_id}").delete()
+        CalendarSection.query.filter_by(user_email=f"client_{client_id}").delete()
         db.session.delete(client)
         db.session.commit()
 
@@ -243,6 +259,34 @@ def delete_client(client_id):
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@clients_bp.route('/api/clients/generate-all', methods=['POST'])
+def generate_all_client_calendars():
+    if not session.get('authenticated'):
+        return jsonify({"status": "error", "message": "Not authenticated"}), 401
+    if not _require_admin():
+        return jsonify({"status": "error", "message": "Admin access required"}), 403
+
+    try:
+        owner_email = _get_owner_email()
+        total = Client.query.filter_by(owner_email=owner_email).count()
+        if not total:
+            return jsonify({"status": "error", "message": "No clients to generate"}), 404
+
+        job_id = enqueue_job('clients_bulk', {}, subject=owner_email, priority=PRIORITY_BULK,
+                             context=session_context())
+        remember_job(job_id)
+
+        return jsonify({
+            "status": "queued",
+            "job_id": job_id,
+            "clients": total,
+        }), 202
+
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
 @clients_bp.route('/api/clients/<int:client_id>/generate', methods=['POST'])
 def generate_client_calendar(client_id):
     if not session.get('authenticated'):
@@ -263,56 +307,21 @@ def generate_client_calendar(client_id):
         if not client.birth_date or not client.birth_time:
             return jsonify({"status": "error", "message": "Client needs birth date and time before generating"}), 400
 
-        client.calendar_status = 'generating'
-        db.session.commit()
-
         client_user_id = f"client_{client_id}"
 
-        profile_payload = {
-            'birth_date': client.birth_date.isoformat(),
-            'birth_time': client.birth_time.isoformat(),
-            'birth_latitude': client.birth_latitude or 0,
-            'birth_longitude': client.birth_longitude or 0,
-            'latitude': client.current_latitude or client.birth_latitude or 0,
-            'longitude': client.current_longitude or client.birth_longitude or 0,
-            'location': client.current_location_name or client.birth_location_name or '',
-            'timezone_offset': client.birth_timezone or -5.0,
-            'days': client.calendar_range_days or 60,
-            'force_regenerate': True,
-        }
-
-        results = generate_dashboard_core(profile_payload, user_id=client_user_id)
-
-        client.calendar_status = 'ready'
-        client.last_generated_at = datetime.utcnow()
-        db.session.commit()
-
-        summary = {}
-        calendars = (results or {}).get('calendars', {})
-        for cal_name, cal_data in calendars.items():
-            if isinstance(cal_data, dict):
-                if cal_data.get('error'):
-                    summary[cal_name] = {'status': 'error', 'error': str(cal_data['error'])}
-                elif cal_data.get('generated') or cal_data.get('results') or cal_data.get('daily_results'):
-                    summary[cal_name] = {'status': 'ready'}
-                else:
-                    summary[cal_name] = {'status': 'partial'}
+        job_id = enqueue_job('client', client_payload(client), subject=client_user_id, client_id=client_id,
+                             context=session_context())
+        remember_job(job_id)
 
         return jsonify({
-            "status": "success",
+            "status": "queued",
             "client_id": client_id,
-            "calendar_summary": summary,
-            "generated_at": client.last_generated_at.isoformat(),
-        })
+            "job_id": job_id,
+            "calendar_status": client.calendar_status,
+        }), 202
 
     except Exception as e:
-        try:
-            client = Client.query.get(client_id)
-            if client:
-                client.calendar_status = 'error'
-                db.session.commit()
-        except Exception:
-            db.session.rollback()
+        db.session.rollback()
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
@@ -395,7 +404,7 @@ def get_client_calendar(client_id):
                             'activity': p.get('activity', ''),
                         })
 
-        micro_bird_events = saved_data.get('cached_microtransits', {}).get('micro_bird_events', [])
+        micro_bird_events = _client_micro_bird_events(client_user_id, saved_data)
 
         return jsonify({
             "status": "success",
@@ -435,192 +444,28 @@ def get_client_microtransits(client_id):
         if not saved_data:
             return jsonify({"status": "error", "message": "No calendar data. Generate first."}), 404
 
-        today_str = date.today().isoformat()
-        cache = saved_data.get('cached_microtransits', {})
         force = request.args.get('force') == '1'
-
-        if not force and cache.get('date') == today_str and cache.get('yp_transits') is not None:
-            return jsonify({
-                "status": "success",
-                "yp_transits": cache['yp_transits'],
-                "pof_transits": cache['pof_transits'],
-                "micro_bird_events": cache['micro_bird_events'],
-                "cached": True,
-            })
-
-        calendars = saved_data.get('calendars', {})
-        combined = calendars.get('combined', {})
-        combined_results = combined.get('results', [])
-
-        background_days = []
-        for day in combined_results:
-            classification = day.get('classification', '').upper()
-            if classification in ('OMNI', 'DOUBLE GO', 'DOUBLE_GO', 'GOOD'):
-                background_days.append(day.get('date', ''))
-
-        bird_batch = calendars.get('bird_batch', {})
-        bird_periods = []
-        if isinstance(bird_batch, dict) and not bird_batch.get('error'):
-            for day_data in (bird_batch.get('daily_results') or bird_batch.get('results') or []):
-                day_date = day_data.get('date', '')
-                if day_date in background_days:
-                    periods = day_data.get('top_periods', day_data.get('periods', []))
-                    for p in periods[:3]:
-                        bird_periods.append({
-                            'date': day_date,
-                            'start': p.get('start_time', p.get('start', '')),
-                            'end': p.get('end_time', p.get('end', '')),
-                            'tier': p.get('tier', p.get('combination', '')),
-                            'bird': p.get('bird', ''),
-                            'activity': p.get('activity', ''),
-                        })
-
-        yp_transits = []
-        pof_transits = []
-        micro_bird_events = []
-        bg_set = set(background_days)
-
-        period = saved_data.get('period', {})
-        try:
-            days_span = int(period.get('days', 60))
-        except (ValueError, TypeError):
-            days_span = 60
-
-        start_dt = datetime.combine(date.today(), datetime.min.time())
-        end_dt = datetime.combine(date.today() + timedelta(days=days_span), datetime.min.time())
-
-        def _extract_date_part(ds):
-            if not ds:
-                return None
-            ds = str(ds)
-            if 'T' in ds:
-                return ds.split('T')[0]
-            if ' ' in ds:
-                return ds.split(' ')[0]
-            return ds
+        bg_set = background_dates(saved_data)
 
         def _serialize_transit(t, source):
-            t_start = t.get('start')
-            t_end = t.get('end')
             return {
-                'date': _extract_date_part(str(t_start)) if t_start else '',
-                'start': t_start.strftime('%H:%M') if hasattr(t_start, 'strftime') else str(t_start),
-                'end': t_end.strftime('%H:%M') if hasattr(t_end, 'strftime') else str(t_end),
+                'date': t['start'].strftime('%Y-%m-%d'),
+                'start': t['start'].strftime('%H:%M'),
+                'end': t['end'].strftime('%H:%M'),
                 'type': t.get('type', t.get('description', '')),
                 'transit_code': t.get('transit_code', ''),
                 'source': source,
             }
 
-        try:
-            from microtransits.yp import process_transits as yp_process
-            import microtransits.yp as yp_module
-            if client.current_latitude and client.current_longitude:
-                yp_module.TRANSIT_LOCATION = (float(client.current_latitude), float(client.current_longitude))
-            elif client.birth_latitude and client.birth_longitude:
-                yp_module.TRANSIT_LOCATION = (float(client.birth_latitude), float(client.birth_longitude))
-            raw_yp = yp_process(start_dt, end_dt)
-            for t in raw_yp:
-                t_date = _extract_date_part(str(t.get('start', '')))
-                if t_date and t_date in bg_set:
-                    yp_transits.append(_serialize_transit(t, 'YP'))
-        except Exception as yp_err:
-            print(f"YP calculation error for client {client_id}: {yp_err}")
-            traceback.print_exc()
-
-        try:
-            import microtransits.wb1 as wb1_module
-            if client.birth_date and client.birth_time:
-                birth_dt = datetime.combine(client.birth_date, client.birth_time)
-                wb1_module.BIRTH_DATE = birth_dt
-                if client.current_latitude and client.current_longitude:
-                    wb1_module.TRANSIT_LOCATION = (float(client.current_latitude), float(client.current_longitude))
-                elif client.birth_latitude and client.birth_longitude:
-                    wb1_module.TRANSIT_LOCATION = (float(client.birth_latitude), float(client.birth_longitude))
-                raw_pof = wb1_module.process_transits(start_dt, end_dt)
-                for t in raw_pof:
-                    t_date = _extract_date_part(str(t.get('start', '')))
-                    if t_date and t_date in bg_set:
-                        pof_transits.append(_serialize_transit(t, 'PoF'))
-        except Exception as pof_err:
-            print(f"PoF calculation error for client {client_id}: {pof_err}")
-            traceback.print_exc()
-
-        wb3_transits = []
-        try:
-            import microtransits.wb3 as wb3_module
-            if client.birth_date and client.birth_time:
-                birth_dt = datetime.combine(client.birth_date, client.birth_time)
-                wb3_module.BIRTH_DATE = birth_dt
-                if client.current_latitude and client.current_longitude:
-                    wb3_module.TRANSIT_LOCATION = (float(client.current_latitude), float(client.current_longitude))
-                elif client.birth_latitude and client.birth_longitude:
-                    wb3_module.TRANSIT_LOCATION = (float(client.birth_latitude), float(client.birth_longitude))
-                raw_wb3 = wb3_module.process_transits(start_dt, end_dt)
-                for t in raw_wb3:
-                    t_date = _extract_date_part(str(t.get('start', '')))
-                    if t_date and t_date in bg_set:
-                        wb3_transits.append(_serialize_transit(t, 'WB3'))
-        except Exception as wb3_err:
-            print(f"WB3 calculation error for client {client_id}: {wb3_err}")
-            traceback.print_exc()
-
-        def _parse_time(ts):
-            ts = str(ts).strip()
-            if 'T' in ts:
-                ts = ts.split('T')[1]
-            ts = ts.split('+')[0].split('Z')[0]
-            for fmt in ('%H:%M', '%H:%M:%S', '%H:%M:%S.%f'):
-                try:
-                    return datetime.strptime(ts, fmt)
-                except ValueError:
-                    continue
-            return None
-
-        all_microtransits = yp_transits + pof_transits + wb3_transits
-        for mt in all_microtransits:
-            mt_date = mt['date']
-            for bp in bird_periods:
-                if bp['date'] != mt_date:
-                    continue
-                try:
-                    mt_start = _parse_time(mt['start'])
-                    mt_end = _parse_time(mt['end'])
-                    bp_start = _parse_time(bp['start'])
-                    bp_end = _parse_time(bp['end'])
-                    if not all([mt_start, mt_end, bp_start, bp_end]):
-                        continue
-                    overlap_start = max(mt_start, bp_start)
-                    overlap_end = min(mt_end, bp_end)
-                    if overlap_start < overlap_end:
-                        duration = int((overlap_end - overlap_start).total_seconds() / 60)
-                        micro_bird_events.append({
-                            'date': mt_date,
-                            'start': overlap_start.strftime('%H:%M'),
-                            'end': overlap_end.strftime('%H:%M'),
-                            'duration': duration,
-                            'transit_type': mt['source'],
-                            'transit_name': mt['type'],
-                            'bird_tier': bp['tier'],
-                            'bird': bp.get('bird', ''),
-                            'activity': bp.get('activity', ''),
-                        })
-                except Exception:
-                    pass
+        # A forced MicroBird run re-scans the transits, which are then read from the store
+        micro_bird_events = _client_micro_bird_events(client_user_id, saved_data, force=force)
 
-        micro_bird_events.sort(key=lambda x: (x['date'], x['start']))
-
-        try:
-            safe_cache = json.loads(json.dumps({
-                'date': today_str,
-                'yp_transits': yp_transits,
-                'pof_transits': pof_transits,
-                'wb3_transits': wb3_transits,
-                'micro_bird_events': micro_bird_events,
-            }, default=_serialize_for_cache))
-            saved_data['cached_microtransits'] = safe_cache
-            db_manager.save_calendar_data(client_user_id, saved_data)
-        except Exception as cache_err:
-            print(f'Client {client_id} microtransit cache save failed: {cache_err}')
+        transits = subject_transits(client_user_id, saved_data)
+        yp_transits, pof_transits = [], []
+        for source, serialized in (('YP', yp_transits), ('PoF', pof_transits)):
+            for t in transits.get(source, []):
+                if t['start'].strftime('%Y-%m-%d') in bg_set:
+                    serialized.append(_serialize_transit(t, source))
 
         return jsonify({
             "status": "success",
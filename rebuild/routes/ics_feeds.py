@@ -3,11 +3,16 @@ ICS Calendar Feed routes blueprint
 Ports ICS feed endpoints from src/api/astrobatch_api.py
 """
 
-from flask import Blueprint, request, make_response, jsonify
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, date, time
+from functools import wraps
+
+from flask import Blueprint, request, make_response, jsonify, g, Response
 from database.models import SubscriptionToken
 from database.manager import db_manager
-from datetime import datetime, timedelta, date, time
-import hashlib
+from helpers.microbird import get_microbird_events
 
 ics_bp = Blueprint('ics_feeds', __name__)
 
@@ -27,6 +32,14 @@ CALENDAR_DISPLAY_NAMES = {
     'bg_pof': 'ABmicrotimes - PoF (Background)',
 }
 
+# MicroBird transit sources as the feed labels them
+MICROBIRD_ICS_SOURCES = {'YP': 'YogiPoint', 'PoF': 'PoF', 'WB3': 'WB3'}
+
+# Rendered feeds per (user, feed, calendar version)
+MAX_CACHED_FEEDS = 2048
+_rendered_feeds = OrderedDict()
+_rendered_feeds_lock = threading.Lock()
+
 
 def _escape_ics_text(text):
     if not text:
@@ -65,8 +78,10 @@ def create_ics_response(calendar_name, events, cal_name_override=None):
     display_name = cal_name_override or CALENDAR_DISPLAY_NAMES.get(
         calendar_name, f'ABmicrotimes - {calendar_name}'
     )
-    dtstamp = datetime.utcnow().strftime('%Y%m%dT%H%M%SZ')
-    sequence = int(datetime.utcnow().timestamp()) % 100000
+    # Stamped with the calendar version, so the same data renders byte-identical
+    generated_at = g.get('ics_generated_at') or datetime.utcnow()
+    dtstamp = generated_at.strftime('%Y%m%dT%H%M%SZ')
+    sequence = int(generated_at.timestamp()) % 100000
 
     lines = [
         'BEGIN:VCALENDAR',
@@ -117,11 +132,11 @@ def create_ics_response(calendar_name, events, cal_name_override=None):
     response = make_response(ics_content)
     response.headers['Content-Type'] = 'text/calendar; charset=utf-8'
     response.headers['Content-Disposition'] = f'attachment; filename={calendar_name}.ics'
-    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
-    response.headers['Pragma'] = 'no-cache'
-    response.headers['Expires'] = '0'
+    response.headers['Cache-Control'] = 'private, no-cache, must-revalidate'
     response.headers['X-Published-TTL'] = 'PT15M'
-    response.headers['ETag'] = f'"{int(datetime.utcnow().timestamp())}"'
+    response.set_etag(hashlib.sha256(ics_content.encode('utf-8')).hexdigest())
+    if g.get('ics_generated_at'):
+        response.last_modified = g.ics_generated_at
     return response
 
 
@@ -149,8 +164,73 @@ def _verify_subscription(calendar_type):
     return user_id, None
 
 
-def _get_saved_calendar_section(user_id, section_key):
-    saved_data = db_manager.get_calendar_data(user_id)
+def _feed_version(user_id):
+    """
+    (cache version, Last-Modified) of a user's feeds, or None without saved
+    calendar data. Feeds follow the saved data and, through their rolling
+    windows, today's date.
+    """
+    saved_at = db_manager.get_calendar_version(user_id)
+    if saved_at is None:
+        return None
+    today = date.today()
+    return f"{saved_at.isoformat()}/{today.isoformat()}", max(saved_at, datetime.combine(today, time.min))
+
+
+def cached_feed(*calendar_types):
+    """
+    Serve a feed from the render cache keyed by (user, feed, calendar
+    version). Rendered feeds carry a content-hash ETag and Last-Modified,
+    and a matching If-None-Match or If-Modified-Since gets 304 Not Modified,
+    so an unchanged poll costs the token check and one version lookup.
+    The token may be for any of calendar_types; the view is called with the
+    verified user_id.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            for calendar_type in calendar_types:
+                user_id, err = _verify_subscription(calendar_type)
+                if not err:
+                    break
+            if err:
+                return err
+            version = _feed_version(user_id)
+            if version is None:
+                return view(user_id, *args, **kwargs)
+
+            key = (user_id, request.path, version[0])
+            with _rendered_feeds_lock:
+                cached = _rendered_feeds.get(key)
+                if cached is not None:
+                    _rendered_feeds.move_to_end(key)
+
+            if cached is None:
+                g.ics_generated_at = version[1]
+                response = view(user_id, *args, **kwargs)
+                if not isinstance(response, Response) or response.status_code != 200:
+                    return response
+                cached = (response.get_data(), list(response.headers.items()))
+                with _rendered_feeds_lock:
+                    _rendered_feeds[key] = cached
+                    while len(_rendered_feeds) > MAX_CACHED_FEEDS:
+                        _rendered_feeds.popitem(last=False)
+
+            body, headers = cached
+            return Response(body, headers=headers).make_conditional(request)
+        return wrapper
+    return decorator
+
+
+def clear_feed_cache():
+    """Drop every rendered feed."""
+    with _rendered_feeds_lock:
+        _rendered_feeds.clear()
+
+
+def _get_saved_calendar_section(user_id, section_key, *sections):
+    """(saved data, calendar), loading only that calendar and the other given sections."""
+    saved_data = db_manager.get_calendar_data(user_id, sections=(f'calendars.{section_key}',) + sections)
     if not saved_data:
         return None, None
     calendars = saved_data.get('calendars', {})
@@ -198,11 +278,8 @@ PERSONAL_QUALITY_EMOJIS = {
 
 
 @ics_bp.route('/calendar/bird_batch.ics')
-def bird_batch_calendar_feed():
-    user_id, err = _verify_subscription('bird_batch')
-    if err:
-        return err
-
+@cached_feed('bird_batch')
+def bird_batch_calendar_feed(user_id):
     try:
         saved_data, bird_cal = _get_saved_calendar_section(user_id, 'bird_batch')
         if not bird_cal:
@@ -282,13 +359,10 @@ def _parse_time_to_datetime(day_date, time_str):
 
 
 @ics_bp.route('/calendar/personal.ics')
-def personal_calendar_feed():
-    user_id, err = _verify_subscription('personal')
-    if err:
-        return err
-
+@cached_feed('personal')
+def personal_calendar_feed(user_id):
     try:
-        saved_data, personal_cal = _get_saved_calendar_section(user_id, 'personal')
+        saved_data, personal_cal = _get_saved_calendar_section(user_id, 'personal', 'calendars.combined')
         if not personal_cal:
             return 'No personal calendar data found. Please generate calendars first.', 404
 
@@ -409,11 +483,8 @@ def personal_calendar_feed():
 
 
 @ics_bp.route('/calendar/pti.ics')
-def pti_calendar_feed():
-    user_id, err = _verify_subscription('pti')
-    if err:
-        return err
-
+@cached_feed('pti')
+def pti_calendar_feed(user_id):
     try:
         saved_data, pti_cal = _get_saved_calendar_section(user_id, 'pti_collective')
         if not pti_cal:
@@ -469,11 +540,8 @@ def pti_calendar_feed():
 
 
 @ics_bp.route('/calendar/vedic.ics')
-def vedic_calendar_feed():
-    user_id, err = _verify_subscription('vedic')
-    if err:
-        return err
-
+@cached_feed('vedic')
+def vedic_calendar_feed(user_id):
     try:
         saved_data, vedic_cal = _get_saved_calendar_section(user_id, 'vedic_pti')
         if not vedic_cal:
@@ -542,11 +610,8 @@ def vedic_calendar_feed():
 
 
 @ics_bp.route('/calendar/combined.ics')
-def combined_calendar_feed():
-    user_id, err = _verify_subscription('combined')
-    if err:
-        return err
-
+@cached_feed('combined')
+def combined_calendar_feed(user_id):
     try:
         saved_data, combined_cal = _get_saved_calendar_section(user_id, 'combined')
         if not combined_cal:
@@ -620,11 +685,8 @@ def combined_calendar_feed():
 
 
 @ics_bp.route('/calendar/yogi_point.ics')
-def yogi_point_calendar_feed():
-    user_id, err = _verify_subscription('yogi_point')
-    if err:
-        return err
-
+@cached_feed('yogi_point')
+def yogi_point_calendar_feed(user_id):
     try:
         saved_data, yp_cal = _get_saved_calendar_section(user_id, 'yogi_point')
         if not yp_cal:
@@ -744,11 +806,8 @@ RAHU_KALAM_SEGMENT = {
 
 
 @ics_bp.route('/calendar/nogo.ics')
-def nogo_calendar_feed():
-    user_id, err = _verify_subscription('nogo')
-    if err:
-        return err
-
+@cached_feed('nogo')
+def nogo_calendar_feed(user_id):
     try:
         from database.models import UserProfile
 
@@ -758,7 +817,8 @@ def nogo_calendar_feed():
             lon = profile.current_longitude if profile.current_longitude is not None else 72.8777
             calendar_days = profile.calendar_range_days or 60
         else:
-            saved_data = db_manager.get_calendar_data(user_id)
+            saved_data = db_manager.get_calendar_data(
+                user_id, sections=('current_latitude', 'current_longitude', 'calendar_range_days'))
             if saved_data:
                 lat = saved_data.get('current_latitude', 19.076)
                 lon = saved_data.get('current_longitude', 72.8777)
@@ -801,8 +861,9 @@ def nogo_calendar_feed():
         return f"Error generating NO GO calendar: {str(e)}", 500
 
 
-def _get_background_dates(user_id):
-    saved_data = db_manager.get_calendar_data(user_id)
+def _get_background_dates(user_id, *sections):
+    """(background dates, saved data), loading the combined calendar and the given sections."""
+    saved_data = db_manager.get_calendar_data(user_id, sections=('calendars.combined',) + sections)
     if not saved_data:
         return set(), None
     calendars = saved_data.get('calendars', {})
@@ -825,14 +886,27 @@ def _get_background_dates(user_id):
     return bg_dates, saved_data
 
 
-@ics_bp.route('/calendar/bg_bird_batch.ics')
-def bg_bird_batch_calendar_feed():
-    user_id, err = _verify_subscription('bird_batch')
-    if err:
-        return err
+def _microtransit_engine_args(user_id):
+    """(birth datetime, transit location) for the feed owner, or None without birth data."""
+    if user_id.startswith('client_'):
+        from database.models import Client
+        rec = Client.query.get(int(user_id.split('_', 1)[1]))
+    else:
+        from database.models import UserProfile
+        rec = UserProfile.query.filter_by(email=user_id).first()
+    if not rec or not rec.birth_date or not rec.birth_time:
+        return None
+    birth_dt = datetime.combine(rec.birth_date, rec.birth_time)
+    lat = float(rec.current_latitude or rec.birth_latitude or 40.7128)
+    lon = float(rec.current_longitude or rec.birth_longitude or -74.0060)
+    return birth_dt, (lat, lon)
+
 
+@ics_bp.route('/calendar/bg_bird_batch.ics')
+@cached_feed('bird_batch')
+def bg_bird_batch_calendar_feed(user_id):
     try:
-        bg_dates, saved_data = _get_background_dates(user_id)
+        bg_dates, saved_data = _get_background_dates(user_id, 'calendars.bird_batch')
         if not saved_data:
             return 'No calendar data found. Please generate calendars first.', 404
         if not bg_dates:
@@ -903,13 +977,10 @@ def bg_bird_batch_calendar_feed():
 
 
 @ics_bp.route('/calendar/bg_yogi_point.ics')
-def bg_yogi_point_calendar_feed():
-    user_id, err = _verify_subscription('yogi_point')
-    if err:
-        return err
-
+@cached_feed('yogi_point')
+def bg_yogi_point_calendar_feed(user_id):
     try:
-        bg_dates, saved_data = _get_background_dates(user_id)
+        bg_dates, saved_data = _get_background_dates(user_id, 'calendars.yogi_point')
         if not saved_data:
             return 'No calendar data found. Please generate calendars first.', 404
         if not bg_dates:
@@ -973,15 +1044,10 @@ def bg_yogi_point_calendar_feed():
 
 
 @ics_bp.route('/calendar/bg_pof.ics')
-def bg_pof_calendar_feed():
-    user_id, err = _verify_subscription('enhanced_pof')
-    if not user_id:
-        user_id, err = _verify_subscription('bird_batch')
-    if err:
-        return err
-
+@cached_feed('enhanced_pof', 'bird_batch')
+def bg_pof_calendar_feed(user_id):
     try:
-        bg_dates, saved_data = _get_background_dates(user_id)
+        bg_dates, saved_data = _get_background_dates(user_id, 'calendars.part_of_fortune', 'calendars.pof', 'period')
         if not saved_data:
             return 'No calendar data found. Please generate calendars first.', 404
         if not bg_dates:
@@ -995,7 +1061,7 @@ def bg_pof_calendar_feed():
 
         if not pof_transits:
             try:
-                from microtransits.wb1 import process_transits as wb1_process
+                from microtransits.wb1 import WB1Engine
                 period = saved_data.get('period', {})
                 try:
                     days = int(period.get('days', 60))
@@ -1003,7 +1069,10 @@ def bg_pof_calendar_feed():
                     days = 60
                 start_date = datetime.combine(date.today(), datetime.min.time())
                 end_date = datetime.combine(date.today() + timedelta(days=days), datetime.min.time())
-                pof_transits = wb1_process(start_date, end_date)
+                engine_args = _microtransit_engine_args(user_id)
+                if engine_args:
+                    birth_dt, location = engine_args
+                    pof_transits = WB1Engine(birth_dt, location=location).scan(start_date, end_date)
             except Exception:
                 pof_transits = []
 
@@ -1062,186 +1131,33 @@ def bg_pof_calendar_feed():
 
 
 @ics_bp.route('/calendar/microbird.ics')
-def microbird_calendar_feed():
-    user_id, err = _verify_subscription('microbird')
-    if err:
-        return err
-
+@cached_feed('microbird')
+def microbird_calendar_feed(user_id):
     try:
-        bg_dates, saved_data = _get_background_dates(user_id)
+        bg_dates, saved_data = _get_background_dates(user_id, 'calendars.bird_batch', 'period')
         if not saved_data:
             return 'No calendar data found. Please generate calendars first.', 404
         if not bg_dates:
             return create_ics_response('microbird', [], cal_name_override='ABmicrotimes - MicroBird')
 
-        calendars = saved_data.get('calendars', {})
-        bird_cal = calendars.get('bird_batch', {})
-        daily_results = bird_cal.get('daily_results', [])
-        if not daily_results and isinstance(bird_cal.get('data'), dict):
-            daily_results = bird_cal['data'].get('daily_results', [])
-
-        bird_periods = []
-        for day_data in daily_results:
-            day_date_str = day_data.get('date')
-            if not day_date_str or day_date_str not in bg_dates:
-                continue
-            try:
-                day_date_obj = datetime.strptime(day_date_str, '%Y-%m-%d').date()
-            except ValueError:
-                continue
-            for period in day_data.get('periods', []):
-                start_time_str = period.get('start_time', '00:00')
-                end_time_str = period.get('end_time', '23:59')
-                try:
-                    bird_start = _parse_time_to_datetime(day_date_obj, start_time_str)
-                    bird_end = _parse_time_to_datetime(day_date_obj, end_time_str)
-                    if bird_end <= bird_start:
-                        bird_end += timedelta(days=1)
-                except ValueError:
-                    bird_start = datetime.combine(day_date_obj, time(0, 0))
-                    bird_end = datetime.combine(day_date_obj, time(23, 59))
-                bird_periods.append({
-                    'date_str': day_date_str,
-                    'start': bird_start,
-                    'end': bird_end,
-                    'tier': period.get('tier', ''),
-                    'activity': period.get('sub_activity', period.get('main_activity', '')),
-                })
-
-        microtransits = []
-
-        yp_cal = calendars.get('yogi_point', {})
-        yp_transits = yp_cal.get('transits', []) or yp_cal.get('results', [])
-        for t in yp_transits:
-            start_raw = t.get('start_time') or t.get('start')
-            end_raw = t.get('end_time') or t.get('end')
-            try:
-                if start_raw and end_raw:
-                    s = datetime.fromisoformat(str(start_raw)) if isinstance(start_raw, str) else start_raw
-                    e = datetime.fromisoformat(str(end_raw)) if isinstance(end_raw, str) else end_raw
-                    if hasattr(s, 'replace'):
-                        s = s.replace(tzinfo=None)
-                    if hasattr(e, 'replace'):
-                        e = e.replace(tzinfo=None)
-                    microtransits.append({
-                        'start': s,
-                        'end': e,
-                        'type': 'YogiPoint',
-                        'planet': t.get('planet', t.get('type', '')),
-                    })
-            except (ValueError, TypeError):
-                continue
-
-        pof_cal = calendars.get('part_of_fortune', calendars.get('pof', {}))
-        pof_transits = []
-        if pof_cal:
-            pof_transits = pof_cal.get('transits', []) or pof_cal.get('results', [])
-        if not pof_transits:
-            try:
-                from microtransits.wb1 import process_transits as wb1_process
-                period = saved_data.get('period', {})
-                try:
-                    days = int(period.get('days', 60))
-                except (ValueError, TypeError):
-                    days = 60
-                start_date = datetime.combine(date.today(), datetime.min.time())
-                end_date = datetime.combine(date.today() + timedelta(days=days), datetime.min.time())
-                pof_transits = wb1_process(start_date, end_date)
-            except Exception:
-                pof_transits = []
-
-        for t in pof_transits:
-            start_raw = t.get('start_time') or t.get('start')
-            end_raw = t.get('end_time') or t.get('end')
-            try:
-                if start_raw and end_raw:
-                    s = datetime.fromisoformat(str(start_raw)) if isinstance(start_raw, str) else start_raw
-                    e = datetime.fromisoformat(str(end_raw)) if isinstance(end_raw, str) else end_raw
-                    if hasattr(s, 'replace'):
-                        s = s.replace(tzinfo=None)
-                    if hasattr(e, 'replace'):
-                        e = e.replace(tzinfo=None)
-                    microtransits.append({
-                        'start': s,
-                        'end': e,
-                        'type': 'PoF',
-                        'planet': t.get('planet', t.get('type', '')),
-                    })
-            except (ValueError, TypeError):
-                continue
-
-        try:
-            import microtransits.wb3 as wb3_module
-            if user_id.startswith('client_'):
-                from database.models import Client
-                _client_id = int(user_id.split('_', 1)[1])
-                _rec = Client.query.get(_client_id)
-            else:
-                from database.models import UserProfile
-                _rec = UserProfile.query.filter_by(email=user_id).first()
-            if _rec and _rec.birth_date and _rec.birth_time:
-                birth_dt = datetime.combine(_rec.birth_date, _rec.birth_time)
-                wb3_module.BIRTH_DATE = birth_dt
-                lat = float(_rec.current_latitude or _rec.birth_latitude or 40.7128)
-                lon = float(_rec.current_longitude or _rec.birth_longitude or -74.0060)
-                wb3_module.TRANSIT_LOCATION = (lat, lon)
-                period = saved_data.get('period', {})
-                try:
-                    wb3_days = int(period.get('days', 60))
-                except (ValueError, TypeError):
-                    wb3_days = 60
-                wb3_start = datetime.combine(date.today(), datetime.min.time())
-                wb3_end = datetime.combine(date.today() + timedelta(days=wb3_days), datetime.min.time())
-                raw_wb3 = wb3_module.process_transits(wb3_start, wb3_end)
-                for t in raw_wb3:
-                    s = t.get('start')
-                    e = t.get('end')
-                    if s and e:
-                        if hasattr(s, 'replace'):
-                            s = s.replace(tzinfo=None)
-                        if hasattr(e, 'replace'):
-                            e = e.replace(tzinfo=None)
-                        microtransits.append({
-                            'start': s,
-                            'end': e,
-                            'type': 'WB3',
-                            'planet': t.get('type', t.get('transit_code', '')),
-                        })
-        except Exception as _wb3_err:
-            print(f"WB3 ICS error: {_wb3_err}")
-
         events = []
-        event_idx = 0
-        for mt in microtransits:
-            mt_date_str = mt['start'].strftime('%Y-%m-%d')
-            if mt_date_str not in bg_dates:
-                continue
-            for bp in bird_periods:
-                if bp['date_str'] != mt_date_str:
-                    continue
-                if mt['start'] < bp['end'] and mt['end'] > bp['start']:
-                    overlap_start = max(mt['start'], bp['start'])
-                    overlap_end = min(mt['end'], bp['end'])
-                    duration_mins = int((overlap_end - overlap_start).total_seconds() / 60)
-                    if duration_mins <= 0:
-                        continue
-
-                    title = f"🎯 MicroBird - {mt['type']}"
-                    description = f"🎯 MICRO BIRD OVERLAP\\n"
-                    description += f"📡 Transit: {mt['type']}\\n"
-                    description += f"🪐 Planet: {mt['planet']}\\n"
-                    description += f"🏆 Bird Tier: {bp['tier']}\\n"
-                    description += f"🐦 Activity: {bp['activity']}\\n"
-                    description += f"⏱️ Overlap: {duration_mins} minutes"
-
-                    events.append({
-                        'id': f"microbird_{event_idx}",
-                        'title': title,
-                        'description': description,
-                        'start': overlap_start,
-                        'end': overlap_end,
-                    })
-                    event_idx += 1
+        for event_idx, mb in enumerate(get_microbird_events(user_id, saved_data)):
+            transit_type = MICROBIRD_ICS_SOURCES.get(mb['transit_source'], mb['transit_source'])
+            title = f"🎯 MicroBird - {transit_type}"
+            description = f"🎯 MICRO BIRD OVERLAP\\n"
+            description += f"📡 Transit: {transit_type}\\n"
+            description += f"🪐 Planet: {mb['transit_name']}\\n"
+            description += f"🏆 Bird Tier: {mb['bird_tier']}\\n"
+            description += f"🐦 Activity: {mb['activity']}\\n"
+            description += f"⏱️ Overlap: {mb['duration_minutes']} minutes"
+
+            events.append({
+                'id': f"microbird_{event_idx}",
+                'title': title,
+                'description': description,
+                'start': mb['start'],
+                'end': mb['end'],
+            })
 
         return create_ics_response('microbird', events, cal_name_override='ABmicrotimes - MicroBird')
 
@@ -1250,18 +1166,14 @@ def microbird_calendar_feed():
 
 
 @ics_bp.route('/calendar/enhanced_pof.ics')
-def enhanced_pof_calendar_feed():
-    user_id, err = _verify_subscription('enhanced_pof')
-    if err:
-        return err
+@cached_feed('enhanced_pof')
+def enhanced_pof_calendar_feed(user_id):
     return _create_stub_ics('enhanced_pof', 'Enhanced POF Calendar')
 
 
 @ics_bp.route('/calendar/all_microtransits.ics')
-def all_microtransits_calendar_feed():
-    user_id, err = _verify_subscription('all_microtransits')
-    if err:
-        return err
+@cached_feed('all_microtransits')
+def all_microtransits_calendar_feed(user_id):
     return _create_stub_ics('all_microtransits', 'All Microtransits Calendar')
 
 
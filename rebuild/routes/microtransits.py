@@ -1,10 +1,12 @@
 """Microtransits blueprint — Yogi Point, Part of Fortune, Transit Audit, Selected Day Analysis."""
 
+import os
 import traceback
 from datetime import datetime, timedelta
 
 from flask import Blueprint, request, jsonify, session
 from helpers.utils import get_user_calendar_range
+from core.instrumentation import counters, reset_counters
 from database.manager import db_manager
 
 microtransits_bp = Blueprint('microtransits', __name__)
@@ -467,3 +469,18 @@ def save_background_days():
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
+
+
+@microtransits_bp.route('/api/admin/engine-counters', methods=['GET', 'DELETE'])
+def engine_counters():
+    if not session.get('authenticated'):
+        return jsonify({"status": "error", "message": "Not authenticated"}), 401
+    user_info = session.get('user_info', {})
+    if not user_info.get('is_admin'):
+        return jsonify({"status": "error", "message": "Admin access required"}), 403
+
+    if request.method == 'DELETE':
+        reset_counters()
+        return jsonify({"status": "success"})
+    # Counters of this process only (see core.instrumentation)
+    return jsonify({"status": "success", "scope": "process", "pid": os.getpid(), "counters": counters()})
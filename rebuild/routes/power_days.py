@@ -1,6 +1,5 @@
 """Power Days routes — classified power days, filtered microtransits."""
 
-import json
 import traceback
 from datetime import datetime, date, timedelta
 
@@ -8,6 +7,7 @@ from flask import Blueprint, jsonify, request, session
 from database.manager import db_manager
 from database.models import db, UserProfile
 from helpers.dashboard import generate_dashboard_core
+from helpers.transit_store import get_transits
 from helpers.utils import get_two_month_range, get_effective_user_id
 
 power_days_bp = Blueprint('power_days', __name__)
@@ -23,11 +23,8 @@ def _extract_date_part(date_string):
     return date_string
 
 
-def _serialize_for_cache(obj):
-    """Convert datetime/date objects to ISO strings for JSON serialization."""
-    if isinstance(obj, (datetime, date)):
-        return obj.isoformat()
-    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+# Calendar data sections the power day extraction reads
+POWER_DAY_SECTIONS = ('calendars.combined', 'calendars.vedic_pti', 'calendars.goslow', 'calendars.vedic', 'period')
 
 
 def _extract_power_days(saved_data):
@@ -145,7 +142,7 @@ def get_power_days():
         if not user_id:
             return jsonify({'error': 'User ID not found'}), 400
 
-        saved_data = db_manager.get_calendar_data(user_id)
+        saved_data = db_manager.get_calendar_data(user_id, sections=POWER_DAY_SECTIONS)
         if not saved_data:
             return jsonify({'error': 'No saved calendar data found. Generate calendars first.'}), 404
 
@@ -201,7 +198,7 @@ def generate_power_days():
         if not core_result or core_result.get('error'):
             return jsonify({'error': core_result.get('error', 'Generation failed')}), 500
 
-        saved_data = db_manager.get_calendar_data(user_id)
+        saved_data = db_manager.get_calendar_data(user_id, sections=POWER_DAY_SECTIONS)
         if not saved_data:
             saved_data = core_result
 
@@ -224,7 +221,7 @@ def get_bird_batch_power_days():
         if not user_id:
             return jsonify({'error': 'User ID not found'}), 400
 
-        saved_data = db_manager.get_calendar_data(user_id)
+        saved_data = db_manager.get_calendar_data(user_id, sections=POWER_DAY_SECTIONS + ('calendars.bird_batch',))
         if not saved_data:
             return jsonify({'error': 'No saved calendar data found. Generate calendars first.'}), 404
 
@@ -280,7 +277,7 @@ def get_yogi_point_power_days():
         if not user_id:
             return jsonify({'error': 'User ID not found'}), 400
 
-        saved_data = db_manager.get_calendar_data(user_id)
+        saved_data = db_manager.get_calendar_data(user_id, sections=POWER_DAY_SECTIONS)
         if not saved_data:
             return jsonify({'error': 'No saved calendar data found. Generate calendars first.'}), 404
 
@@ -290,27 +287,18 @@ def get_yogi_point_power_days():
             return jsonify({'transits': [], 'background_days': [], 'total_filtered': 0})
 
         today_str = date.today().isoformat()
-        cache = saved_data.get('cached_yp', {})
         force = request.args.get('force') == '1'
 
-        if not force and cache.get('date') == today_str and cache.get('all_transits') is not None:
-            all_transits = cache['all_transits']
-        else:
-            try:
-                from microtransits.yp import process_transits
-            except ImportError as ie:
-                return jsonify({'error': f'Yogi Point module unavailable: {ie}'}), 500
-
-            start_date = datetime.combine(date.today(), datetime.min.time())
-            end_date = datetime.combine(date.today() + timedelta(days=days), datetime.min.time())
-            all_transits = process_transits(start_date, end_date)
-
-            try:
-                safe_transits = json.loads(json.dumps(all_transits, default=_serialize_for_cache))
-                saved_data['cached_yp'] = {'date': today_str, 'all_transits': safe_transits}
-                db_manager.save_calendar_data(user_id, saved_data)
-            except Exception as cache_err:
-                print(f'YP cache save failed: {cache_err}')
+        try:
+            from microtransits.yp import YPEngine, TRANSIT_LOCATION, ORB
+        except ImportError as ie:
+            return jsonify({'error': f'Yogi Point module unavailable: {ie}'}), 500
+
+        # Yogi Point transits depend only on the transit location, so they are shared
+        start_date = datetime.combine(date.today(), datetime.min.time())
+        end_date = datetime.combine(date.today() + timedelta(days=days), datetime.min.time())
+        engine = YPEngine(location=TRANSIT_LOCATION, orb=ORB)
+        all_transits, cached = get_transits('collective', engine, start_date, end_date, force=force)
 
         filtered = []
         for t in all_transits:
@@ -326,7 +314,7 @@ def get_yogi_point_power_days():
             'total_filtered': len(filtered),
             'total_unfiltered': len(all_transits),
             'background_days': sorted(bg_dates),
-            'cached': cache.get('date') == today_str and not force,
+            'cached': cached,
             'period': {
                 'start_date': today_str,
                 'end_date': (date.today() + timedelta(days=days)).isoformat(),
@@ -348,7 +336,7 @@ def get_part_of_fortune_power_days():
         if not user_id:
             return jsonify({'error': 'User ID not found'}), 400
 
-        saved_data = db_manager.get_calendar_data(user_id)
+        saved_data = db_manager.get_calendar_data(user_id, sections=POWER_DAY_SECTIONS)
         if not saved_data:
             return jsonify({'error': 'No saved calendar data found. Generate calendars first.'}), 404
 
@@ -358,42 +346,32 @@ def get_part_of_fortune_power_days():
             return jsonify({'transits': [], 'background_days': [], 'total_filtered': 0})
 
         today_str = date.today().isoformat()
-        cache = saved_data.get('cached_pof', {})
         force = request.args.get('force') == '1'
 
-        if not force and cache.get('date') == today_str and cache.get('all_transits') is not None:
-            all_transits = cache['all_transits']
-        else:
-            try:
-                import microtransits.wb1 as wb1_module
-            except ImportError as ie:
-                return jsonify({'error': f'Part of Fortune module unavailable: {ie}'}), 500
-
-            user_profile = UserProfile.query.filter_by(email=user_id).first()
-            if not user_profile or not user_profile.birth_date:
-                return jsonify({'error': 'Profile with birth data required for Part of Fortune'}), 400
-
-            birth_dt = datetime.combine(user_profile.birth_date, datetime.min.time())
-            if user_profile.birth_time:
-                birth_dt = datetime.combine(user_profile.birth_date, user_profile.birth_time)
-
-            wb1_module.BIRTH_DATE = birth_dt
-            if user_profile.current_latitude and user_profile.current_longitude:
-                wb1_module.TRANSIT_LOCATION = (
-                    float(user_profile.current_latitude),
-                    float(user_profile.current_longitude)
-                )
-
-            start_date = datetime.combine(date.today(), datetime.min.time())
-            end_date = datetime.combine(date.today() + timedelta(days=days), datetime.min.time())
-            all_transits = wb1_module.process_transits(start_date, end_date)
-
-            try:
-                safe_transits = json.loads(json.dumps(all_transits, default=_serialize_for_cache))
-                saved_data['cached_pof'] = {'date': today_str, 'all_transits': safe_transits}
-                db_manager.save_calendar_data(user_id, saved_data)
-            except Exception as cache_err:
-                print(f'PoF cache save failed: {cache_err}')
+        try:
+            from microtransits.wb1 import WB1Engine
+        except ImportError as ie:
+            return jsonify({'error': f'Part of Fortune module unavailable: {ie}'}), 500
+
+        user_profile = UserProfile.query.filter_by(email=user_id).first()
+        if not user_profile or not user_profile.birth_date:
+            return jsonify({'error': 'Profile with birth data required for Part of Fortune'}), 400
+
+        birth_dt = datetime.combine(user_profile.birth_date, datetime.min.time())
+        if user_profile.birth_time:
+            birth_dt = datetime.combine(user_profile.birth_date, user_profile.birth_time)
+
+        transit_location = None
+        if user_profile.current_latitude and user_profile.current_longitude:
+            transit_location = (
+                float(user_profile.current_latitude),
+                float(user_profile.current_longitude)
+            )
+
+        start_date = datetime.combine(date.today(), datetime.min.time())
+        end_date = datetime.combine(date.today() + timedelta(days=days), datetime.min.time())
+        engine = WB1Engine(birth_dt, location=transit_location)
+        all_transits, cached = get_transits(user_id, engine, start_date, end_date, force=force)
 
         filtered = []
         for t in all_transits:
@@ -409,7 +387,7 @@ def get_part_of_fortune_power_days():
             'total_filtered': len(filtered),
             'total_unfiltered': len(all_transits),
             'background_days': sorted(bg_dates),
-            'cached': cache.get('date') == today_str and not force,
+            'cached': cached,
             'period': {
                 'start_date': today_str,
                 'end_date': (date.today() + timedelta(days=days)).isoformat(),
@@ -449,7 +427,7 @@ def get_pti_calendar():
         if not user_id:
             return jsonify({'error': 'User ID not found'}), 400
 
-        saved = db_manager.get_calendar_data(user_id)
+        saved = db_manager.get_calendar_data(user_id, sections=('calendars.pti_collective', 'calendars.pti'))
         if not saved:
             return jsonify({'error': 'No calendar data found. Please generate calendars first.'}), 404
 
@@ -2,10 +2,10 @@
 
 import os
 import traceback
-from datetime import datetime, timedelta, date, time
 
 from flask import Blueprint, request, jsonify, session
 from database.manager import db_manager
+from helpers.microbird import get_microbird_events
 
 publer_bp = Blueprint('publer', __name__)
 
@@ -29,160 +29,32 @@ def _extract_date_part(date_string):
     return date_string
 
 
-def _get_background_dates(saved_data):
-    calendars = (saved_data or {}).get('calendars', {})
-    combined_cal = calendars.get('combined', {})
-    combined_results = (
-        combined_cal.get('data', {}).get('results', [])
-        or combined_cal.get('results', [])
-    )
-    bg_dates = set()
-    for day in combined_results:
-        if not isinstance(day, dict):
-            continue
-        classification = day.get('classification', '')
-        is_bg = day.get('is_background', False)
-        if classification in ('OMNI', 'DOUBLE GO', 'GOOD') or is_bg:
-            bg_dates.add(day.get('date', ''))
-    return bg_dates
-
-
-def _parse_time_to_datetime(day_date, time_str):
-    formats = ['%I:%M %p', '%I:%M:%S %p', '%H:%M:%S', '%H:%M']
-    for fmt in formats:
-        try:
-            t = datetime.strptime(time_str, fmt).time()
-            return datetime.combine(day_date, t)
-        except ValueError:
-            continue
-    raise ValueError(f"Cannot parse time: {time_str}")
+# MicroBird transit sources as the posts label them
+MICROBIRD_SOURCES = {'YP': 'Yogi Point', 'PoF': 'Part of Fortune', 'WB3': 'WB3'}
 
 
 def _compute_micro_bird_events(saved_data, user_id=None):
-    bg_dates = _get_background_dates(saved_data)
-    if not bg_dates:
+    if not user_id:
         return []
 
-    calendars = (saved_data or {}).get('calendars', {})
-
-    bird_cal = calendars.get('bird_batch', {})
-    daily_results = bird_cal.get('daily_results', [])
-    if not daily_results and isinstance(bird_cal.get('data'), dict):
-        daily_results = bird_cal['data'].get('daily_results', [])
-
-    bird_windows = []
-    for day_data in daily_results:
-        day_date_str = day_data.get('date', '')
-        if day_date_str not in bg_dates:
-            continue
-        try:
-            day_date_obj = datetime.strptime(day_date_str, '%Y-%m-%d').date()
-        except ValueError:
-            continue
-        for period in day_data.get('periods', []):
-            start_str = period.get('start_time', '')
-            end_str = period.get('end_time', '')
-            try:
-                start_dt = _parse_time_to_datetime(day_date_obj, start_str)
-                end_dt = _parse_time_to_datetime(day_date_obj, end_str)
-                if end_dt <= start_dt:
-                    end_dt += timedelta(days=1)
-            except (ValueError, TypeError):
-                continue
-            bird_windows.append({
-                'date': day_date_str,
-                'start': start_dt,
-                'end': end_dt,
-                'tier': period.get('tier', ''),
-                'activity': period.get('sub_activity', period.get('main_activity', '')),
-            })
-
-    yp_cal = calendars.get('yogi_point', {})
-    yp_transits = yp_cal.get('transits', []) or yp_cal.get('results', [])
-
-    pof_transits = []
-    pof_cal = calendars.get('part_of_fortune', calendars.get('enhanced_pof', {}))
-    if pof_cal:
-        pof_transits = pof_cal.get('transits', []) or pof_cal.get('results', [])
-
-    all_transits = []
-    for t in yp_transits:
-        t['_source'] = 'Yogi Point'
-        all_transits.append(t)
-    for t in pof_transits:
-        t['_source'] = 'Part of Fortune'
-        all_transits.append(t)
-
-    if user_id:
-        try:
-            import microtransits.wb3 as wb3_module
-            from database.models import UserProfile
-            from datetime import date as _date, timedelta as _td
-            up = UserProfile.query.filter_by(email=user_id).first()
-            if up and up.birth_date and up.birth_time:
-                birth_dt = datetime.combine(up.birth_date, up.birth_time)
-                wb3_module.BIRTH_DATE = birth_dt
-                lat = float(up.current_latitude or up.birth_latitude or 40.7128)
-                lon = float(up.current_longitude or up.birth_longitude or -74.0060)
-                wb3_module.TRANSIT_LOCATION = (lat, lon)
-                period = saved_data.get('period', {})
-                try:
-                    wb3_days = int(period.get('days', 60))
-                except (ValueError, TypeError):
-                    wb3_days = 60
-                wb3_start = datetime.combine(_date.today(), datetime.min.time())
-                wb3_end = datetime.combine(_date.today() + _td(days=wb3_days), datetime.min.time())
-                raw_wb3 = wb3_module.process_transits(wb3_start, wb3_end)
-                for t in raw_wb3:
-                    t['_source'] = 'WB3'
-                    all_transits.append(t)
-        except Exception as _wb3_err:
-            print(f"WB3 publer error: {_wb3_err}")
-
     micro_bird_events = []
-    for transit in all_transits:
-        t_start_raw = transit.get('start_time') or transit.get('start')
-        t_end_raw = transit.get('end_time') or transit.get('end')
-        if not t_start_raw or not t_end_raw:
-            continue
-        try:
-            t_start = datetime.fromisoformat(str(t_start_raw).replace('Z', '+00:00')).replace(tzinfo=None)
-            t_end = datetime.fromisoformat(str(t_end_raw).replace('Z', '+00:00')).replace(tzinfo=None)
-        except (ValueError, TypeError):
-            continue
-
-        t_date = t_start.strftime('%Y-%m-%d')
-        if t_date not in bg_dates:
-            continue
-
-        for bw in bird_windows:
-            if bw['date'] != t_date:
-                continue
-            if t_start < bw['end'] and t_end > bw['start']:
-                overlap_start = max(t_start, bw['start'])
-                overlap_end = min(t_end, bw['end'])
-                duration_min = int((overlap_end - overlap_start).total_seconds() / 60)
-                if duration_min < 1:
-                    continue
-
-                source = transit.get('_source', 'Microtransit')
-                planet = transit.get('planet', transit.get('type', ''))
-                tier = bw['tier']
-
-                micro_bird_events.append({
-                    'date': t_date,
-                    'start': overlap_start.isoformat(),
-                    'end': overlap_end.isoformat(),
-                    'duration_minutes': duration_min,
-                    'transit_source': source,
-                    'planet': planet,
-                    'bird_tier': tier,
-                    'bird_activity': bw['activity'],
-                    'title': f"MicroBird: {source} x {tier}",
-                    'description': f"{source} ({planet}) overlaps {tier} bird period ({bw['activity']}). Duration: {duration_min} min.",
-                })
-
-    micro_bird_events.sort(key=lambda x: x['start'])
+    for mb in get_microbird_events(user_id, saved_data):
+        source = MICROBIRD_SOURCES.get(mb['transit_source'], mb['transit_source'])
+        planet = mb['transit_name']
+        tier = mb['bird_tier']
+        duration_min = mb['duration_minutes']
+        micro_bird_events.append({
+            'date': mb['date'],
+            'start': mb['start'].isoformat(),
+            'end': mb['end'].isoformat(),
+            'duration_minutes': duration_min,
+            'transit_source': source,
+            'planet': planet,
+            'bird_tier': tier,
+            'bird_activity': mb['activity'],
+            'title': f"MicroBird: {source} x {tier}",
+            'description': f"{source} ({planet}) overlaps {tier} bird period ({mb['activity']}). Duration: {duration_min} min.",
+        })
     return micro_bird_events
 
 
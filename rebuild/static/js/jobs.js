@@ -0,0 +1,22 @@
+// Poll a background generation job until it finishes.
+// onProgress receives the job ({status, stage, progress}) on every poll;
+// resolves with the finished job (its result under job.result).
+async function waitForJob(jobId, onProgress, intervalMs = 1500) {
+    while (true) {
+        const resp = await fetch(`/api/jobs/${jobId}`);
+        const job = await resp.json();
+        if (!resp.ok) {
+            throw new Error(job.error || 'Job not found');
+        }
+        if (onProgress) {
+            onProgress(job);
+        }
+        if (job.status === 'done') {
+            return job;
+        }
+        if (job.status === 'error') {
+            throw new Error(job.error || 'Generation failed');
+        }
+        await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+}